@@ -1,14 +1,20 @@
 #!/usr/bin/env python3
+import copy
 import time
 import random
 import threading
 import logging
 import sys
-import pyautogui
 from PyQt5.QtCore import QObject, pyqtSignal, QTimer
 
-# Set up PyAutoGUI failsafe
-pyautogui.FAILSAFE = True  # Moving mouse to corner (0,0) will abort
+from backends import PyAutoGUIBackend, KEEPALIVE_KEYS
+from error_policy import ErrorPolicy, ERROR_FATAL
+from timing_stats import TimingHistogram
+from engine_state import (StateMachine, ACTIVE_STATES, ENGINE_IDLE, ENGINE_STARTING,
+                          ENGINE_RUNNING, ENGINE_PAUSED, ENGINE_STOPPING, ENGINE_FAILED)
+from plugins import coerce_setting
+from journal import (ACTION_MOVE, ACTION_CLICK, ACTION_SCROLL, ACTION_KEY, ACTION_FAILSAFE,
+                     ACTION_ERROR, OUTCOME_OK, OUTCOME_ERROR, OUTCOME_STOPPED, ERROR_KIND_NAMES)
 
 # Configure logging
 logging.basicConfig(
@@ -33,45 +39,177 @@ class PermissionError(AutomationError):
 
 class AutomationBase(QObject):
     """Base class for automation with threading and signals."""
+    # Attribute names that make up the engine's settings snapshot
+    SETTINGS = ("failsafe_active", "seed")
+    # Names of the timing histograms the engine keeps
+    TIMINGS = ()
+    # Plugin engines: display title and {setting: {"type", "default", "min", "max", "choices", "label"}}
+    TITLE = None
+    SETTINGS_SCHEMA = {}
+
     status_update = pyqtSignal(str)
     failsafe_triggered = pyqtSignal()
     error_occurred = pyqtSignal(str)
+    # Emitted once when an error stops the run, after the error itself
+    stopped_on_error = pyqtSignal(str)
+    state_changed = pyqtSignal(str)
     
-    def __init__(self):
+    def __init__(self, backend=None):
         super().__init__()
-        self.running = False
-        self.paused = False
+        # Input backend; may be shared between engines
+        self.backend = backend or PyAutoGUIBackend()
+        # Per-engine RNG, reseeded on every start (seed None picks a fresh one)
+        self.seed = None
+        self.active_seed = None
+        self.rng = random.Random()
+        # Lifecycle state; transitions are announced through state_changed
+        self._state = StateMachine()
+        self._state.add_listener(lambda old, new: self.state_changed.emit(new))
+        self._state.add_listener(self._count_state)
         self.thread = None
         self._stop_event = threading.Event()
-        self._pause_event = threading.Event()
-        self._pause_event.set()  # Not paused by default
+        # Watched by failsafe.FailsafeMonitor, which stops the engine in the corner
         self.failsafe_active = True
         self.error_count = 0
-        self.max_error_retries = 3
-        
+        self.error_policy = ErrorPolicy()
+        self.rate_controller = None  # Optional power.RateController
+        # Watchdog bookkeeping: the worker must heartbeat before this deadline
+        self.stall_timeout = 15.0
+        self.heartbeat_deadline = None
+        # Optional journal.EventJournal recording every injected action
+        self.journal = None
+        self._journal_source = 0
+        self._action_due = None  # When the next action was planned to start
+        # Optional session_report.SessionStats counting actions and state time
+        self.session_stats = None
+        self._stats_name = None
+        # Live timing histograms, read by the UI from snapshots
+        self.timings = {name: TimingHistogram(name) for name in self.TIMINGS}
+        self._last_action_end = None
+        # Seconds spent parked while paused this run, for schedules on their own clock
+        self._parked_total = 0.0
+        # Optional window_target.WindowTarget confining actions to one window
+        self.window_target = None
+        # Active engine_profiler.EngineProfiler in cprofile mode, polled on heartbeats
+        self.profile_session = None
+        # Plugin settings start at their schema defaults
+        for name, spec in self.SETTINGS_SCHEMA.items():
+            setattr(self, name, copy.deepcopy(spec.get("default")))
+
     def _handle_error(self, exception, is_fatal=False):
-        """Handle errors during automation."""
-        error_msg = f"Error: {str(exception)}"
+        """Handle errors during automation.
+        
+        Returns True if the caller should carry on (after backing off), or
+        False if the automation has been stopped.
+        """
+        self.error_count += 1
+        decision = self.error_policy.record_failure(exception)
+        # The kind label avoids "fatal", which only the stopping message carries
+        label = "unrecoverable" if decision.kind == ERROR_FATAL else decision.kind
+        error_msg = f"Error ({label}): {str(exception)}"
         logger.error(error_msg)
         self.error_occurred.emit(error_msg)
         
-        if is_fatal:
-            self.running = False
-            self._stop_event.set()
-            return False
-        
-        self.error_count += 1
-        if self.error_count >= self.max_error_retries:
-            error_msg = f"Maximum error retries ({self.max_error_retries}) exceeded. Stopping automation."
+        stopping = is_fatal or not decision.retry
+        self._journal(ACTION_ERROR, ERROR_KIND_NAMES.index(decision.kind),
+                      outcome=OUTCOME_STOPPED if stopping else OUTCOME_ERROR)
+        if stopping:
+            reason = decision.reason or "Unrecoverable error"
+            error_msg = f"{reason}. Stopping automation (fatal)."
             logger.error(error_msg)
             self.error_occurred.emit(error_msg)
-            self.running = False
+            self.stopped_on_error.emit(error_msg)
+            self._finish_run(failed=True)
             self._stop_event.set()
+            self._dump_journal("error")
             return False
-            
-        # Pause briefly after an error
-        time.sleep(1.0)
+        
+        if decision.breaker_opened:
+            self.status_update.emit(f"{decision.reason}; retrying in {decision.delay:.0f}s")
+        logger.info(f"Backing off for {decision.delay:.2f}s after {decision.kind} error")
+        
+        # Back off without blocking stop requests
+        return self._wait(decision.delay)
+    
+    def _record_success(self):
+        """Record a successful action with the error policy."""
+        self.error_policy.record_success()
+    
+    def set_journal(self, journal, name):
+        """Record this engine's actions in an event journal under a source name."""
+        self.journal = journal
+        self._journal_source = journal.register_source(name) if journal is not None else 0
+    
+    def set_session_stats(self, stats, name):
+        """Count this engine's actions and state time in session stats under a name."""
+        self.session_stats = stats
+        self._stats_name = name
+        if stats is not None:
+            stats.register(name, self.state())
+    
+    def _count_state(self, old, new):
+        """Follow a state change in the session stats, if attached."""
+        stats = self.session_stats
+        if stats is not None:
+            stats.state_changed(self._stats_name, new)
+    
+    def _journal(self, action, x=0, y=0, started=None, outcome=OUTCOME_OK):
+        """Append an action to the event journal and the session stats, if attached."""
+        if self.journal is None and self.session_stats is None:
+            return
+        now = time.time()
+        started = now if started is None else started
+        planned = self._action_due or started
+        if self.journal is not None:
+            self.journal.record(self._journal_source, action, x, y, planned, started, now - started, outcome)
+        if self.session_stats is not None:
+            self.session_stats.record(self._stats_name, action, outcome, x, y, started - planned, now - started)
+        # A chained action is planned to follow this one immediately
+        self._action_due = now
+    
+    def _dump_journal(self, reason):
+        """Dump the event journal to disk, if one is attached."""
+        if self.journal is None:
+            return
+        try:
+            self.journal.dump(reason)
+        except OSError as e:
+            logger.warning(f"Failed to dump event journal: {str(e)}")
+    
+    def failsafe_stop(self, x, y, dump=True):
+        """Stop the run because the pointer reached the failsafe corner.
+        
+        Called from the failsafe monitor's thread; the worker wakes up and
+        exits at once. Returns False if the engine was not running.
+        """
+        if not self._state.transition(ENGINE_STOPPING, expected=ACTIVE_STATES):
+            return False
+        self._stop_event.set()
+        if self.journal is not None:
+            # Not through _journal(): that tracks the worker's own schedule
+            now = time.time()
+            self.journal.record(self._journal_source, ACTION_FAILSAFE, x, y, now, now, 0.0, OUTCOME_STOPPED)
+        if self.session_stats is not None:
+            self.session_stats.record(self._stats_name, ACTION_FAILSAFE, OUTCOME_STOPPED, x, y)
+        if dump:
+            # Preserve the journal leading up to the failsafe
+            self._dump_journal("failsafe")
+        self.status_update.emit("Failsafe triggered: Mouse in corner")
+        self.failsafe_triggered.emit()
         return True
+    
+    def _heartbeat(self, allowance=0.0):
+        """Tell the watchdog the worker is alive and may be busy for allowance seconds."""
+        self.heartbeat_deadline = time.monotonic() + self.stall_timeout + allowance
+        # Heartbeats run on the worker thread, which is where cProfile must be enabled
+        session = self.profile_session
+        if session is not None:
+            session.poll(self)
+    
+    def _should_stop(self):
+        """Check whether the calling worker thread should exit."""
+        return (self._stop_event.is_set() or not self.is_running()
+                or threading.current_thread() is not self.thread)
 
     def start(self):
         """Start the automation thread."""
@@ -79,16 +217,25 @@ class AutomationBase(QObject):
             if self.thread and self.thread.is_alive():
                 self.status_update.emit("Automation is already running")
                 return False
+            if not self._state.transition(ENGINE_STARTING):
+                self.status_update.emit(f"Cannot start automation while {self.state()}")
+                return False
                 
-            self.running = True
             self.error_count = 0
+            self.error_policy.reset()
+            self._seed_rng()
+            self._last_action_end = None
+            self._parked_total = 0.0
             self._stop_event.clear()
-            self._pause_event.set()
+            self._heartbeat()
             self.thread = threading.Thread(target=self._run)
             self.thread.daemon = True
             self.thread.start()
+            # The worker may already have finished on its own
+            self._state.transition(ENGINE_RUNNING, expected=(ENGINE_STARTING,))
             return True
         except Exception as e:
+            self._state.transition(ENGINE_FAILED)
             error_msg = f"Failed to start automation: {str(e)}"
             logger.error(error_msg)
             self.error_occurred.emit(error_msg)
@@ -97,13 +244,13 @@ class AutomationBase(QObject):
     def stop(self):
         """Stop the automation thread."""
         try:
-            self.running = False
+            self._state.transition(ENGINE_STOPPING, expected=ACTIVE_STATES)
             self._stop_event.set()
-            self._pause_event.set()  # Ensure thread is not paused when stopping
             if self.thread and self.thread.is_alive():
                 self.thread.join(2.0)
                 if self.thread.is_alive():
                     logger.warning("Thread did not terminate within timeout")
+            self._state.transition(ENGINE_IDLE, expected=(ENGINE_STOPPING,))
             return True
         except Exception as e:
             error_msg = f"Error stopping automation: {str(e)}"
@@ -111,15 +258,26 @@ class AutomationBase(QObject):
             self.error_occurred.emit(error_msg)
             return False
             
+    def restart(self):
+        """Abandon the current worker thread and start a fresh one.
+        
+        Settings live on the engine, so the new worker runs with the current
+        settings snapshot. A hung worker is left behind as a daemon thread and
+        exits on its own once it notices it is no longer the engine's worker.
+        """
+        logger.warning(f"Restarting {type(self).__name__} worker with settings {self.get_settings()}")
+        self.thread = None
+        self._state.transition(ENGINE_IDLE, expected=ACTIVE_STATES)
+        return self.start()
+        
     def pause(self):
         """Pause the automation."""
         try:
-            if not self.running:
+            if not self._state.transition(ENGINE_PAUSED, expected=(ENGINE_RUNNING,)):
                 self.status_update.emit("Automation is not running")
                 return False
                 
-            self.paused = True
-            self._pause_event.clear()
+            # The worker wakes on the transition and parks until resumed
             self.status_update.emit("Automation paused")
             return True
         except Exception as e:
@@ -131,16 +289,13 @@ class AutomationBase(QObject):
     def resume(self):
         """Resume the automation."""
         try:
-            if not self.running:
-                self.status_update.emit("Automation is not running")
+            # The deadline went stale while paused
+            self._heartbeat()
+            if not self._state.transition(ENGINE_RUNNING, expected=(ENGINE_PAUSED,)):
+                self.status_update.emit("Automation is not paused" if self.is_running()
+                                        else "Automation is not running")
                 return False
                 
-            if not self.paused:
-                self.status_update.emit("Automation is not paused")
-                return False
-                
-            self.paused = False
-            self._pause_event.set()
             self.status_update.emit("Automation resumed")
             return True
         except Exception as e:
@@ -148,45 +303,177 @@ class AutomationBase(QObject):
             logger.error(error_msg)
             self.error_occurred.emit(error_msg)
             return False
+    
+    def wake(self):
+        """Wake the worker so it heartbeats now instead of at the end of its current wait."""
+        self._state.wake()
+    
+    def state(self):
+        """Return the engine state (one of the engine_state ENGINE_* names)."""
+        return self._state.current()
+    
+    def wait_for_state(self, states, timeout=None):
+        """Block until the engine reaches one of states; return False on timeout."""
+        return self._state.wait_for(states, timeout)
         
     def is_running(self):
-        """Check if automation is running."""
-        return self.running
+        """Check if automation is running (starting, running or paused)."""
+        return self._state.current() in ACTIVE_STATES
         
     def is_paused(self):
         """Check if automation is paused."""
-        return self.paused
+        return self._state.current() == ENGINE_PAUSED
+    
+    @property
+    def running(self):
+        return self.is_running()
+    
+    @property
+    def paused(self):
+        return self.is_paused()
+    
+    def _finish_run(self, failed=False):
+        """Record from the worker thread that the run is over (failed after a fatal error)."""
+        if threading.current_thread() is not self.thread:
+            # An abandoned worker must not end its replacement's run
+            return
+        self._state.transition(ENGINE_FAILED if failed else ENGINE_IDLE,
+                               expected=ACTIVE_STATES + (ENGINE_STOPPING,))
     
     def set_failsafe_active(self, active):
         """Set whether failsafe is active."""
         self.failsafe_active = active
+    
+    def get_settings(self):
+        """Return a snapshot of the current settings as a dict."""
+        return {name: getattr(self, name) for name in self.SETTINGS}
+    
+    @classmethod
+    def check_settings(cls, settings):
+        """Return settings with the schema entries checked and coerced.
         
-    def _check_failsafe(self):
-        """Check if failsafe should be triggered."""
-        if not self.failsafe_active:
-            return False
+        Raises plugins.PluginError for an invalid value; nothing is applied.
+        """
+        return {
+            name: coerce_setting(name, cls.SETTINGS_SCHEMA[name], value) if name in cls.SETTINGS_SCHEMA else value
+            for name, value in settings.items()
+        }
+    
+    def apply_settings(self, settings):
+        """Apply settings from a dict, ignoring unknown keys."""
+        applied = []
+        for name, value in self.check_settings(settings).items():
+            if name not in self.SETTINGS:
+                logger.warning(f"Ignoring unknown {type(self).__name__} setting: {name}")
+                continue
+            setattr(self, name, value)
+            applied.append(name)
+        return applied
         
-        try:
-            # Check current position for failsafe
-            x, y = pyautogui.position()
-            if x == 0 and y == 0:
-                self.status_update.emit("Failsafe triggered! Stopping automation.")
-                self.failsafe_triggered.emit()
+    def _seed_rng(self):
+        """Create this run's RNG from the configured seed, picking one if unset."""
+        seed = self.seed
+        if seed is None:
+            seed = random.SystemRandom().randrange(2 ** 32)
+        self.active_seed = seed
+        self.rng = random.Random(seed)
+        logger.info(f"{type(self).__name__} random seed: {seed}")
+    
+    def _stretch(self, low, high):
+        """Return an interval range adjusted by the power-aware rate controller."""
+        if self.rate_controller is None:
+            return low, high
+        return self.rate_controller.stretch(low, high)
+        
+    def _wait(self, seconds, until=None):
+        """Wait out an interval; return False if the worker should stop instead.
+        
+        The worker blocks on the engine state, so stop, pause and restart
+        wake it at once and nothing polls in between. While paused it is
+        parked with no timeout at all, and the part of the interval left
+        when it was paused is waited out after resume. If given, until()
+        is checked whenever wake() is called and ends the wait early.
+        """
+        deadline = time.monotonic() + seconds
+        while not self._should_stop():
+            state = self._state.current()
+            if state == ENGINE_PAUSED:
+                remaining = max(0.0, deadline - time.monotonic())
+                parked = time.monotonic()
+                while self._state.wait_change(ENGINE_PAUSED) == ENGINE_PAUSED:
+                    # Woken without a state change (profiler): heartbeat and park again
+                    self._heartbeat()
+                deadline = time.monotonic() + remaining
+                # The schedule moves on by the time spent parked
+                parked = time.monotonic() - parked
+                self._parked_total += parked
+                if self._action_due is not None:
+                    self._action_due += parked
+                if self._last_action_end is not None:
+                    self._last_action_end += parked
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (until is not None and until()):
                 return True
-        except:
-            pass
+            self._heartbeat(remaining)
+            self._state.wait_change(state, remaining)
         return False
-        
+    
+    def _wait_for_target(self, need_focus=True):
+        """Wait while the target window is missing (or unfocused); return False to stop."""
+        target = self.window_target
+        if target is None or (target.geometry is not None and (target.active or not need_focus)):
+            return True
+        self.status_update.emit(f"Waiting for the target window ({target.describe()})")
+        self._last_action_end = None
+        while target.geometry is None or (need_focus and not target.active):
+            if not self._wait(0.5):
+                return False
+            target = self.window_target
+            if target is None:
+                break
+        self.status_update.emit("Target window available; resuming")
+        return True
+    
+    def _target_area(self, screen_width, screen_height):
+        """Return the (left, top, right, bottom) area move targets are picked from."""
+        left, top, right, bottom = 50, 50, screen_width - 50, screen_height - 50
+        geometry = self.window_target.geometry if self.window_target is not None else None
+        if geometry is None:
+            return left, top, right, bottom
+        # Inside the target window, clipped to the screen and away from its edges
+        x, y, width, height = geometry
+        margin = min(50, width // 4, height // 4)
+        area = (max(x + margin, 5), max(y + margin, 5),
+                min(x + width - margin, screen_width - 5), min(y + height - margin, screen_height - 5))
+        if area[0] > area[2] or area[1] > area[3]:
+            return left, top, right, bottom
+        return area
+    
     def _run(self):
         """Main run method to be implemented by subclasses."""
         pass
 
 
+def seed_engines(engines, seed):
+    """Give each engine a seed derived from a master seed (None for fresh seeds)."""
+    for index, engine in enumerate(engines.values()):
+        engine.seed = None if seed is None else seed + index
+
+
 class MouseAutomation(AutomationBase):
     """Class to handle mouse movement automation."""
+    SETTINGS = AutomationBase.SETTINGS + (
+        "min_interval", "max_interval",
+        "between_min_interval", "between_max_interval",
+        "movement_path", "click_type",
+        "enable_scrolling", "scroll_min_amount", "scroll_max_amount",
+    )
+    # Whole-path move time, per-segment time beyond the planned duration, pause between moves
+    TIMINGS = ("move", "move_overhead", "pause")
     
-    def __init__(self):
-        super().__init__()
+    def __init__(self, backend=None):
+        super().__init__(backend)
         # Default settings
         self.min_interval = 1.0
         self.max_interval = 3.0
@@ -201,181 +488,144 @@ class MouseAutomation(AutomationBase):
         self.scroll_min_amount = -5  # Negative values scroll down
         self.scroll_max_amount = 5   # Positive values scroll up
     
-    def _check_failsafe(self):
-        """Check if mouse is in a failsafe position (top-left corner)."""
-        if not self.failsafe_active:
-            return False
-            
-        try:
-            x, y = pyautogui.position()
-            if x < 5 and y < 5:  # If mouse in top-left corner
-                self.status_update.emit("Failsafe triggered: Mouse in corner")
-                self.failsafe_triggered.emit()
-                return True
-        except Exception as e:
-            logger.warning(f"Error checking failsafe: {str(e)}")
-        
-        return False
-    
     def _safe_move(self, x, y, duration):
         """Safely move the mouse with error handling."""
+        started = time.time()
         try:
-            pyautogui.moveTo(x, y, duration=duration)
+            self._heartbeat(duration)
+            self.backend.move_to(x, y, duration=duration)
+            self._record_success()
+            self.timings["move_overhead"].record(max(0.0, time.time() - started - duration))
+            self._journal(ACTION_MOVE, x, y, started)
             return True
-        except pyautogui.PyAutoGUIException as e:
-            return self._handle_error(e)
         except Exception as e:
+            self._journal(ACTION_MOVE, x, y, started, OUTCOME_ERROR)
             return self._handle_error(e)
     
     def _safe_click(self):
         """Safely perform mouse click with error handling."""
+        # Journaled as (clicks, button): 1 = left, 3 = right
+        clicks, button = (2, 1) if self.click_type == "double" else (1, 3 if self.click_type == "right" else 1)
+        started = time.time()
         try:
             if self.click_type == "left":
-                pyautogui.click()
+                self.backend.click("left")
             elif self.click_type == "right":
-                pyautogui.rightClick()
+                self.backend.click("right")
             elif self.click_type == "double":
-                pyautogui.doubleClick()
+                self.backend.click("left", clicks=2)
+            self._record_success()
+            self._journal(ACTION_CLICK, clicks, button, started)
             return True
-        except pyautogui.PyAutoGUIException as e:
-            return self._handle_error(e)
         except Exception as e:
+            self._journal(ACTION_CLICK, clicks, button, started, OUTCOME_ERROR)
             return self._handle_error(e)
     
     def _safe_scroll(self, amount):
         """Safely scroll the mouse wheel with error handling."""
+        started = time.time()
         try:
-            pyautogui.scroll(amount)
+            self.backend.scroll(amount)
+            self._record_success()
+            self._journal(ACTION_SCROLL, amount, 0, started)
             return True
-        except pyautogui.PyAutoGUIException as e:
-            return self._handle_error(e)
         except Exception as e:
+            self._journal(ACTION_SCROLL, amount, 0, started, OUTCOME_ERROR)
             return self._handle_error(e)
     
+    def _plan_path(self, current, target):
+        """Plan a move as a list of (x, y, duration) segments for the current path mode."""
+        current_x, current_y = current
+        target_x, target_y = target
+        if self.movement_path == "straight":
+            duration = self.rng.uniform(self.min_interval, self.max_interval)
+            logger.info(f"Moving straight to {target_x}, {target_y} over {duration:.2f}s")
+            return [(target_x, target_y, duration)]
+        
+        if self.movement_path == "zigzag":
+            # Horizontal and vertical legs through the midpoint
+            mid_x = (current_x + target_x) // 2
+            mid_y = (current_y + target_y) // 2
+            logger.info(f"Moving zigzag from {current_x}, {current_y} to {target_x}, {target_y}")
+            return [(x, y, self.rng.uniform(self.min_interval/3, self.max_interval/3))
+                    for x, y in ((mid_x, current_y), (mid_x, mid_y), (target_x, mid_y), (target_x, target_y))]
+        
+        # Random path through points inside the bounding box
+        num_points = self.rng.randint(2, 5)
+        points = [(current_x, current_y)]
+        for _ in range(num_points):
+            points.append((
+                self.rng.randint(min(current_x, target_x), max(current_x, target_x)),
+                self.rng.randint(min(current_y, target_y), max(current_y, target_y))
+            ))
+        points.append((target_x, target_y))
+        logger.info(f"Moving randomly through {len(points)} points from {current_x}, {current_y} to {target_x}, {target_y}")
+        segment_duration = self.rng.uniform(self.min_interval, self.max_interval) / len(points)
+        return [(x, y, segment_duration) for x, y in points[1:]]
+    
     def _run(self):
         """Main loop for mouse automation."""
         try:
             # Get screen dimensions
             try:
-                screen_width, screen_height = pyautogui.size()
+                screen_width, screen_height = self.backend.size()
             except Exception as e:
                 error_msg = f"Failed to get screen size: {str(e)}"
                 logger.error(error_msg)
                 self.error_occurred.emit(error_msg)
-                self.running = False
+                self._finish_run(failed=True)
                 return
             
             self.status_update.emit(f"Mouse automation started (Screen size: {screen_width}x{screen_height})")
             
-            # Track when to perform the next action
-            next_action_time = time.time()
-            
-            while not self._stop_event.is_set() and self.running:
-                # Check failsafe
-                if self._check_failsafe():
-                    self.running = False
+            while not self._should_stop():
+                # Park here while paused
+                if not self._wait(0):
                     break
+                self._heartbeat()
                 
-                # Wait if paused
-                self._pause_event.wait()
-                
-                # Check if it's time for the next action
                 current_time = time.time()
-                if current_time < next_action_time:
-                    # Small sleep to reduce CPU usage
-                    time.sleep(0.1)
-                    continue
+                if self._last_action_end is not None:
+                    self.timings["pause"].record(current_time - self._last_action_end)
                 
                 try:
                     # Decide whether to move mouse or scroll
-                    action_type = "scroll" if (self.enable_scrolling and random.random() < 0.3) else "move"
+                    action_type = "scroll" if (self.enable_scrolling and self.rng.random() < 0.3) else "move"
                     
                     if action_type == "scroll":
                         # Perform random scrolling
-                        scroll_amount = random.randint(self.scroll_min_amount, self.scroll_max_amount)
+                        scroll_amount = self.rng.randint(self.scroll_min_amount, self.scroll_max_amount)
                         logger.info(f"Scrolling with amount: {scroll_amount}")
                         if self._safe_scroll(scroll_amount):
                             self.status_update.emit(f"Scrolled with amount: {scroll_amount}")
                     else:
+                        # Clicks must land on the target window, so they also need it focused
+                        if not self._wait_for_target(need_focus=self.click_type != "none"):
+                            break
+                        
                         # Get random target position, staying away from edges
-                        target_x = random.randint(50, screen_width - 50)
-                        target_y = random.randint(50, screen_height - 50)
+                        left, top, right, bottom = self._target_area(screen_width, screen_height)
+                        target_x = self.rng.randint(left, right)
+                        target_y = self.rng.randint(top, bottom)
                         
                         # Get current position
-                        current_x, current_y = pyautogui.position()
-                        
-                        # Move based on selected path
-                        if self.movement_path == "straight":
-                            duration = random.uniform(self.min_interval, self.max_interval)
-                            logger.info(f"Moving straight to {target_x}, {target_y} over {duration:.2f}s")
-                            if not self._safe_move(target_x, target_y, duration):
-                                continue
+                        current_x, current_y = self.backend.position()
                         
-                        elif self.movement_path == "zigzag":
-                            # Create a zigzag path
-                            mid_x = (current_x + target_x) // 2
-                            mid_y = (current_y + target_y) // 2
-                            
-                            logger.info(f"Moving zigzag from {current_x}, {current_y} to {target_x}, {target_y}")
-                            
-                            # First segment
-                            if self._stop_event.is_set() or not self.running or self._check_failsafe():
-                                break
-                            self._pause_event.wait()
-                            duration = random.uniform(self.min_interval/3, self.max_interval/3)
-                            if not self._safe_move(mid_x, current_y, duration):
-                                continue
-                            
-                            # Second segment
-                            if self._stop_event.is_set() or not self.running or self._check_failsafe():
-                                break
-                            self._pause_event.wait()
-                            duration = random.uniform(self.min_interval/3, self.max_interval/3)
-                            if not self._safe_move(mid_x, mid_y, duration):
-                                continue
-                            
-                            # Third segment
-                            if self._stop_event.is_set() or not self.running or self._check_failsafe():
+                        # Move through the planned path
+                        segments = self._plan_path((current_x, current_y), (target_x, target_y))
+                        move_started = time.time()
+                        moved = True
+                        for x, y, duration in segments:
+                            # A pause mid-path parks here and finishes the path on resume
+                            if not self._wait(0):
+                                moved = False
                                 break
-                            self._pause_event.wait()
-                            duration = random.uniform(self.min_interval/3, self.max_interval/3)
-                            if not self._safe_move(target_x, mid_y, duration):
-                                continue
-                            
-                            # Final segment
-                            if self._stop_event.is_set() or not self.running or self._check_failsafe():
+                            if not self._safe_move(x, y, duration):
+                                moved = False
                                 break
-                            self._pause_event.wait()
-                            duration = random.uniform(self.min_interval/3, self.max_interval/3)
-                            if not self._safe_move(target_x, target_y, duration):
-                                continue
-                        
-                        else:  # random path
-                            # Create random points for the path
-                            num_points = random.randint(2, 5)
-                            points = [(current_x, current_y)]
-                            
-                            for _ in range(num_points):
-                                points.append((
-                                    random.randint(min(current_x, target_x), max(current_x, target_x)),
-                                    random.randint(min(current_y, target_y), max(current_y, target_y))
-                                ))
-                            
-                            points.append((target_x, target_y))
-                            
-                            logger.info(f"Moving randomly through {len(points)} points from {current_x}, {current_y} to {target_x}, {target_y}")
-                            
-                            # Move through each point
-                            segment_duration = random.uniform(self.min_interval, self.max_interval) / len(points)
-                            for x, y in points[1:]:
-                                if self._stop_event.is_set() or not self.running:
-                                    break
-                                self._pause_event.wait()
-                                if self._check_failsafe():
-                                    self.running = False
-                                    return
-                                if not self._safe_move(x, y, segment_duration):
-                                    break
+                        if not moved:
+                            continue
+                        self.timings["move"].record(time.time() - move_started)
                         
                         # Perform click if specified and not none
                         if self.click_type != "none":
@@ -386,29 +636,19 @@ class MouseAutomation(AutomationBase):
                         # Update status
                         self.status_update.emit(f"Mouse moved to {target_x}, {target_y}")
                     
-                except pyautogui.PyAutoGUIException as e:
-                    if not self._handle_error(e):
-                        break
                 except Exception as e:
                     if not self._handle_error(e):
                         break
                 
                 # Wait before next movement
-                pause_time = random.uniform(self.between_min_interval, self.between_max_interval)
+                self._last_action_end = time.time()
+                pause_time = self.rng.uniform(*self._stretch(self.between_min_interval, self.between_max_interval))
                 logger.info(f"Pausing for {pause_time:.2f}s before next movement")
                 
                 # Set the time for the next action
-                next_action_time = time.time() + pause_time
-                
-                # Use a loop with small steps to allow for quicker response to stop/pause
-                start_time = time.time()
-                while time.time() - start_time < pause_time:
-                    if self._stop_event.is_set() or not self.running:
-                        break
-                    if self._check_failsafe():
-                        self.running = False
-                        return
-                    time.sleep(0.1)
+                self._action_due = time.time() + pause_time
+                if not self._wait(pause_time):
+                    break
             
             self.status_update.emit("Mouse automation completed normally")
                 
@@ -417,124 +657,141 @@ class MouseAutomation(AutomationBase):
             logger.error(f"Unhandled error in mouse automation: {str(e)}")
             self.error_occurred.emit(f"Unhandled error in mouse automation: {str(e)}")
         finally:
-            self.running = False
+            # Back to idle, unless a fatal error already failed the run
+            self._finish_run()
 
 
 class KeyboardAutomation(AutomationBase):
     """Class to handle keyboard typing automation."""
+    SETTINGS = AutomationBase.SETTINGS + (
+        "min_interval", "max_interval",
+        "text_to_type", "randomize_typing", "pause_before_repeat",
+        "mode", "keepalive_key", "keepalive_interval",
+    )
+    TIMINGS = ("keystroke",)
     
-    def __init__(self):
-        super().__init__()
+    def __init__(self, backend=None):
+        super().__init__(backend)
         # Default settings
         self.min_interval = 0.1
         self.max_interval = 0.3
         self.text_to_type = "The quick brown fox jumps over the lazy dog."
         self.randomize_typing = True
         self.pause_before_repeat = 2.0  # Seconds to wait before repeating the text
-    
-    def _check_failsafe(self):
-        """Check if mouse is in a failsafe position (top-left corner)."""
-        if not self.failsafe_active:
-            return False
-            
-        try:
-            x, y = pyautogui.position()
-            if x < 5 and y < 5:  # If mouse in top-left corner
-                self.status_update.emit("Failsafe triggered: Mouse in corner")
-                self.failsafe_triggered.emit()
-                return True
-        except Exception as e:
-            logger.warning(f"Error checking failsafe: {str(e)}")
-        
-        return False
+        # "text" types text_to_type; "keys" taps a harmless key (KEEPALIVE_KEYS) instead
+        self.mode = "text"
+        self.keepalive_key = "shift"
+        self.keepalive_interval = 60.0
     
     def _safe_type(self, char):
         """Safely type a character with error handling."""
+        started = time.time()
+        if self._last_action_end is not None:
+            self.timings["keystroke"].record(started - self._last_action_end)
         try:
-            pyautogui.write(char)
+            self._heartbeat()
+            self.backend.write(char)
+            self._record_success()
+            self._journal(ACTION_KEY, ord(char), 0, started)
+            self._last_action_end = time.time()
             return True
-        except pyautogui.PyAutoGUIException as e:
+        except Exception as e:
+            self._journal(ACTION_KEY, ord(char), 0, started, OUTCOME_ERROR)
             return self._handle_error(e)
+    
+    def _safe_tap(self, key):
+        """Safely tap a keep-alive key with error handling."""
+        # Scroll Lock toggles, so tap it twice to leave the LED and state unchanged
+        presses = 2 if key == "scrolllock" else 1
+        code = KEEPALIVE_KEYS.index(key) + 1
+        started = time.time()
+        if self._last_action_end is not None:
+            self.timings["keystroke"].record(started - self._last_action_end)
+        try:
+            self._heartbeat()
+            self.backend.tap(key, presses)
+            self._record_success()
+            self._journal(ACTION_KEY, presses, code, started)
+            self._last_action_end = time.time()
+            return True
         except Exception as e:
+            self._journal(ACTION_KEY, presses, code, started, OUTCOME_ERROR)
             return self._handle_error(e)
     
+    def _run_keys(self):
+        """Keep-alive loop tapping a non-printing key, safe whatever has focus."""
+        key = self.keepalive_key
+        self.status_update.emit(f"Keyboard keep-alive started ({key} every {self.keepalive_interval:.0f}s)")
+        while not self._should_stop():
+            interval = self._stretch(self.keepalive_interval, self.keepalive_interval)[0]
+            self._action_due = time.time() + interval
+            if not self._wait(interval):
+                break
+            if not self._safe_tap(self.keepalive_key):
+                break
+            logger.debug(f"Tapped {self.keepalive_key}")
+        self.status_update.emit("Keyboard keep-alive completed normally")
+    
     def _run(self):
         """Main loop for keyboard automation."""
         try:
+            if self.mode == "keys":
+                self._run_keys()
+                return
+            
             if not self.text_to_type:
                 # Use a default text instead of stopping
                 self.text_to_type = "The quick brown fox jumps over the lazy dog."
                 self.status_update.emit("No text provided. Using default text.")
                 
             self.status_update.emit("Keyboard automation started")
-            retry_count = 0
             
-            while not self._stop_event.is_set() and self.running:
+            while not self._should_stop():
                 try:
                     # Type the text character by character
                     for char in self.text_to_type:
-                        # Check if we should stop
-                        if self._stop_event.is_set() or not self.running:
+                        # Park here while paused; stop if asked to
+                        if not self._wait(0):
                             break
                         
-                        # Check failsafe
-                        if self._check_failsafe():
-                            self.running = False
+                        # Keystrokes only go to the target window while it has focus
+                        if not self._wait_for_target():
                             break
                         
-                        # Wait if paused
-                        self._pause_event.wait()
-                        
                         # Type the character
                         logger.debug(f"Typing character: '{char}'")
                         if not self._safe_type(char):
-                            retry_count += 1
-                            if retry_count >= 3:
-                                self.status_update.emit("Too many typing errors, pausing briefly")
-                                time.sleep(1.0)
-                                retry_count = 0
-                            continue
+                            # The error policy gave up and stopped the automation
+                            break
                         
                         # Update status (don't flood with updates)
-                        if random.random() < 0.1:  # Only update ~10% of the time
+                        if self.rng.random() < 0.1:  # Only update ~10% of the time
                             self.status_update.emit(f"Typed: {char}")
                         
                         # Wait random interval if randomized, or fixed interval
                         wait_time = 0
                         if self.randomize_typing:
-                            wait_time = random.uniform(self.min_interval, self.max_interval)
+                            wait_time = self.rng.uniform(*self._stretch(self.min_interval, self.max_interval))
                         else:
-                            wait_time = self.min_interval
+                            wait_time = self._stretch(self.min_interval, self.min_interval)[0]
                         
-                        # Break waiting into smaller chunks to check for stop/pause
-                        wait_start = time.time()
-                        while time.time() - wait_start < wait_time:
-                            if self._stop_event.is_set() or not self.running:
-                                break
-                            if self._check_failsafe():
-                                self.running = False
-                                return
-                            time.sleep(min(0.05, wait_time))  # Small sleep to reduce CPU usage
+                        self._action_due = time.time() + wait_time
+                        if not self._wait(wait_time):
+                            break
+                    
+                    # Text completed; the repeat pause is not a keystroke interval
+                    self._last_action_end = None
                     
-                    # Text completed, update status
+                    # Update status
                     self.status_update.emit(f"Completed typing text ({len(self.text_to_type)} characters)")
                     
                     # Wait before repeating
-                    logger.info(f"Waiting {self.pause_before_repeat} seconds before repeating text")
+                    repeat_pause = self._stretch(self.pause_before_repeat, self.pause_before_repeat)[0]
+                    logger.info(f"Waiting {repeat_pause:.2f} seconds before repeating text")
                     
-                    # Break waiting into smaller chunks to check for stop/pause
-                    wait_start = time.time()
-                    while time.time() - wait_start < self.pause_before_repeat:
-                        if self._stop_event.is_set() or not self.running:
-                            break
-                        if self._check_failsafe():
-                            self.running = False
-                            return
-                        time.sleep(0.1)  # Small sleep to reduce CPU usage
+                    self._action_due = time.time() + repeat_pause
+                    self._wait(repeat_pause)
                 
-                except pyautogui.PyAutoGUIException as e:
-                    if not self._handle_error(e):
-                        break
                 except Exception as e:
                     if not self._handle_error(e):
                         break
@@ -547,4 +804,5 @@ class KeyboardAutomation(AutomationBase):
             self.status_update.emit(error_msg)
             self.error_occurred.emit(error_msg)
         finally:
-            self.running = False 
\ No newline at end of file
+            # Back to idle, unless a fatal error already failed the run
+            self._finish_run()
\ No newline at end of file
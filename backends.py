@@ -0,0 +1,645 @@
+#!/usr/bin/env python3
+import os
+import sys
+import stat
+import time
+import fcntl
+import struct
+import logging
+import threading
+
+logger = logging.getLogger("LetMeSleep")
+
+# Cursor positions younger than this (seconds) are served from the cache
+POSITION_MAX_AGE = 0.005
+# The screen size is re-queried at most this often (seconds)
+SIZE_MAX_AGE = 30.0
+
+# Keys the keyboard keep-alive mode taps: they register as input but type nothing
+KEEPALIVE_KEYS = ("shift", "f15", "scrolllock")
+
+
+class InputBackend:
+    """Interface the engines use to inject input and query the screen.
+
+    Subclasses implement _query_size and _query_position; size() and
+    position() serve recent answers from a cache stamped with the time of
+    the query, and moves refresh the cached position for free.
+    """
+
+    name = "base"
+    # False when position() only knows our own moves, so the failsafe corner cannot be seen
+    reads_pointer = True
+
+    def __init__(self):
+        # (value, monotonic timestamp); swapped as one tuple so readers never see a torn pair
+        self._position_cache = (None, 0.0)
+        self._size_cache = (None, 0.0)
+
+    def size(self):
+        """Return the screen size as (width, height)."""
+        size, stamp = self._size_cache
+        now = time.monotonic()
+        if size is None or now - stamp > SIZE_MAX_AGE:
+            size = tuple(self._query_size())
+            self._size_cache = (size, now)
+        return size
+
+    def position(self, max_age=POSITION_MAX_AGE):
+        """Return the cursor position as (x, y), at most max_age seconds old."""
+        position, stamp = self._position_cache
+        if position is not None and time.monotonic() - stamp <= max_age:
+            return position
+        position = tuple(self._query_position())
+        self._position_cache = (position, time.monotonic())
+        return position
+
+    def _remember_position(self, x, y):
+        """Record a cursor position we know without asking the display."""
+        self._position_cache = ((x, y), time.monotonic())
+
+    def _query_size(self):
+        """Ask the display for the screen size."""
+        raise NotImplementedError
+
+    def _query_position(self):
+        """Ask the display for the cursor position."""
+        raise NotImplementedError
+
+    def move_to(self, x, y, duration=0.0):
+        """Move the cursor to (x, y) over duration seconds."""
+        raise NotImplementedError
+
+    def click(self, button="left", clicks=1):
+        """Click a mouse button at the current position."""
+        raise NotImplementedError
+
+    def scroll(self, amount):
+        """Scroll the wheel; positive scrolls up."""
+        raise NotImplementedError
+
+    def write(self, text):
+        """Type text at the current focus."""
+        raise NotImplementedError
+
+    def key_down(self, key):
+        """Press a named key (one of KEEPALIVE_KEYS) without releasing it."""
+        raise NotImplementedError
+
+    def key_up(self, key):
+        """Release a named key."""
+        raise NotImplementedError
+
+    def tap(self, key, presses=1):
+        """Press and release a named key presses times."""
+        for _ in range(presses):
+            self.key_down(key)
+            self.key_up(key)
+
+    def close(self):
+        """Release any resources held by the backend."""
+        pass
+
+
+class PyAutoGUIBackend(InputBackend):
+    """Backend that goes through pyautogui (the default).
+
+    On Linux, position and size queries bypass pyautogui's platform layer
+    and use one long-lived X display connection per thread (pyautogui's own
+    module-level connection is not safe to share between engine threads).
+    """
+
+    name = "pyautogui"
+
+    def __init__(self):
+        super().__init__()
+        # Imported here, so engines on other backends run without a display
+        import pyautogui
+        pyautogui.FAILSAFE = True  # Moving mouse to corner (0,0) will abort
+        self._pyautogui = pyautogui
+        self._local = threading.local()
+        self._use_xlib = False
+        if sys.platform.startswith("linux"):
+            try:
+                import Xlib.display
+                self._use_xlib = True
+            except ImportError:
+                pass
+
+    def _thread_display(self):
+        """Return this thread's display connection, opening it on first use."""
+        display = getattr(self._local, "display", None)
+        if display is None:
+            import Xlib.display
+            display = self._local.display = Xlib.display.Display()
+        return display
+
+    def _query_size(self):
+        if self._use_xlib:
+            screen = self._thread_display().screen()
+            return screen.width_in_pixels, screen.height_in_pixels
+        return self._pyautogui.size()
+
+    def _query_position(self):
+        if not self._use_xlib:
+            return self._pyautogui.position()
+        try:
+            pointer = self._thread_display().screen().root.query_pointer()
+        except Exception:
+            # Reconnect on the next query
+            self._local.display = None
+            raise
+        return pointer.root_x, pointer.root_y
+
+    def move_to(self, x, y, duration=0.0):
+        self._pyautogui.moveTo(x, y, duration=duration)
+        self._remember_position(x, y)
+
+    def click(self, button="left", clicks=1):
+        self._pyautogui.click(button=button, clicks=clicks)
+
+    def scroll(self, amount):
+        self._pyautogui.scroll(amount)
+
+    def write(self, text):
+        self._pyautogui.write(text)
+
+    def key_down(self, key):
+        # Skip pyautogui's per-call PAUSE sleep; the engine paces its own taps
+        self._pyautogui.keyDown(key, _pause=False)
+
+    def key_up(self, key):
+        self._pyautogui.keyUp(key, _pause=False)
+
+
+class SimulatedBackend(InputBackend):
+    """In-memory backend that records every injected event.
+
+    Nothing reaches the real display, which makes it suitable for
+    benchmarks and reproducible runs: with a fixed seed, two runs produce
+    the same recorded event list. With realtime enabled, moves take their
+    requested duration and the cursor is interpolated along the way.
+    """
+
+    name = "simulated"
+
+    def __init__(self, width=1920, height=1080, realtime=True, step=0.01):
+        super().__init__()
+        self.width = width
+        self.height = height
+        self.realtime = realtime
+        self.step = step
+        self.events = []
+        self._position = (width // 2, height // 2)
+        self._lock = threading.Lock()
+
+    def _record(self, *event):
+        with self._lock:
+            self.events.append(event)
+
+    def _query_size(self):
+        return self.width, self.height
+
+    def _query_position(self):
+        return self._position
+
+    def move_to(self, x, y, duration=0.0):
+        self._record("move", x, y, round(duration, 6))
+        start_x, start_y = self._position
+        if self.realtime and duration > 0:
+            # Linear interpolation, like pyautogui's default tween
+            started = time.perf_counter()
+            while True:
+                progress = (time.perf_counter() - started) / duration
+                if progress >= 1.0:
+                    break
+                self._position = (round(start_x + (x - start_x) * progress),
+                                  round(start_y + (y - start_y) * progress))
+                time.sleep(self.step)
+        self._position = (x, y)
+        self._remember_position(x, y)
+
+    def click(self, button="left", clicks=1):
+        self._record("click", button, clicks)
+
+    def scroll(self, amount):
+        self._record("scroll", amount)
+
+    def write(self, text):
+        self._record("write", text)
+
+    def key_down(self, key):
+        self._record("key_down", key)
+
+    def key_up(self, key):
+        self._record("key_up", key)
+
+    def clear(self):
+        """Forget all recorded events."""
+        with self._lock:
+            self.events.clear()
+
+
+class XTestBackend(InputBackend):
+    """Native X11 backend injecting events through the XTEST extension.
+
+    Keeps one display connection open for the backend's lifetime (shared by
+    the engines under a lock) instead of going through pyautogui's tweening,
+    sleeps and failsafe checks. Moves are sent as one absolute motion event
+    per frame with a single flush each, and clicks, scrolls and keystrokes
+    are batched into one flush per call. Requires python-xlib, which
+    pyautogui already depends on under Linux; works against Xvfb.
+    """
+
+    name = "xtest"
+
+    BUTTONS = {"left": 1, "middle": 2, "right": 3}
+    SCROLL_UP = 4
+    SCROLL_DOWN = 5
+
+    # Characters whose keysym is not simply their code point
+    SPECIAL_KEYSYMS = {"\n": "Return", "\r": "Return", "\t": "Tab", " ": "space"}
+    # Keysyms of the named keep-alive keys
+    KEY_KEYSYMS = {"shift": "Shift_L", "f15": "F15", "scrolllock": "Scroll_Lock"}
+
+    def __init__(self, display_name=None, frame_rate=60):
+        super().__init__()
+        from Xlib import X, XK
+        from Xlib.display import Display
+        from Xlib.ext import xtest
+        self._X = X
+        self._XK = XK
+        self._xtest = xtest
+        self._display = Display(display_name)
+        if not self._display.has_extension("XTEST"):
+            self._display.close()
+            raise RuntimeError("X server does not support the XTEST extension")
+        self._screen = self._display.screen()
+        self._root = self._screen.root
+        self._lock = threading.Lock()
+        self.frame_interval = 1.0 / frame_rate
+        self._keycodes = {}
+        self._shift_keycode = self._display.keysym_to_keycode(XK.string_to_keysym("Shift_L"))
+
+    def _query_size(self):
+        return self._screen.width_in_pixels, self._screen.height_in_pixels
+
+    def _query_position(self):
+        with self._lock:
+            pointer = self._root.query_pointer()
+        return pointer.root_x, pointer.root_y
+
+    def _fake(self, event_type, detail=0, x=0, y=0):
+        """Queue one fake input event; the caller flushes."""
+        self._xtest.fake_input(self._display, event_type, detail, x=x, y=y)
+
+    def move_to(self, x, y, duration=0.0):
+        x, y = int(x), int(y)
+        frames = int(duration / self.frame_interval) if duration > 0 else 0
+        if frames <= 1:
+            with self._lock:
+                self._fake(self._X.MotionNotify, x=x, y=y)
+                self._display.flush()
+            self._remember_position(x, y)
+            return
+
+        start_x, start_y = self.position()
+        started = time.perf_counter()
+        for frame in range(1, frames + 1):
+            progress = frame / frames
+            with self._lock:
+                self._fake(self._X.MotionNotify,
+                           x=round(start_x + (x - start_x) * progress),
+                           y=round(start_y + (y - start_y) * progress))
+                self._display.flush()
+            # Sleep until the next frame boundary, absorbing injection overhead
+            delay = started + frame * self.frame_interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        self._remember_position(x, y)
+
+    def click(self, button="left", clicks=1):
+        detail = self.BUTTONS[button]
+        with self._lock:
+            for _ in range(clicks):
+                self._fake(self._X.ButtonPress, detail)
+                self._fake(self._X.ButtonRelease, detail)
+            self._display.flush()
+
+    def scroll(self, amount):
+        detail = self.SCROLL_UP if amount > 0 else self.SCROLL_DOWN
+        with self._lock:
+            for _ in range(abs(int(amount))):
+                self._fake(self._X.ButtonPress, detail)
+                self._fake(self._X.ButtonRelease, detail)
+            self._display.flush()
+
+    def _keycode_for(self, char):
+        """Return (keycode, needs_shift) for a character, cached."""
+        if char not in self._keycodes:
+            name = self.SPECIAL_KEYSYMS.get(char)
+            keysym = self._XK.string_to_keysym(name) if name else ord(char)
+            if keysym > 0xff:
+                # Unicode keysyms, per the X11 keysym encoding
+                keysym |= 0x01000000
+            keycode = self._display.keysym_to_keycode(keysym)
+            needs_shift = bool(keycode) and self._display.keycode_to_keysym(keycode, 0) != keysym
+            self._keycodes[char] = (keycode, needs_shift)
+        return self._keycodes[char]
+
+    def write(self, text):
+        with self._lock:
+            for char in text:
+                keycode, needs_shift = self._keycode_for(char)
+                if not keycode:
+                    logger.warning(f"No keycode for character {char!r}; skipping")
+                    continue
+                if needs_shift:
+                    self._fake(self._X.KeyPress, self._shift_keycode)
+                self._fake(self._X.KeyPress, keycode)
+                self._fake(self._X.KeyRelease, keycode)
+                if needs_shift:
+                    self._fake(self._X.KeyRelease, self._shift_keycode)
+            self._display.flush()
+
+    def _key_keycode(self, key):
+        """Return the keycode of a named key, cached."""
+        if key not in self._keycodes:
+            keysym = self._XK.string_to_keysym(self.KEY_KEYSYMS[key])
+            self._keycodes[key] = self._display.keysym_to_keycode(keysym)
+        keycode = self._keycodes[key]
+        if not keycode:
+            raise ValueError(f"Key {key} is not mapped in the X keyboard map")
+        return keycode
+
+    def key_down(self, key):
+        with self._lock:
+            self._fake(self._X.KeyPress, self._key_keycode(key))
+            self._display.flush()
+
+    def key_up(self, key):
+        with self._lock:
+            self._fake(self._X.KeyRelease, self._key_keycode(key))
+            self._display.flush()
+
+    def tap(self, key, presses=1):
+        with self._lock:
+            keycode = self._key_keycode(key)
+            for _ in range(presses):
+                self._fake(self._X.KeyPress, keycode)
+                self._fake(self._X.KeyRelease, keycode)
+            self._display.flush()
+
+    def close(self):
+        with self._lock:
+            self._display.close()
+
+
+# Linux input event codes (linux/input-event-codes.h)
+EV_SYN, EV_KEY, EV_REL, EV_ABS = 0x00, 0x01, 0x02, 0x03
+SYN_REPORT = 0
+ABS_X, ABS_Y = 0x00, 0x01
+REL_WHEEL = 0x08
+BTN_LEFT, BTN_RIGHT, BTN_MIDDLE = 0x110, 0x111, 0x112
+KEY_LEFTSHIFT = 42
+KEY_SCROLLLOCK = 70
+KEY_F15 = 185
+
+# uinput ioctls (linux/uinput.h)
+UI_DEV_CREATE = 0x5501
+UI_DEV_DESTROY = 0x5502
+UI_SET_EVBIT = 0x40045564
+UI_SET_KEYBIT = 0x40045565
+UI_SET_RELBIT = 0x40045566
+UI_SET_ABSBIT = 0x40045567
+UINPUT_MAX_NAME_SIZE = 80
+ABS_CNT = 64
+
+# struct input_event: struct timeval, __u16 type, __u16 code, __s32 value
+_INPUT_EVENT = struct.Struct("llHHi")
+
+# US layout: character -> (keycode, needs_shift)
+_UNSHIFTED = {
+    "1": 2, "2": 3, "3": 4, "4": 5, "5": 6, "6": 7, "7": 8, "8": 9, "9": 10, "0": 11,
+    "-": 12, "=": 13, "\t": 15, "[": 26, "]": 27, "\n": 28, ";": 39, "'": 40, "`": 41,
+    "\\": 43, ",": 51, ".": 52, "/": 53, " ": 57,
+}
+_SHIFTED = {
+    "!": "1", "@": "2", "#": "3", "$": "4", "%": "5", "^": "6", "&": "7", "*": "8",
+    "(": "9", ")": "0", "_": "-", "+": "=", "{": "[", "}": "]", ":": ";", '"': "'",
+    "~": "`", "|": "\\", "<": ",", ">": ".", "?": "/",
+}
+_LETTER_ROWS = (("qwertyuiop", 16), ("asdfghjkl", 30), ("zxcvbnm", 44))
+
+US_KEYMAP = {char: (code, False) for char, code in _UNSHIFTED.items()}
+US_KEYMAP.update((char, (_UNSHIFTED[base], True)) for char, base in _SHIFTED.items())
+for _row, _first in _LETTER_ROWS:
+    for _offset, _letter in enumerate(_row):
+        US_KEYMAP[_letter] = (_first + _offset, False)
+        US_KEYMAP[_letter.upper()] = (_first + _offset, True)
+US_KEYMAP["\r"] = US_KEYMAP["\n"]
+
+
+class UInputBackend(InputBackend):
+    """Kernel-level backend injecting events through /dev/uinput.
+
+    Works under Wayland, where X11 injection either fails or only reaches
+    XWayland clients. Creates a virtual absolute pointer plus keyboard and
+    writes raw input_event structs, each click, scroll, keystroke batch or
+    motion frame in a single write. Wayland does not let clients read the
+    pointer, so the position is tracked from our own moves (physical mouse
+    movement, including a move into the failsafe corner, is not seen).
+
+    When device is not a character device (a regular file or FIFO), the
+    ioctls are skipped and events are simply written to it, which serves as
+    a stand-in for tests. Text is mapped with a US keyboard layout.
+    """
+
+    name = "uinput"
+    reads_pointer = False
+
+    BUTTONS = {"left": BTN_LEFT, "middle": BTN_MIDDLE, "right": BTN_RIGHT}
+    KEYS = {"shift": KEY_LEFTSHIFT, "f15": KEY_F15, "scrolllock": KEY_SCROLLLOCK}
+
+    def __init__(self, device="/dev/uinput", width=1920, height=1080, frame_rate=60,
+                 keymap=None):
+        super().__init__()
+        self.device = device
+        self.width = width
+        self.height = height
+        self.frame_interval = 1.0 / frame_rate
+        self.keymap = keymap or US_KEYMAP
+        self._lock = threading.Lock()
+        self._fd = os.open(device, os.O_WRONLY | os.O_NONBLOCK)
+        self._is_device = stat.S_ISCHR(os.fstat(self._fd).st_mode)
+        if self._is_device:
+            try:
+                self._create_device()
+            except OSError:
+                os.close(self._fd)
+                raise
+        self._position = (width // 2, height // 2)
+        self._remember_position(*self._position)
+
+    def _create_device(self):
+        """Register the virtual pointer and keyboard with the kernel."""
+        fd = self._fd
+        for ev_type in (EV_KEY, EV_REL, EV_ABS):
+            fcntl.ioctl(fd, UI_SET_EVBIT, ev_type)
+        keycodes = {code for code, _ in self.keymap.values()}
+        keycodes.update((*self.KEYS.values(), *self.BUTTONS.values()))
+        for code in sorted(keycodes):
+            fcntl.ioctl(fd, UI_SET_KEYBIT, code)
+        fcntl.ioctl(fd, UI_SET_RELBIT, REL_WHEEL)
+        for axis in (ABS_X, ABS_Y):
+            fcntl.ioctl(fd, UI_SET_ABSBIT, axis)
+
+        # Legacy struct uinput_user_dev: name, input_id, ff_effects_max,
+        # then absmax/absmin/absfuzz/absflat arrays
+        absmax = [0] * ABS_CNT
+        absmax[ABS_X] = self.width - 1
+        absmax[ABS_Y] = self.height - 1
+        setup = struct.pack(f"{UINPUT_MAX_NAME_SIZE}sHHHHi{ABS_CNT * 4}i",
+                            b"LetMeSleep virtual input", 0x06, 0x1, 0x1, 1, 0,
+                            *absmax, *([0] * ABS_CNT * 3))
+        os.write(fd, setup)
+        fcntl.ioctl(fd, UI_DEV_CREATE)
+        # Give the compositor time to pick up the new device
+        time.sleep(0.2)
+
+    def _pack(self, events):
+        """Pack (type, code, value) tuples, making sure they end with a sync report."""
+        now = time.time()
+        seconds, micros = int(now), int((now % 1) * 1e6)
+        data = bytearray()
+        for ev_type, code, value in events:
+            data += _INPUT_EVENT.pack(seconds, micros, ev_type, code, value)
+        if events[-1][0] != EV_SYN:
+            data += _INPUT_EVENT.pack(seconds, micros, EV_SYN, SYN_REPORT, 0)
+        return data
+
+    def _emit(self, events):
+        """Write one batch of events in a single write (an empty batch writes nothing)."""
+        if not events:
+            return
+        data = self._pack(events)
+        with self._lock:
+            os.write(self._fd, data)
+
+    def _query_size(self):
+        return self.width, self.height
+
+    def _query_position(self):
+        return self._position
+
+    def _move(self, x, y):
+        x = min(max(int(x), 0), self.width - 1)
+        y = min(max(int(y), 0), self.height - 1)
+        self._emit(((EV_ABS, ABS_X, x), (EV_ABS, ABS_Y, y)))
+        self._position = (x, y)
+
+    def move_to(self, x, y, duration=0.0):
+        frames = int(duration / self.frame_interval) if duration > 0 else 0
+        if frames > 1:
+            start_x, start_y = self._position
+            started = time.perf_counter()
+            for frame in range(1, frames):
+                progress = frame / frames
+                self._move(round(start_x + (x - start_x) * progress),
+                           round(start_y + (y - start_y) * progress))
+                # Sleep until the next frame boundary, absorbing injection overhead
+                delay = started + frame * self.frame_interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        self._move(x, y)
+        self._remember_position(*self._position)
+
+    def click(self, button="left", clicks=1):
+        code = self.BUTTONS[button]
+        events = []
+        for _ in range(clicks):
+            events += [(EV_KEY, code, 1), (EV_SYN, SYN_REPORT, 0),
+                       (EV_KEY, code, 0), (EV_SYN, SYN_REPORT, 0)]
+        self._emit(events)
+
+    def scroll(self, amount):
+        if int(amount) == 0:
+            return
+        step = 1 if amount > 0 else -1
+        self._emit([(EV_REL, REL_WHEEL, step), (EV_SYN, SYN_REPORT, 0)] * abs(int(amount)))
+
+    def write(self, text):
+        events = []
+        for char in text:
+            if char not in self.keymap:
+                logger.warning(f"No keycode for character {char!r}; skipping")
+                continue
+            keycode, needs_shift = self.keymap[char]
+            if needs_shift:
+                events.append((EV_KEY, KEY_LEFTSHIFT, 1))
+            events += [(EV_KEY, keycode, 1), (EV_SYN, SYN_REPORT, 0), (EV_KEY, keycode, 0)]
+            if needs_shift:
+                events.append((EV_KEY, KEY_LEFTSHIFT, 0))
+            events.append((EV_SYN, SYN_REPORT, 0))
+        if events:
+            self._emit(events)
+
+    def key_down(self, key):
+        self._emit([(EV_KEY, self.KEYS[key], 1)])
+
+    def key_up(self, key):
+        self._emit([(EV_KEY, self.KEYS[key], 0)])
+
+    def tap(self, key, presses=1):
+        code = self.KEYS[key]
+        self._emit([(EV_KEY, code, 1), (EV_SYN, SYN_REPORT, 0),
+                    (EV_KEY, code, 0), (EV_SYN, SYN_REPORT, 0)] * presses)
+
+    def close(self):
+        with self._lock:
+            if self._fd is None:
+                return
+            if self._is_device:
+                try:
+                    fcntl.ioctl(self._fd, UI_DEV_DESTROY)
+                except OSError:
+                    pass
+            os.close(self._fd)
+            self._fd = None
+
+
+BACKENDS = {
+    "pyautogui": PyAutoGUIBackend,
+    "simulated": SimulatedBackend,
+    "uinput": UInputBackend,
+    "xtest": XTestBackend,
+}
+
+
+def detect_backend(environ=None, uinput_device="/dev/uinput"):
+    """Pick a backend for the current session: uinput on Wayland, else pyautogui."""
+    environ = os.environ if environ is None else environ
+    wayland = (environ.get("XDG_SESSION_TYPE", "").lower() == "wayland"
+               or bool(environ.get("WAYLAND_DISPLAY")))
+    if not wayland:
+        return "pyautogui"
+    if os.access(uinput_device, os.W_OK):
+        return "uinput"
+    logger.warning(f"Wayland session but {uinput_device} is not writable; "
+                   "falling back to pyautogui through XWayland")
+    return "pyautogui"
+
+
+def create_backend(name="pyautogui", **options):
+    """Create an input backend by name; "auto" probes the session type."""
+    if name == "auto":
+        name = detect_backend()
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown input backend: {name}")
+    logger.info(f"Using {name} input backend")
+    if not backend_class.reads_pointer:
+        logger.warning(f"The {name} input backend cannot read the pointer position: "
+                       "moving the mouse to the corner will NOT stop the automation (failsafe unavailable)")
+    return backend_class(**options)
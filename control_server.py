@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""Local control API for the automation engines.
+
+The protocol is line based over a Unix socket (or a localhost TCP port):
+each request is one line, either a bare command such as ``pause`` or
+``profile office``, or a JSON object such as
+``{"id": 7, "cmd": "profile", "name": "office"}``. Each request gets
+exactly one JSON line back, echoing the request ``id`` so clients can
+pipeline requests on a persistent connection and measure latency end
+to end. ``elapsed_us`` in the response is the server-side handling time.
+
+Usage as a client:
+    python control_server.py --socket ~/.letmesleep/control.sock status
+"""
+import os
+import sys
+import json
+import time
+import socket
+import logging
+import argparse
+import threading
+import socketserver
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot, Qt
+
+from profiles import load_profile, list_profiles, ProfileError
+from scheduler import ActivitySchedule, ScheduleError
+from plugins import PluginError
+from window_target import WindowTargetError
+from engine_profiler import ProfilerError
+from idle_timeout import IdleTimeoutError
+
+logger = logging.getLogger("LetMeSleep")
+
+DEFAULT_SOCKET_PATH = os.path.join(os.path.expanduser("~"), ".letmesleep", "control.sock")
+
+# Largest request line accepted from a client
+MAX_REQUEST_SIZE = 64 * 1024
+
+
+class ControlError(Exception):
+    """Exception raised for invalid control requests."""
+    pass
+
+
+def parse_request(line):
+    """Parse a request line into a dict with at least a "cmd" key."""
+    line = line.strip()
+    if not line:
+        raise ControlError("Empty request")
+    if line.startswith("{"):
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            raise ControlError(f"Invalid JSON request: {str(e)}")
+        if not isinstance(request, dict) or "cmd" not in request:
+            raise ControlError("JSON request must be an object with a 'cmd' key")
+        return request
+
+    # Compact form: "<cmd> [arg]"
+    parts = line.split(None, 1)
+    request = {"cmd": parts[0]}
+    if len(parts) > 1:
+        request["name"] = parts[1]
+    return request
+
+
+class ControlBridge(QObject):
+    """Run control commands on the GUI thread on behalf of server threads."""
+
+    _request = pyqtSignal(object)
+
+    def __init__(self, controller):
+        super().__init__()
+        self.controller = controller
+        # Blocking so the server thread gets the result back synchronously
+        self._request.connect(self._execute, Qt.BlockingQueuedConnection)
+
+    def call(self, request):
+        """Execute a request and return the response dict."""
+        holder = {"request": request}
+        if threading.current_thread() is threading.main_thread():
+            self._execute(holder)
+        else:
+            self._request.emit(holder)
+        return holder["response"]
+
+    @pyqtSlot(object)
+    def _execute(self, holder):
+        """Dispatch a request to the controller."""
+        request = holder["request"]
+        try:
+            result = self.dispatch(request)
+            holder["response"] = {"ok": True, "result": result}
+        except (ControlError, ProfileError, ScheduleError, PluginError, WindowTargetError,
+                ProfilerError, IdleTimeoutError) as e:
+            holder["response"] = {"ok": False, "error": str(e)}
+        except Exception as e:
+            logger.error(f"Control command '{request.get('cmd')}' failed: {str(e)}")
+            holder["response"] = {"ok": False, "error": f"Internal error: {str(e)}"}
+
+    def dispatch(self, request):
+        """Run a single command against the controller."""
+        cmd = request["cmd"]
+        controller = self.controller
+        if cmd == "ping":
+            return "pong"
+        elif cmd == "status":
+            return controller.status()
+        elif cmd == "start":
+            return controller.start()
+        elif cmd == "stop":
+            return controller.stop()
+        elif cmd == "pause":
+            return controller.pause()
+        elif cmd == "resume":
+            return controller.resume()
+        elif cmd == "settings":
+            return controller.get_settings()
+        elif cmd == "profiles":
+            return list_profiles()
+        elif cmd == "profile":
+            if "profile" in request:
+                return controller.apply_profile(request["profile"], request.get("name"))
+            name = request.get("name")
+            if not name:
+                raise ControlError("profile requires a name or an inline profile")
+            return controller.apply_profile(load_profile(name), name)
+        elif cmd == "schedule":
+            # An empty specification clears the schedule
+            spec = request.get("name") or request.get("spec")
+            controller.set_schedule(ActivitySchedule.parse(spec) if spec else None)
+            return controller.status()["next_transition"]
+        elif cmd == "plugins":
+            enabled = controller.enabled_plugins()
+            return {name: {"title": controller.plugins.title(name), "enabled": name in enabled}
+                    for name in controller.plugins.names()}
+        elif cmd in ("enable", "disable"):
+            name = request.get("name")
+            if not name:
+                raise ControlError(f"{cmd} requires a plugin name")
+            if cmd == "disable":
+                return controller.disable_plugin(name)
+            controller.enable_plugin(name, request.get("settings"))
+            return controller.engines[name].get_settings()
+        elif cmd == "target":
+            # A bare name is a title; no title or class confines nothing
+            controller.set_window_target(request.get("title") or request.get("name"), request.get("class"))
+            return controller.status()["target"]
+        elif cmd == "profiling":
+            # "profiling" alone reports the last run; a mode name starts one
+            mode = request.get("name") or request.get("mode")
+            if not mode:
+                return controller.profiler.status() if controller.profiler else None
+            try:
+                duration = float(request.get("duration", 30.0))
+            except (TypeError, ValueError):
+                raise ControlError("duration must be a number of seconds")
+            return controller.start_profiling(mode, duration)
+        elif cmd == "adaptive":
+            # "adaptive" alone reports the current range; "on"/"off" (or options) switch it
+            mode = request.get("name")
+            options = {key: request[key] for key in ("margin", "presence_timeout") if key in request}
+            if mode is None and not options:
+                return controller.status()["adaptive"]
+            if mode not in (None, "on", "off"):
+                raise ControlError("adaptive takes on or off")
+            try:
+                return controller.set_adaptive_keepalive(mode != "off", **options)
+            except (TypeError, ValueError) as e:
+                raise ControlError(str(e))
+        elif cmd == "journal":
+            try:
+                return controller.dump_journal()
+            except OSError as e:
+                raise ControlError(f"Failed to dump journal: {str(e)}")
+        elif cmd == "report":
+            # "report" alone returns the current run's totals; "report save" writes them to disk
+            mode = request.get("name")
+            if mode is None:
+                return controller.session_report()
+            if mode != "save":
+                raise ControlError("report takes save or nothing")
+            try:
+                return controller.save_report()
+            except OSError as e:
+                raise ControlError(f"Failed to save session report: {str(e)}")
+        elif cmd == "power":
+            try:
+                controller.set_power_policy(request.get("name") or request.get("policy") or "off")
+            except ValueError as e:
+                raise ControlError(str(e))
+            return controller.status()["power"]
+        raise ControlError(f"Unknown command: {cmd}")
+
+
+class _ControlHandler(socketserver.StreamRequestHandler):
+    """Serve requests on one persistent client connection."""
+
+    def handle(self):
+        while True:
+            line = self.rfile.readline(MAX_REQUEST_SIZE)
+            if not line:
+                break
+            if len(line) >= MAX_REQUEST_SIZE and not line.endswith(b"\n"):
+                # The rest of the request would be read as bogus requests, so give up on the client
+                error = {"ok": False, "error": f"Request too large (limit {MAX_REQUEST_SIZE} bytes)"}
+                try:
+                    self.wfile.write(json.dumps(error, separators=(",", ":")).encode("utf-8") + b"\n")
+                except OSError:
+                    pass
+                break
+            started = time.perf_counter()
+            try:
+                request = parse_request(line.decode("utf-8"))
+                response = self.server.bridge.call(request)
+            except (ControlError, UnicodeDecodeError) as e:
+                request = {}
+                response = {"ok": False, "error": str(e)}
+            if "id" in request:
+                response["id"] = request["id"]
+            response["elapsed_us"] = int((time.perf_counter() - started) * 1e6)
+            try:
+                self.wfile.write(json.dumps(response, separators=(",", ":")).encode("utf-8") + b"\n")
+            except OSError:
+                break
+
+
+class _UnixControlServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _TCPControlServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class ControlServer:
+    """Local control server exposing the controller over a socket."""
+
+    def __init__(self, controller, socket_path=None, port=None):
+        if socket_path is None and port is None:
+            socket_path = DEFAULT_SOCKET_PATH
+        self.socket_path = socket_path
+        self.port = port
+        self.bridge = ControlBridge(controller)
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """Start serving in a background thread."""
+        try:
+            if self.port is not None:
+                # Only ever bind to loopback
+                self._server = _TCPControlServer(("127.0.0.1", self.port), _ControlHandler)
+                address = f"127.0.0.1:{self._server.server_address[1]}"
+            else:
+                os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+                if os.path.exists(self.socket_path):
+                    os.unlink(self.socket_path)
+                self._server = _UnixControlServer(self.socket_path, _ControlHandler)
+                os.chmod(self.socket_path, 0o600)
+                address = self.socket_path
+        except OSError as e:
+            logger.error(f"Failed to start control server: {str(e)}")
+            return False
+
+        self._server.bridge = self.bridge
+        self._thread = threading.Thread(target=self._server.serve_forever, name="control-server")
+        self._thread.daemon = True
+        self._thread.start()
+        logger.info(f"Control server listening on {address}")
+        return True
+
+    def stop(self):
+        """Stop the server and remove its socket file."""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        if self.port is None and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class ControlClient:
+    """Minimal client keeping one persistent connection to a control server."""
+
+    def __init__(self, socket_path=None, port=None, timeout=10.0):
+        if port is not None:
+            self._sock = socket.create_connection(("127.0.0.1", port), timeout)
+        else:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.settimeout(timeout)
+            self._sock.connect(socket_path or DEFAULT_SOCKET_PATH)
+        self._file = self._sock.makefile("rwb")
+        self._next_id = 0
+
+    def call(self, cmd, **args):
+        """Send one request and return (response, round-trip seconds)."""
+        self._next_id += 1
+        request = dict(args, cmd=cmd, id=self._next_id)
+        started = time.perf_counter()
+        self._file.write(json.dumps(request, separators=(",", ":")).encode("utf-8") + b"\n")
+        self._file.flush()
+        line = self._file.readline()
+        elapsed = time.perf_counter() - started
+        if not line:
+            raise ControlError("Connection closed by server")
+        return json.loads(line), elapsed
+
+    def close(self):
+        """Close the connection."""
+        self._file.close()
+        self._sock.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Send a command to a running LetMeSleep instance.")
+    parser.add_argument("--socket", help="Unix socket path of the control server")
+    parser.add_argument("--port", type=int, help="Localhost TCP port of the control server")
+    parser.add_argument("cmd", help="Command: ping, status, start, stop, pause, resume, "
+                                       "settings, profiles, profile, schedule, power, journal, "
+                                       "plugins, enable, disable, target, profiling, adaptive, report")
+    parser.add_argument("name", nargs="?", help="Profile name, schedule specification, power policy, "
+                                                "plugin name, target window title or profiler mode (sample, cprofile)")
+    args = parser.parse_args(argv)
+
+    try:
+        client = ControlClient(socket_path=args.socket, port=args.port)
+        request = {"name": args.name} if args.name else {}
+        response, elapsed = client.call(args.cmd, **request)
+        client.close()
+    except (OSError, ControlError) as e:
+        print(f"ERROR: {str(e)}")
+        return 1
+
+    print(json.dumps(response, indent=2))
+    print(f"Round trip: {elapsed * 1000:.2f} ms")
+    return 0 if response.get("ok") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,668 @@
+#!/usr/bin/env python3
+import time
+import random
+import logging
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from automation import MouseAutomation, KeyboardAutomation, seed_engines
+from backends import create_backend, KEEPALIVE_KEYS
+from profiles import apply_profile, check_profile, profile_enabled, ProfileError
+from plugins import PluginRegistry, PluginError
+from scheduler import TimerQueue
+from power import create_rate_controller
+from engine_watchdog import Watchdog
+from failsafe import FailsafeMonitor
+from journal import EventJournal
+from window_target import WindowTarget, WindowTargetError
+from engine_profiler import EngineProfiler, ProfilerError
+from idle_timeout import AdaptiveInterval, X11IdleTimeout, IdleTimeoutError, apply_adaptive_interval
+from session_report import SessionStats, DEFAULT_REPORT_DIR, REPORT_FORMATS, export_report
+
+logger = logging.getLogger("LetMeSleep")
+
+# Controller states
+STATE_STOPPED = "stopped"
+STATE_RUNNING = "running"
+STATE_PAUSED = "paused"
+STATE_WAITING = "waiting"  # Started, but outside the activity windows
+
+
+class AutomationController(QObject):
+    """Owns the automation engines and controls them as a group."""
+
+    status_update = pyqtSignal(str)
+    failsafe_triggered = pyqtSignal()
+    error_occurred = pyqtSignal(str)
+    # An engine stopped on an unrecoverable error (already reported through error_occurred)
+    stopped_on_error = pyqtSignal(str)
+    state_changed = pyqtSignal(str)
+    settings_changed = pyqtSignal()
+
+    # Emitted from the timer thread, delivered on the controller's thread
+    _transition_due = pyqtSignal()
+    _limit_due = pyqtSignal()
+    # Emitted from the profiler thread when a profiling run has finished
+    _profile_done = pyqtSignal(object)
+    # Emitted from the timer thread when the idle timeout is due to be read again
+    _adaptive_due = pyqtSignal()
+    # Emitted from the timer thread when a scheduled session report is due
+    _report_due = pyqtSignal()
+
+    def __init__(self, backend=None, seed=None):
+        super().__init__()
+
+        # Initialize automation; the engines share one input backend
+        self.backend = backend or create_backend()
+        self.mouse_automation = MouseAutomation(self.backend)
+        self.keyboard_automation = KeyboardAutomation(self.backend)
+        self.engines = {
+            "mouse": self.mouse_automation,
+            "keyboard": self.keyboard_automation,
+        }
+        self.profile_name = None
+        self._state = STATE_STOPPED
+
+        # Scheduling: activity windows and the run limit (safety timeout)
+        self.schedule = None
+        self.run_limit = None
+        self._armed = False
+        self._started_at = None
+        self._timers = TimerQueue("automation-scheduler")
+        self._transition_timer = None
+        self._limit_timer = None
+        self._transition_due.connect(self._on_transition)
+        self._limit_due.connect(self._on_limit)
+
+        # Power-aware throttling, shared by all engines
+        self.rate_controller = None
+        self.power_ceiling = None
+
+        # Optional idle_timeout.AdaptiveInterval setting the keep-alive intervals
+        self.adaptive = None
+        self._adaptive_timer = None
+        self._adaptive_due.connect(self._on_adaptive_due)
+
+        # Master seed for the engines and for UI-side randomness
+        self.seed = None
+        self.rng = random.Random()
+        self.set_seed(seed)
+
+        # Binary journal of every injected action, dumped on error and failsafe
+        self.journal = EventJournal()
+        for name, engine in self.engines.items():
+            engine.set_journal(self.journal, name)
+
+        # Running activity totals of the current run, exported on stop and on a schedule
+        self.session_stats = SessionStats()
+        for name, engine in self.engines.items():
+            engine.set_session_stats(self.session_stats, name)
+        self.report_dir = None
+        self.report_formats = ("json",)
+        self.report_interval = None
+        self._report_timer = None
+        self._session_open = False
+        self._report_due.connect(self._on_report_due)
+
+        # Optional window_target.WindowTarget shared by all engines
+        self.window_target = None
+
+        # The current or last engine_profiler.EngineProfiler run
+        self.profiler = None
+        self._profile_done.connect(self._on_profile_done)
+
+        # Optional memory_tracker.MemoryTracker, reported in the status
+        self.memory_tracker = None
+
+        # Restart engine workers that hang or die
+        self.watchdog = Watchdog(self.engines)
+        self.watchdog.start()
+
+        # Watch for the pointer in the failsafe corner, so the engines need not
+        self.failsafe_monitor = FailsafeMonitor(self.engines, self.backend)
+        self.failsafe_monitor.session_stats = self.session_stats
+        self.failsafe_monitor.start()
+        # A backend blind to the real pointer cannot see the corner, so the failsafe stays off
+        self.failsafe_available = self.backend.reads_pointer
+        if not self.failsafe_available:
+            self.set_failsafe_active(False)
+        self._failsafe_handled = 0
+
+        for engine in self.engines.values():
+            self._connect_engine(engine)
+
+        # Extra automation engines, imported only when enabled
+        self.plugins = PluginRegistry()
+
+    def _connect_engine(self, engine):
+        """Forward an engine's signals through the controller."""
+        engine.status_update.connect(self.status_update)
+        engine.error_occurred.connect(self.error_occurred)
+        engine.stopped_on_error.connect(self.stopped_on_error)
+        engine.failsafe_triggered.connect(self._handle_failsafe)
+        # Engine transitions arrive on the controller's thread
+        engine.state_changed.connect(self._on_engine_state_changed)
+
+    def _on_engine_state_changed(self, state):
+        """Follow engines that stopped on their own (errors, failsafe)."""
+        self.state()
+
+    def enable_plugin(self, name, settings=None):
+        """Load a plugin engine, configure it and run it with the others."""
+        engine = self.engines.get(name)
+        if engine is None:
+            if name not in self.plugins:
+                raise PluginError(f"Unknown automation plugin: {name}")
+            engine = self.plugins.create(name, self.backend)
+            engine.set_failsafe_active(self.mouse_automation.failsafe_active)
+            engine.rate_controller = self.rate_controller
+            engine.set_journal(self.journal, name)
+            engine.set_session_stats(self.session_stats, name)
+            engine.window_target = self.window_target
+            self._connect_engine(engine)
+            self.engines[name] = engine
+            seed_engines(self.engines, self.seed)
+            logger.info(f"Automation plugin enabled: {name}")
+            if self._state in (STATE_RUNNING, STATE_PAUSED):
+                engine.start()
+                if self._state == STATE_PAUSED:
+                    engine.pause()
+                self.failsafe_monitor.wake()
+        if settings:
+            engine.apply_settings(settings)
+        self.settings_changed.emit()
+        return engine
+
+    def disable_plugin(self, name):
+        """Stop and drop a plugin engine."""
+        if name in ("mouse", "keyboard") or name not in self.engines:
+            return False
+        engine = self.engines.pop(name)
+        engine.stop()
+        for signal in (engine.status_update, engine.error_occurred, engine.stopped_on_error,
+                       engine.failsafe_triggered, engine.state_changed):
+            signal.disconnect()
+        logger.info(f"Automation plugin disabled: {name}")
+        self.settings_changed.emit()
+        return True
+
+    def enabled_plugins(self):
+        """Return the names of the enabled plugin engines."""
+        return [name for name in self.engines if name not in ("mouse", "keyboard")]
+
+    def _set_state(self, state):
+        """Record a new state and notify listeners."""
+        if state != self._state:
+            self._state = state
+            self.state_changed.emit(state)
+
+    def state(self):
+        """Return the current controller state."""
+        # Engines may stop on their own (errors, failsafe); their states are read atomically
+        if self._state in (STATE_RUNNING, STATE_PAUSED) and not any(e.is_running() for e in self.engines.values()):
+            self._set_state(STATE_STOPPED)
+            self._end_session()
+        return self._state
+
+    def is_running(self):
+        """Check if any automation is running."""
+        return self.state() != STATE_STOPPED
+
+    def is_paused(self):
+        """Check if the automations are paused."""
+        return self.state() == STATE_PAUSED
+
+    def _handle_failsafe(self):
+        """Handle failsafe triggered by any engine."""
+        # Every engine the monitor stopped reports the same hit
+        if self.failsafe_monitor.triggers == self._failsafe_handled:
+            return
+        self._failsafe_handled = self.failsafe_monitor.triggers
+        self.stop()
+        self.failsafe_triggered.emit()
+
+    def validate(self):
+        """Validate engine settings before starting."""
+        mouse = self.mouse_automation
+        keyboard = self.keyboard_automation
+        if mouse.min_interval > mouse.max_interval:
+            return "Mouse minimum interval cannot be greater than maximum interval"
+        if mouse.between_min_interval > mouse.between_max_interval:
+            return "Between movement minimum interval cannot be greater than maximum interval"
+        if mouse.enable_scrolling and mouse.scroll_min_amount > mouse.scroll_max_amount:
+            return "Scroll minimum amount cannot be greater than maximum amount"
+        if keyboard.min_interval > keyboard.max_interval:
+            return "Keyboard minimum interval cannot be greater than maximum interval"
+        if keyboard.mode not in ("text", "keys"):
+            return f"Unknown keyboard mode: {keyboard.mode}"
+        if keyboard.mode == "keys" and keyboard.keepalive_key not in KEEPALIVE_KEYS:
+            return f"Keep-alive key must be one of {', '.join(KEEPALIVE_KEYS)}"
+        return None
+
+    def start(self):
+        """Start both automations."""
+        if self.is_running():
+            self.status_update.emit("Automation is already running")
+            return False
+
+        error = self.validate()
+        if error:
+            self.error_occurred.emit(error)
+            return False
+
+        self._armed = True
+        self._started_at = time.time()
+        self.session_stats.reset()
+        self._session_open = True
+        self._arm_report()
+        if self.run_limit:
+            self._limit_timer = self._timers.schedule_in(self.run_limit, self._limit_due.emit)
+
+        if self.schedule is not None and not self.schedule.is_active():
+            self._set_state(STATE_WAITING)
+            self._arm_transition()
+            return True
+
+        if not self._start_engines():
+            return False
+        self._arm_transition()
+        return True
+
+    def _start_engines(self):
+        """Start the engines themselves."""
+        results = [engine.start() for engine in list(self.engines.values())]
+
+        if not all(results):
+            # If any start failed, stop them all
+            self.stop()
+            self.error_occurred.emit("Failed to start one or more automations")
+            return False
+
+        self._set_state(STATE_RUNNING)
+        self.failsafe_monitor.wake()
+        self.status_update.emit("Both automations started")
+        return True
+
+    def stop(self):
+        """Stop both automations and disarm the schedule."""
+        self._armed = False
+        self._cancel_timers()
+        for engine in self.engines.values():
+            engine.stop()
+        self._set_state(STATE_STOPPED)
+        self.status_update.emit("Both automations stopped")
+        self._end_session()
+        return True
+
+    def _cancel_timers(self):
+        """Cancel the pending transition and run limit timers."""
+        for timer in (self._transition_timer, self._limit_timer):
+            if timer is not None:
+                timer.cancel()
+        self._transition_timer = None
+        self._limit_timer = None
+
+    def _arm_transition(self):
+        """Schedule a wakeup at the next activity window edge."""
+        if self._transition_timer is not None:
+            self._transition_timer.cancel()
+            self._transition_timer = None
+        if self.schedule is None:
+            return
+        transition = self.schedule.next_transition()
+        if transition is None:
+            return
+        when, opens = transition
+        self._transition_timer = self._timers.schedule(when.timestamp(), self._transition_due.emit)
+        action = "opens" if opens else "closes"
+        logger.info(f"Next activity window {action} at {when:%a %H:%M}")
+        if self._state == STATE_WAITING:
+            self.status_update.emit(f"Waiting for activity window (opens {when:%a %H:%M})")
+
+    def _on_transition(self):
+        """Start or stop the engines at an activity window edge."""
+        if not self._armed:
+            return
+        active = self.schedule is None or self.schedule.is_active()
+        if active and self._state == STATE_WAITING:
+            self.status_update.emit("Activity window opened")
+            if not self._start_engines():
+                return
+        elif not active and self._state in (STATE_RUNNING, STATE_PAUSED):
+            # Stopping the engines lets their threads exit, so nothing wakes up until the next window
+            for engine in self.engines.values():
+                engine.stop()
+            self._set_state(STATE_WAITING)
+            self.status_update.emit("Activity window closed")
+        self._arm_transition()
+
+    def _on_limit(self):
+        """Stop everything when the run limit is reached."""
+        if not self._armed:
+            return
+        minutes = self.run_limit / 60.0
+        logger.info(f"Run limit of {minutes:.0f} minutes reached")
+        self.stop()
+        self.status_update.emit(f"Safety timeout reached after {minutes:.0f} minutes. Automation stopped.")
+
+    def set_schedule(self, schedule):
+        """Set the activity schedule (None to run at any time)."""
+        self.schedule = schedule
+        if self._armed:
+            self._on_transition()
+
+    def set_run_limit(self, seconds):
+        """Set the maximum run time in seconds (None for no limit)."""
+        self.run_limit = seconds or None
+        if not self._armed:
+            return
+        if self._limit_timer is not None:
+            self._limit_timer.cancel()
+            self._limit_timer = None
+        if self.run_limit:
+            self._limit_timer = self._timers.schedule(
+                self._started_at + self.run_limit, self._limit_due.emit)
+
+    def pause(self):
+        """Pause both automations."""
+        if self.state() != STATE_RUNNING:
+            return False
+        for engine in self.engines.values():
+            engine.pause()
+        self._set_state(STATE_PAUSED)
+        self.status_update.emit("Both automations paused")
+        return True
+
+    def resume(self):
+        """Resume both automations."""
+        if self.state() != STATE_PAUSED:
+            return False
+        for engine in self.engines.values():
+            engine.resume()
+        self._set_state(STATE_RUNNING)
+        self.failsafe_monitor.wake()
+        self.status_update.emit("Both automations resumed")
+        return True
+
+    def set_failsafe_active(self, active):
+        """Set whether failsafe is active on all engines (never when it is unavailable)."""
+        active = active and self.failsafe_available
+        for engine in self.engines.values():
+            engine.set_failsafe_active(active)
+        self.failsafe_monitor.wake()
+
+    def set_power_policy(self, policy="balanced", **options):
+        """Enable power-aware throttling with a policy, or disable it with None/"off"."""
+        self._use_rate_controller(create_rate_controller(policy, **options), policy)
+
+    def _use_rate_controller(self, rate_controller, policy):
+        """Share a rate controller (None for no throttling) with the engines."""
+        self.rate_controller = rate_controller
+        self.power_ceiling = self.rate_controller.keepalive_ceiling if self.rate_controller else None
+        for engine in self.engines.values():
+            engine.rate_controller = self.rate_controller
+        logger.info(f"Power policy set to {policy or 'off'}")
+        if self.adaptive is not None:
+            self._apply_adaptive()
+
+    def set_adaptive_keepalive(self, enabled=True, provider=None, **options):
+        """Set the keep-alive intervals just below the system idle timeout (enabled=False to stop).
+
+        options are passed to idle_timeout.AdaptiveInterval (margin,
+        presence_timeout, ...). Raises idle_timeout.IdleTimeoutError if the
+        idle timeout cannot be read, and ValueError for bad options.
+        """
+        adaptive = None
+        if enabled:
+            adaptive = AdaptiveInterval(provider or X11IdleTimeout(), **options)
+            adaptive.refresh()
+        return self._use_adaptive(adaptive)
+
+    def _use_adaptive(self, adaptive):
+        """Follow a refreshed AdaptiveInterval (None to stop); return its status."""
+        if self._adaptive_timer is not None:
+            self._adaptive_timer.cancel()
+            self._adaptive_timer = None
+        if adaptive is None:
+            if self.adaptive is not None:
+                logger.info("Adaptive keep-alive off")
+            self.adaptive = None
+            if self.rate_controller is not None:
+                self.rate_controller.keepalive_ceiling = self.power_ceiling
+            return None
+        self.adaptive = adaptive
+        self._apply_adaptive()
+        return adaptive.status()
+
+    def _apply_adaptive(self):
+        """Push the adaptive interval range to the engines and schedule the next read."""
+        apply_adaptive_interval(self.adaptive, self.engines)
+        if self.rate_controller is not None:
+            # Power saving must not stretch the pauses past the idle timeout
+            self.rate_controller.keepalive_ceiling = min(self.power_ceiling, self.adaptive.high)
+        self._arm_adaptive()
+        self.settings_changed.emit()
+
+    def _arm_adaptive(self):
+        """Schedule the next read of the idle timeout."""
+        if self._adaptive_timer is not None:
+            self._adaptive_timer.cancel()
+        self._adaptive_timer = self._timers.schedule_in(self.adaptive.refresh_interval, self._adaptive_due.emit)
+
+    def _on_adaptive_due(self):
+        """Read the idle timeout again and follow any change."""
+        if self.adaptive is None:
+            return
+        try:
+            changed = self.adaptive.refresh()
+        except IdleTimeoutError as e:
+            # Keep the last known range rather than guessing
+            logger.warning(f"Adaptive keep-alive: {str(e)}")
+            changed = False
+        if changed:
+            self._apply_adaptive()
+        else:
+            self._arm_adaptive()
+
+    def set_seed(self, seed):
+        """Set the master seed (None picks fresh seeds on every start)."""
+        self.seed = seed
+        self.rng = random.Random(seed)
+        seed_engines(self.engines, seed)
+        if seed is not None:
+            logger.info(f"Master random seed: {seed}")
+
+    def set_window_target(self, title=None, wm_class=None):
+        """Confine the engines to a window matched by title and/or class (None for anywhere).
+
+        Raises window_target.WindowTargetError if window targeting is unavailable.
+        """
+        title = title or None
+        wm_class = wm_class or None
+        current = self.window_target
+        if ((current.title, current.wm_class) if current else (None, None)) == (title, wm_class):
+            return current
+        target = None
+        if title or wm_class:
+            target = WindowTarget(title, wm_class)
+            target.start()
+        for engine in self.engines.values():
+            engine.window_target = target
+        self.window_target = target
+        if current is not None:
+            current.stop()
+        logger.info(f"Target window: {target.describe() if target else 'none'}")
+        return target
+
+    def start_profiling(self, mode="sample", duration=30.0):
+        """Profile the engine worker threads for a while; output goes to ~/.letmesleep/profiling."""
+        if self.profiler is not None and self.profiler.is_running():
+            raise ProfilerError("A profiling run is already in progress")
+        self.profiler = EngineProfiler(self.engines, mode, duration, on_done=self._profile_done.emit)
+        self.profiler.start()
+        self.status_update.emit(f"Profiling engines ({mode}) for {duration:.0f}s")
+        return self.profiler.status()
+
+    def _on_profile_done(self, profiler):
+        """Report a finished profiling run."""
+        if profiler.error:
+            self.error_occurred.emit(f"Profiling failed: {profiler.error}")
+        else:
+            self.status_update.emit(f"Profile saved to {profiler.path}")
+
+    def set_session_reports(self, directory=DEFAULT_REPORT_DIR, formats=("json",), interval=None):
+        """Save a session report to directory when a run ends and every interval seconds.
+
+        directory None turns the automatic reports off. Raises ValueError
+        for an unknown format.
+        """
+        formats = tuple(formats or ("json",))
+        for fmt in formats:
+            if fmt not in REPORT_FORMATS:
+                raise ValueError(f"Report format must be one of {', '.join(REPORT_FORMATS)}")
+        self.report_dir = directory or None
+        self.report_formats = formats
+        self.report_interval = interval or None
+        if self.report_dir:
+            logger.info(f"Session reports ({', '.join(formats)}) saved to {self.report_dir}")
+        self._arm_report()
+
+    def _arm_report(self):
+        """Schedule the next periodic session report, if any."""
+        if self._report_timer is not None:
+            self._report_timer.cancel()
+            self._report_timer = None
+        if self._session_open and self.report_dir and self.report_interval:
+            self._report_timer = self._timers.schedule_in(self.report_interval, self._report_due.emit)
+
+    def _on_report_due(self):
+        """Save the periodic session report and schedule the next."""
+        if not self._session_open:
+            return
+        self._save_report_quietly("scheduled")
+        self._arm_report()
+
+    def _end_session(self):
+        """Save the final report of a run once, if reports are on."""
+        if not self._session_open:
+            return
+        self._session_open = False
+        self._arm_report()
+        if self.report_dir:
+            self._save_report_quietly("stop")
+
+    def _save_report_quietly(self, reason):
+        """Save an automatic session report, logging rather than raising on failure."""
+        try:
+            self.save_report(reason)
+        except OSError as e:
+            logger.warning(f"Failed to save session report: {str(e)}")
+
+    def session_report(self):
+        """Return the activity report of the current (or last) run as a dict."""
+        return self.session_stats.report()
+
+    def save_report(self, reason="manual"):
+        """Save the session report in the configured formats and return the file paths."""
+        paths = export_report(self.session_report(), self.report_dir or DEFAULT_REPORT_DIR,
+                              self.report_formats, reason)
+        self.status_update.emit(f"Session report saved to {paths[0]}")
+        return paths
+
+    def dump_journal(self, reason="manual"):
+        """Dump the event journal to disk and return the file path."""
+        path = self.journal.dump(reason)
+        self.status_update.emit(f"Event journal saved to {path}")
+        return path
+
+    def _check_profile(self, profile):
+        """Check every profile section without applying any of them.
+
+        Returns the prepared (rate controller, adaptive interval) for the
+        power and adaptive sections; raises ProfileError for a bad section.
+        """
+        engine_classes = {name: type(engine) for name, engine in self.engines.items()}
+        rate_controller = check_profile(profile, engine_classes, self.plugins)
+
+        adaptive = None
+        if "adaptive" in profile:
+            options = dict(profile["adaptive"] or {})
+            try:
+                if options.pop("enabled", True):
+                    adaptive = AdaptiveInterval(X11IdleTimeout(), **options)
+                    adaptive.refresh()
+            except (IdleTimeoutError, ValueError, TypeError) as e:
+                raise ProfileError(f"Cannot enable adaptive keep-alive from profile: {str(e)}")
+        return rate_controller, adaptive
+
+    def apply_profile(self, profile, name=None):
+        """Apply a profile to the engines and notify the UI.
+
+        Every section is checked first, so a bad profile raises
+        ProfileError without changing anything.
+        """
+        rate_controller, adaptive = self._check_profile(profile)
+        if "target" in profile:
+            # The only step that can still fail (no X display); it comes first
+            target = profile["target"] or {}
+            try:
+                self.set_window_target(target.get("title"), target.get("class"))
+            except WindowTargetError as e:
+                raise ProfileError(f"Cannot target window from profile: {str(e)}")
+        # Plugin sections switch their plugin on or off before settings are applied
+        try:
+            for section in profile:
+                if section in self.plugins:
+                    if profile_enabled(profile, section):
+                        self.enable_plugin(section)
+                    else:
+                        self.disable_plugin(section)
+        except PluginError as e:
+            raise ProfileError(f"Cannot enable plugin from profile: {str(e)}")
+        if "seed" in profile:
+            self.set_seed(profile["seed"])
+        apply_profile({section: settings for section, settings in profile.items()
+                       if section not in self.plugins or section in self.engines}, self.engines)
+        if "power" in profile:
+            self._use_rate_controller(rate_controller, profile["power"].get("policy", "balanced"))
+        if "adaptive" in profile:
+            self._use_adaptive(adaptive)
+        self.profile_name = name
+        self.settings_changed.emit()
+        self.status_update.emit(f"Profile applied: {name}" if name else "Profile applied")
+        return True
+
+    def get_settings(self):
+        """Return a snapshot of all engine settings keyed by engine name."""
+        return {name: engine.get_settings() for name, engine in self.engines.items()}
+
+    def status(self):
+        """Return a status summary as a dict."""
+        next_transition = None
+        if self.schedule is not None:
+            transition = self.schedule.next_transition()
+            if transition is not None:
+                next_transition = {"at": transition[0].isoformat(), "opens": transition[1]}
+        remaining = None
+        if self._armed and self.run_limit:
+            remaining = max(0.0, self._started_at + self.run_limit - time.time())
+        return {
+            "state": self.state(),
+            "profile": self.profile_name,
+            "next_transition": next_transition,
+            "run_limit_remaining": remaining,
+            "power": self.rate_controller.status() if self.rate_controller else None,
+            "adaptive": self.adaptive.status() if self.adaptive else None,
+            "watchdog": self.watchdog.status(),
+            "journal_records": len(self.journal),
+            "session": self.session_stats.report()["totals"],
+            "failsafe": {"available": self.failsafe_available,
+                         "active": self.failsafe_available and self.mouse_automation.failsafe_active},
+            "target": self.window_target.status() if self.window_target else None,
+            "profiling": self.profiler.status() if self.profiler else None,
+            "memory": self.memory_tracker.status() if self.memory_tracker else None,
+            "engines": {
+                name: {"state": engine.state(), "running": engine.is_running(), "paused": engine.is_paused(),
+                       "seed": engine.active_seed, "errors": engine.error_policy.status()}
+                for name, engine in self.engines.items()
+            },
+        }
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""Bounded profiling runs over the automation worker threads.
+
+Two modes, both attachable to running engines without a restart:
+
+- "sample": a sampler thread reads the workers' stacks through
+  sys._current_frames() at a fixed rate and writes collapsed stacks
+  (one "frame;frame;frame count" line per stack, the input format of
+  flamegraph.pl and speedscope). The engines do nothing extra.
+- "cprofile": each worker enables its own cProfile.Profile on a heartbeat
+  (a profiler only sees the thread that enabled it) and disables it once
+  the run is over; the workers are woken for both, so waiting or paused
+  engines attach and detach at once. The merged stats are written as a .pstats file
+  plus a text summary sorted by cumulative time. Python 3.12+ allows only
+  one active cProfile per process, so there the other workers run
+  unprofiled and are reported as unavailable.
+
+Output goes to ~/.letmesleep/profiling/.
+"""
+import io
+import os
+import sys
+import time
+import pstats
+import cProfile
+import logging
+import threading
+import collections
+
+logger = logging.getLogger("LetMeSleep")
+
+PROFILE_OUTPUT_DIR = os.path.join(os.path.expanduser("~"), ".letmesleep", "profiling")
+PROFILER_MODES = ("sample", "cprofile")
+# Longest allowed run, so a forgotten profiler does not slow the engines for good
+MAX_DURATION = 600.0
+
+
+class ProfilerError(Exception):
+    """Exception raised for invalid or conflicting profiling requests."""
+    pass
+
+
+class EngineProfiler:
+    """One profiling run over a dict of engines keyed by name."""
+
+    def __init__(self, engines, mode="sample", duration=30.0, sample_rate=100.0,
+                 output_dir=PROFILE_OUTPUT_DIR, on_done=None):
+        if mode not in PROFILER_MODES:
+            raise ProfilerError(f"Unknown profiler mode: {mode} (use {' or '.join(PROFILER_MODES)})")
+        if not 0 < duration <= MAX_DURATION:
+            raise ProfilerError(f"Profiling duration must be between 0 and {MAX_DURATION:.0f} seconds")
+        self.engines = dict(engines)
+        self.mode = mode
+        self.duration = duration
+        self.sample_rate = sample_rate
+        self.output_dir = output_dir
+        self.on_done = on_done
+        self.started_at = None
+        self.path = None
+        self.error = None
+        self.samples = 0
+        self._stop_at = None
+        self._profiles = {}  # thread ident -> [engine name, Profile (None if unavailable), detached]
+        self._unavailable = {}  # engine name -> why its profiler could not be enabled
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the run in a background thread."""
+        self.started_at = time.time()
+        self._stop_at = time.monotonic() + self.duration
+        if self.mode == "cprofile":
+            for engine in self.engines.values():
+                engine.profile_session = self
+                engine.wake()
+        self._thread = threading.Thread(target=self._run, name="engine-profiler")
+        self._thread.daemon = True
+        self._thread.start()
+        logger.info(f"Profiling engines ({self.mode}) for {self.duration:.0f}s")
+
+    def stop(self):
+        """End the run early; the output is still written."""
+        self._stop_at = time.monotonic()
+        self._stop_event.set()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def poll(self, engine):
+        """Attach or detach the calling worker thread's cProfile (cprofile mode)."""
+        if threading.current_thread() is not engine.thread:
+            return
+        ident = threading.get_ident()
+        entry = self._profiles.get(ident)
+        if time.monotonic() < self._stop_at:
+            if entry is None:
+                profile = cProfile.Profile()
+                try:
+                    profile.enable()
+                except Exception as e:
+                    # From Python 3.12 only one cProfile can be active per process;
+                    # the worker carries on unprofiled rather than dying in a heartbeat
+                    logger.warning(f"Profiling unavailable in {type(engine).__name__}: {str(e)}")
+                    with self._lock:
+                        self._unavailable[type(engine).__name__] = str(e)
+                        self._profiles[ident] = [type(engine).__name__, None, True]
+                    return
+                with self._lock:
+                    self._profiles[ident] = [type(engine).__name__, profile, False]
+        elif entry is not None and entry[1] is not None and not entry[2]:
+            entry[1].disable()
+            entry[2] = True
+
+    def _run(self):
+        """Run the profiler and always report the outcome through on_done."""
+        path, error = None, "Profiling failed unexpectedly"
+        try:
+            path, error = self._sample() if self.mode == "sample" else self._collect()
+        except OSError as e:
+            logger.error(f"Failed to write the profile: {str(e)}")
+            path, error = None, f"Failed to write the profile: {str(e)}"
+        finally:
+            self._finish(path, error)
+
+    def _collect(self):
+        """Wait out the run, then merge the workers' profiles (cprofile mode).
+
+        Returns (path, error) like _sample.
+        """
+        self._stop_event.wait(self.duration)
+        self._stop_at = time.monotonic()
+        # Workers detach at their next heartbeat, which a wakeup brings forward
+        for engine in self.engines.values():
+            engine.wake()
+        grace = time.monotonic() + 2.0
+        while time.monotonic() < grace and not all(entry[2] for entry in self._profiles.values()):
+            time.sleep(0.05)
+        for engine in self.engines.values():
+            engine.profile_session = None
+
+        stats = None
+        with self._lock:
+            entries = list(self._profiles.values())
+        for name, profile, detached in entries:
+            if profile is None:
+                continue
+            if not detached:
+                logger.warning(f"Profiling: {name} did not detach in time (busy?); its data is skipped")
+                continue
+            if stats is None:
+                stats = pstats.Stats(profile)
+            else:
+                stats.add(profile)
+        if stats is None and self._unavailable:
+            reason = next(iter(self._unavailable.values()))
+            return None, f"Profiling unavailable: {reason} (use sample mode)"
+        if stats is None:
+            return None, "No engine thread ran while profiling (are the engines started?)"
+        path = self._output_path("pstats")
+        stats.dump_stats(path)
+        summary = io.StringIO()
+        pstats.Stats(path, stream=summary).sort_stats("cumulative").print_stats(40)
+        with open(path[:-len("pstats")] + "txt", "w", encoding="utf-8") as f:
+            f.write(summary.getvalue())
+        return path, None
+
+    def _sample(self):
+        """Sample the worker stacks at a fixed rate (sample mode).
+
+        Returns (path, error): the output file, or None and why there is none.
+        """
+        interval = 1.0 / self.sample_rate
+        stacks = collections.Counter()
+        next_sample = time.monotonic()
+        while time.monotonic() < self._stop_at and not self._stop_event.is_set():
+            workers = {engine.thread.ident: name for name, engine in self.engines.items()
+                       if engine.thread is not None and engine.thread.is_alive()}
+            frames = sys._current_frames()
+            for ident, name in workers.items():
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                if stack:
+                    stacks[";".join([name] + stack[::-1])] += 1
+            del frames
+            self.samples += 1
+            next_sample += interval
+            self._stop_event.wait(max(0.0, next_sample - time.monotonic()))
+
+        if not stacks:
+            return None, "No engine thread ran while profiling (are the engines started?)"
+        path = self._output_path("collapsed")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path, None
+
+    def _output_path(self, extension):
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at))
+        return os.path.join(self.output_dir, f"{self.mode}-{stamp}.{extension}")
+
+    def _finish(self, path, error=None):
+        self.path = path
+        self.error = error
+        if error:
+            logger.warning(f"Profiling produced no output: {error}")
+        else:
+            logger.info(f"Profile written to {path}")
+        if self.on_done:
+            self.on_done(self)
+
+    def status(self):
+        """Return the run's progress as a dict."""
+        remaining = max(0.0, self._stop_at - time.monotonic()) if self.is_running() else 0.0
+        return {
+            "mode": self.mode,
+            "running": self.is_running(),
+            "remaining": round(remaining, 1),
+            "samples": self.samples,
+            "path": self.path,
+            "error": self.error,
+            "unavailable": dict(self._unavailable),
+        }
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+import threading
+
+# Engine states
+ENGINE_IDLE = "idle"
+ENGINE_STARTING = "starting"
+ENGINE_RUNNING = "running"
+ENGINE_PAUSED = "paused"
+ENGINE_STOPPING = "stopping"
+ENGINE_FAILED = "failed"
+
+# Allowed transitions; a worker that ends on its own (failsafe, normal exit)
+# goes straight back to idle, and a fatal error from any active state fails
+TRANSITIONS = {
+    ENGINE_IDLE: {ENGINE_STARTING},
+    ENGINE_STARTING: {ENGINE_RUNNING, ENGINE_STOPPING, ENGINE_FAILED, ENGINE_IDLE},
+    ENGINE_RUNNING: {ENGINE_PAUSED, ENGINE_STOPPING, ENGINE_FAILED, ENGINE_IDLE},
+    ENGINE_PAUSED: {ENGINE_RUNNING, ENGINE_STOPPING, ENGINE_FAILED, ENGINE_IDLE},
+    ENGINE_STOPPING: {ENGINE_IDLE, ENGINE_FAILED},
+    ENGINE_FAILED: {ENGINE_STARTING, ENGINE_IDLE},
+}
+
+# States in which the engine counts as running
+ACTIVE_STATES = (ENGINE_STARTING, ENGINE_RUNNING, ENGINE_PAUSED)
+
+
+class StateMachine:
+    """Engine lifecycle state with atomic transitions.
+
+    Every change goes through transition(), which checks the current state
+    and the transition table under one lock, so the GUI, the control API,
+    the watchdog and the worker thread never race on read-modify-write.
+    Waiters block on a condition until a state is reached, and listeners
+    are called (outside the lock, on the thread that made the change)
+    after every transition.
+    """
+
+    def __init__(self, initial=ENGINE_IDLE):
+        self._state = initial
+        self._condition = threading.Condition()
+        self._listeners = []
+
+    def current(self):
+        """Return the current state."""
+        return self._state
+
+    def add_listener(self, callback):
+        """Call callback(old, new) after every transition."""
+        self._listeners.append(callback)
+
+    def transition(self, new, expected=None):
+        """Move to a new state if allowed (and if currently in one of expected).
+
+        Returns True if the state changed, False if the transition was not
+        allowed from the current state.
+        """
+        with self._condition:
+            old = self._state
+            if expected is not None and old not in expected:
+                return False
+            if new == old or new not in TRANSITIONS[old]:
+                return False
+            self._state = new
+            self._condition.notify_all()
+        for callback in self._listeners:
+            callback(old, new)
+        return True
+
+    def wait_change(self, state, timeout=None):
+        """Block while the state is still state, at most timeout seconds; return the current state.
+
+        May also return early, with the state unchanged, after wake().
+        """
+        with self._condition:
+            if self._state == state:
+                self._condition.wait(timeout)
+            return self._state
+
+    def wake(self):
+        """Wake the threads blocked in wait_change() without changing the state."""
+        with self._condition:
+            self._condition.notify_all()
+
+    def wait_for(self, states, timeout=None):
+        """Block until the state is one of states; return False on timeout."""
+        if isinstance(states, str):
+            states = (states,)
+        with self._condition:
+            return self._condition.wait_for(lambda: self._state in states, timeout)
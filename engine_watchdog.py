@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+import time
+import logging
+import threading
+import collections
+
+from engine_state import ENGINE_RUNNING
+
+logger = logging.getLogger("LetMeSleep")
+
+
+class Watchdog:
+    """Detect stalled or dead engine workers and restart them.
+
+    Each engine pushes its heartbeat deadline forward as it works, adding
+    the expected duration of long operations (moves, backoff waits). A
+    running, unpaused engine whose deadline has passed, or whose worker
+    thread has died, is reported through its error signal and restarted.
+    After max_restarts within restart_window seconds the engine is stopped
+    instead, so a permanently broken engine does not restart forever.
+    """
+
+    def __init__(self, engines, check_interval=2.0, max_restarts=5, restart_window=3600.0,
+                 on_stall=None):
+        self.engines = engines
+        self.check_interval = check_interval
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self.on_stall = on_stall
+        # Keyed lazily: plugin engines may be added to the dict while monitoring
+        self.stalls = collections.defaultdict(int)
+        self.restarts = collections.defaultdict(int)
+        self._recent_restarts = collections.defaultdict(collections.deque)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start monitoring in a background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="watchdog")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop monitoring."""
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.wait(self.check_interval):
+            for name, engine in list(self.engines.items()):
+                try:
+                    self.check(name, engine)
+                except Exception as e:
+                    logger.error(f"Watchdog check of {name} failed: {str(e)}")
+
+    def _stall_reason(self, engine):
+        """Return why an engine looks stalled, or None if it is healthy."""
+        if engine.state() != ENGINE_RUNNING:
+            return None
+        thread = engine.thread
+        if thread is None or not thread.is_alive():
+            return "worker thread died"
+        deadline = engine.heartbeat_deadline
+        if deadline is not None and time.monotonic() > deadline:
+            overdue = time.monotonic() - deadline
+            return f"no heartbeat for {overdue + engine.stall_timeout:.0f}s"
+        return None
+
+    def check(self, name, engine):
+        """Check one engine and recover it if it has stalled."""
+        reason = self._stall_reason(engine)
+        if reason is None:
+            return
+
+        self.stalls[name] += 1
+        message = f"Watchdog: {name} automation stalled ({reason})"
+        logger.warning(message)
+        engine.error_occurred.emit(message)
+        if self.on_stall:
+            self.on_stall(name, reason)
+
+        recent = self._recent_restarts[name]
+        now = time.monotonic()
+        while recent and now - recent[0] > self.restart_window:
+            recent.popleft()
+        if len(recent) >= self.max_restarts:
+            message = (f"Watchdog: {name} automation stalled {len(recent) + 1} times "
+                       f"within {self.restart_window / 60:.0f} minutes. Stopping automation (fatal).")
+            logger.error(message)
+            engine.error_occurred.emit(message)
+            engine.stopped_on_error.emit(message)
+            engine.stop()
+            return
+
+        recent.append(now)
+        self.restarts[name] += 1
+        if engine.restart():
+            engine.status_update.emit(f"Watchdog restarted {name} automation")
+
+    def status(self):
+        """Return stall and restart counts per engine."""
+        return {
+            name: {"stalls": self.stalls[name], "restarts": self.restarts[name]}
+            for name in list(self.engines)
+        }
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+import time
+import errno
+import random
+import logging
+import collections
+
+logger = logging.getLogger("LetMeSleep")
+
+# Error classes
+ERROR_TRANSIENT = "transient"
+ERROR_PERMISSION = "permission"
+ERROR_FATAL = "fatal"
+
+# Exception type names are matched anywhere in the MRO, so pyautogui and
+# Xlib need not be importable here
+_PERMISSION_TYPE_NAMES = {"PermissionError"}
+_FATAL_TYPE_NAMES = {"FailSafeException", "ImageNotFoundException"}
+_PERMISSION_ERRNOS = {errno.EACCES, errno.EPERM}
+
+
+def classify_error(exception):
+    """Classify an exception as transient, permission or fatal."""
+    names = {cls.__name__ for cls in type(exception).__mro__}
+    if names & _PERMISSION_TYPE_NAMES:
+        return ERROR_PERMISSION
+    if isinstance(exception, OSError) and exception.errno in _PERMISSION_ERRNOS:
+        return ERROR_PERMISSION
+    if names & _FATAL_TYPE_NAMES:
+        return ERROR_FATAL
+    # Programming errors will not go away by retrying
+    if isinstance(exception, (TypeError, AttributeError, NotImplementedError, ImportError)):
+        return ERROR_FATAL
+    # Display hiccups (Xlib errors, OSError, timeouts) and anything unknown
+    # get retried, but count against the error budget
+    return ERROR_TRANSIENT
+
+
+class ErrorDecision:
+    """What the engine should do after an error."""
+
+    __slots__ = ("kind", "retry", "delay", "reason", "breaker_opened")
+
+    def __init__(self, kind, retry, delay=0.0, reason="", breaker_opened=False):
+        self.kind = kind
+        self.retry = retry
+        self.delay = delay
+        self.reason = reason
+        self.breaker_opened = breaker_opened
+
+
+class ErrorPolicy:
+    """Backoff, error budget and circuit breaker for one engine.
+
+    Consecutive errors back off exponentially with jitter. After
+    breaker_threshold consecutive errors the circuit opens and the engine
+    waits breaker_cooldown seconds (doubling up to max_cooldown) before
+    trying again, so a dead display does not spin. Any success resets the
+    backoff and closes the circuit. More than budget errors within window
+    seconds stops the engine; permission and fatal errors stop it at once.
+    """
+
+    def __init__(self, base_delay=0.5, max_delay=30.0, jitter=0.5,
+                 window=300.0, budget=30,
+                 breaker_threshold=5, breaker_cooldown=60.0, max_cooldown=900.0):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.window = window
+        self.budget = budget
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.max_cooldown = max_cooldown
+        # Own RNG so backoff jitter does not disturb the engine's seeded sequence
+        self._rng = random.Random()
+        self.reset()
+
+    def reset(self):
+        """Forget all error history."""
+        self.consecutive = 0
+        self.breaker_trips = 0
+        self.breaker_open = False
+        self._recent = collections.deque()
+
+    def record_success(self):
+        """Record a successful action: resets backoff and closes the circuit."""
+        if self.consecutive or self.breaker_open:
+            if self.breaker_open:
+                logger.info("Circuit breaker closed after successful action")
+            self.consecutive = 0
+            self.breaker_open = False
+            self.breaker_trips = 0
+
+    def _jittered(self, delay):
+        return delay * (1.0 + self.jitter * (2.0 * self._rng.random() - 1.0))
+
+    def record_failure(self, exception, now=None):
+        """Record an error and decide whether and when to retry."""
+        now = time.monotonic() if now is None else now
+        kind = classify_error(exception)
+        if kind == ERROR_PERMISSION:
+            return ErrorDecision(kind, False, reason="Permission denied for input control")
+        if kind == ERROR_FATAL:
+            return ErrorDecision(kind, False, reason="Unrecoverable error")
+
+        # Sliding window error budget
+        self._recent.append(now)
+        while self._recent and now - self._recent[0] > self.window:
+            self._recent.popleft()
+        if len(self._recent) > self.budget:
+            return ErrorDecision(kind, False, reason=(
+                f"Error budget exhausted ({len(self._recent)} errors in {self.window:.0f}s)"))
+
+        self.consecutive += 1
+        if self.breaker_open or self.consecutive >= self.breaker_threshold:
+            # Open the circuit, or re-open it when the trial after a cooldown fails
+            cooldown = min(self.max_cooldown, self.breaker_cooldown * (2 ** self.breaker_trips))
+            self.breaker_trips += 1
+            self.breaker_open = True
+            return ErrorDecision(kind, True, self._jittered(cooldown), breaker_opened=True,
+                                 reason=f"Circuit open after {self.breaker_threshold} consecutive errors")
+
+        delay = min(self.max_delay, self.base_delay * (2 ** (self.consecutive - 1)))
+        return ErrorDecision(kind, True, self._jittered(delay))
+
+    def status(self):
+        """Return the policy state as a dict."""
+        return {
+            "consecutive": self.consecutive,
+            "recent": len(self._recent),
+            "budget": self.budget,
+            "breaker_open": self.breaker_open,
+            "breaker_trips": self.breaker_trips,
+        }
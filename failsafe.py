@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+import logging
+import threading
+
+from engine_state import ENGINE_RUNNING
+
+logger = logging.getLogger("LetMeSleep")
+
+
+class FailsafeMonitor:
+    """Stop the engines when the pointer is moved into the top-left corner.
+
+    One background thread reads the pointer position at a low rate while
+    any engine is running (not paused) with its failsafe active, so the
+    engine workers never poll for it and can block until their next action.
+    With nothing to guard it checks only every idle_interval seconds;
+    wake() makes it look again at once, e.g. right after a start or resume.
+    """
+
+    def __init__(self, engines, backend, interval=0.25, idle_interval=2.0, corner=5):
+        self.engines = engines
+        self.backend = backend
+        self.interval = interval
+        self.idle_interval = idle_interval
+        self.corner = corner
+        self.triggers = 0
+        # Optional session_report.SessionStats counting each hit once
+        self.session_stats = None
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start monitoring in a background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="failsafe-monitor")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop monitoring."""
+        self._stop_event.set()
+        self._wake_event.set()
+
+    def wake(self):
+        """Check the engines again now instead of after the idle interval."""
+        self._wake_event.set()
+
+    def _armed(self):
+        """Return the engines that can move the pointer and have the failsafe on."""
+        return [engine for engine in list(self.engines.values())
+                if engine.failsafe_active and engine.state() == ENGINE_RUNNING]
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            armed = self._armed()
+            if armed:
+                try:
+                    self.check(armed)
+                except Exception as e:
+                    logger.warning(f"Error checking failsafe: {str(e)}")
+            self._wake_event.wait(self.interval if armed else self.idle_interval)
+            self._wake_event.clear()
+
+    def check(self, armed):
+        """Stop the armed engines if the pointer is in the corner; return True if it was."""
+        x, y = self.backend.position()
+        if x >= self.corner or y >= self.corner:
+            return False
+        self.triggers += 1
+        if self.session_stats is not None:
+            self.session_stats.count_failsafe()
+        logger.warning(f"Failsafe: pointer at {x}, {y}; stopping automation")
+        # Every engine journals the hit; the shared journal is dumped once, after the last
+        for index, engine in enumerate(armed):
+            engine.failsafe_stop(x, y, dump=index == len(armed) - 1)
+        return True
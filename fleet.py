@@ -0,0 +1,586 @@
+#!/usr/bin/env python3
+"""Fleet supervisor that drives one headless automation worker per X display.
+
+Usage:
+    python fleet.py --display :1 --display :2 --profile office
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import threading
+import multiprocessing
+from multiprocessing.connection import wait
+
+from profiles import load_profile, check_profile, ProfileError
+from backends import BACKENDS
+from session_report import DEFAULT_REPORT_DIR, REPORT_FORMATS
+
+logger = logging.getLogger("LetMeSleep")
+
+# Worker exit codes
+EXIT_OK = 0
+EXIT_ENGINE_FAILED = 2
+EXIT_STARTUP_FAILED = 3
+
+
+def apply_power_profile(profile, engines, rate_controller):
+    """Share the rate controller check_profile prepared between a worker's engines."""
+    if "power" not in profile:
+        return
+    for engine in engines.values():
+        engine.rate_controller = rate_controller
+
+
+def apply_adaptive_profile(profile, engines, display, adaptive=None, power_ceiling=None):
+    """Set a worker's keep-alive intervals from its display's idle timeout.
+
+    Returns the idle_timeout.AdaptiveInterval in use: a new one for an
+    "adaptive" profile section, else the one passed in (or None).
+    power_ceiling is the keep-alive ceiling the power section set; the
+    shared rate controller's ceiling is recomputed from it every time, so
+    it follows a longer idle timeout back up.
+    """
+    if "adaptive" in profile:
+        options = dict(profile["adaptive"] or {})
+        adaptive = None
+        if options.pop("enabled", True):
+            from idle_timeout import AdaptiveInterval, X11IdleTimeout
+            adaptive = AdaptiveInterval(X11IdleTimeout(display), **options)
+            adaptive.refresh()
+    if adaptive is not None:
+        from idle_timeout import apply_adaptive_interval
+        apply_adaptive_interval(adaptive, engines)
+    if power_ceiling is not None:
+        for engine in engines.values():
+            if engine.rate_controller is not None:
+                # Power saving must not stretch the pauses past the idle timeout
+                engine.rate_controller.keepalive_ceiling = (
+                    power_ceiling if adaptive is None else min(power_ceiling, adaptive.high))
+    return adaptive
+
+
+def check_fleet_profile(profile):
+    """Check a profile before it is handed to the workers; raises ProfileError."""
+    from automation import MouseAutomation, KeyboardAutomation
+    from plugins import PluginRegistry
+    check_profile(profile, {"mouse": MouseAutomation, "keyboard": KeyboardAutomation}, PluginRegistry())
+
+
+def _worker_main(display, profile, conn, heartbeat_interval, cpu, backend_name, reports=None):
+    """Entry point of a headless worker process bound to one display."""
+    # DISPLAY must be set before pyautogui is imported by the engine
+    os.environ["DISPLAY"] = display
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f'%(asctime)s - %(name)s[{display}] - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+    if cpu is not None and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, {cpu})
+        except OSError as e:
+            logger.warning(f"Could not pin worker to CPU {cpu}: {str(e)}")
+
+    try:
+        from PyQt5.QtCore import Qt
+        from automation import MouseAutomation, KeyboardAutomation, seed_engines
+        from backends import create_backend
+        from engine_watchdog import Watchdog
+        from failsafe import FailsafeMonitor
+        from journal import EventJournal, DEFAULT_JOURNAL_DIR
+        from session_report import SessionStats, export_report
+        from profiles import apply_profile, profile_enabled
+        from plugins import PluginRegistry, PluginError
+        from window_target import WindowTarget, WindowTargetError
+        backend = create_backend(backend_name)
+    except Exception as e:
+        conn.send({"type": "error", "engine": None, "message": f"Worker startup failed: {str(e)}"})
+        sys.exit(EXIT_STARTUP_FAILED)
+
+    engines = {
+        "mouse": MouseAutomation(backend),
+        "keyboard": KeyboardAutomation(backend),
+    }
+    plugins = PluginRegistry()
+    engine_classes = {name: type(engine) for name, engine in engines.items()}
+    try:
+        rate_controller = check_profile(profile, engine_classes, plugins)
+    except ProfileError as e:
+        # Restarting would only fail the same way
+        conn.send({"type": "error", "engine": None, "message": str(e)})
+        sys.exit(EXIT_STARTUP_FAILED)
+    # Plugins named in the profile are loaded only if enabled there
+    for name in profile:
+        if name in plugins and profile_enabled(profile, name):
+            try:
+                engines[name] = plugins.create(name, backend)
+            except PluginError as e:
+                conn.send({"type": "error", "engine": name, "message": str(e)})
+    metrics = {name: {"status": 0, "errors": 0, "failsafe": 0} for name in engines}
+    failsafe_hit = threading.Event()
+    send_lock = threading.Lock()
+
+    def send(message):
+        # Signals fire on the engine threads, so guard the shared pipe
+        with send_lock:
+            try:
+                conn.send(message)
+            except (OSError, EOFError):
+                pass
+
+    def connect_engine(name, engine):
+        def on_status(message):
+            metrics[name]["status"] += 1
+            send({"type": "status", "engine": name, "message": message})
+
+        def on_error(message):
+            metrics[name]["errors"] += 1
+            send({"type": "error", "engine": name, "message": message})
+
+        def on_failsafe():
+            metrics[name]["failsafe"] += 1
+            failsafe_hit.set()
+
+        # Direct connections: there is no Qt event loop in the worker
+        engine.status_update.connect(on_status, Qt.DirectConnection)
+        engine.error_occurred.connect(on_error, Qt.DirectConnection)
+        engine.failsafe_triggered.connect(on_failsafe, Qt.DirectConnection)
+
+    # One journal directory per display so simultaneous dumps do not collide
+    journal = EventJournal(journal_dir=os.path.join(
+        DEFAULT_JOURNAL_DIR, "display-" + display.lstrip(":").replace(":", "-")))
+    session_stats = SessionStats()
+    for name, engine in engines.items():
+        connect_engine(name, engine)
+        engine.set_journal(journal, name)
+        engine.set_session_stats(session_stats, name)
+
+    watchdog = Watchdog(engines)
+    watchdog.start()
+    failsafe_monitor = FailsafeMonitor(engines, backend)
+    failsafe_monitor.session_stats = session_stats
+    failsafe_monitor.start()
+
+    # Session reports go to one directory per display, like the journal
+    report_dir = None
+    if reports:
+        report_dir = os.path.join(reports["dir"], "display-" + display.lstrip(":").replace(":", "-"))
+    report_at = time.time() + reports["interval"] if reports and reports.get("interval") else None
+
+    def save_report(reason):
+        try:
+            export_report(session_stats.report(), report_dir, reports["formats"], reason)
+        except OSError as e:
+            logger.warning(f"Failed to save session report: {str(e)}")
+
+    target = profile.get("target")
+    if target:
+        try:
+            window_target = WindowTarget(target.get("title"), target.get("class"), display_name=display)
+            window_target.start()
+            for engine in engines.values():
+                engine.window_target = window_target
+        except WindowTargetError as e:
+            send({"type": "error", "engine": None, "message": str(e)})
+
+    seed_engines(engines, profile.get("seed"))
+    apply_profile(profile, engines)
+    apply_power_profile(profile, engines, rate_controller)
+    power_ceiling = rate_controller.keepalive_ceiling if rate_controller is not None else None
+    adaptive = None
+    try:
+        adaptive = apply_adaptive_profile(profile, engines, display, power_ceiling=power_ceiling)
+    except Exception as e:
+        send({"type": "error", "engine": None, "message": f"Adaptive keep-alive unavailable: {str(e)}"})
+    started = [
+        name for name, engine in engines.items()
+        if profile_enabled(profile, name) and engine.start()
+    ]
+    if not started:
+        send({"type": "error", "engine": None, "message": "No automation enabled for this display"})
+        sys.exit(EXIT_OK)
+    failsafe_monitor.wake()
+
+    def heartbeat():
+        send({
+            "type": "heartbeat",
+            "time": time.time(),
+            "engines": {
+                name: {
+                    "state": engine.state(),
+                    "running": engine.is_running(),
+                    "paused": engine.is_paused(),
+                    "seed": engine.active_seed,
+                    "metrics": dict(metrics[name], **watchdog.status()[name]),
+                }
+                for name, engine in engines.items()
+            },
+            "session": session_stats.report()["totals"],
+        })
+
+    exit_code = EXIT_OK
+    try:
+        while True:
+            heartbeat()
+            if failsafe_hit.is_set():
+                # Respect the failsafe: stop everything and do not get restarted
+                break
+            if not any(engine.is_running() for engine in engines.values()):
+                exit_code = EXIT_ENGINE_FAILED
+                break
+            if adaptive is not None and time.time() - adaptive.refreshed_at >= adaptive.refresh_interval:
+                try:
+                    adaptive.refresh()
+                except Exception as e:
+                    # Keep the last known range rather than guessing
+                    logger.warning(f"Adaptive keep-alive: {str(e)}")
+                    adaptive.refreshed_at = time.time()
+                apply_adaptive_profile({}, engines, display, adaptive, power_ceiling)
+            if report_at is not None and time.time() >= report_at:
+                save_report("scheduled")
+                report_at = time.time() + reports["interval"]
+            if not conn.poll(heartbeat_interval):
+                continue
+
+            command = conn.recv()
+            action = command.get("command")
+            if action == "stop":
+                break
+            elif action == "pause":
+                for engine in engines.values():
+                    engine.pause()
+            elif action == "resume":
+                for engine in engines.values():
+                    engine.resume()
+                failsafe_monitor.wake()
+            elif action == "profile":
+                new_profile = command.get("profile", {})
+                try:
+                    rate_controller = check_profile(new_profile, engine_classes, plugins)
+                except ProfileError as e:
+                    # Keep running the current settings
+                    send({"type": "error", "engine": None, "message": str(e)})
+                    continue
+                if "seed" in new_profile:
+                    seed_engines(engines, new_profile["seed"])
+                apply_profile(new_profile, engines)
+                apply_power_profile(new_profile, engines, rate_controller)
+                if "power" in new_profile:
+                    power_ceiling = rate_controller.keepalive_ceiling if rate_controller is not None else None
+                try:
+                    adaptive = apply_adaptive_profile(new_profile, engines, display, adaptive, power_ceiling)
+                except Exception as e:
+                    send({"type": "error", "engine": None, "message": f"Adaptive keep-alive unavailable: {str(e)}"})
+                send({"type": "status", "engine": None, "message": "Profile applied"})
+            else:
+                logger.warning(f"Unknown worker command: {action}")
+    except (EOFError, KeyboardInterrupt):
+        # Supervisor went away
+        pass
+    finally:
+        for engine in engines.values():
+            engine.stop()
+        heartbeat()
+        if report_dir:
+            save_report("stop")
+    sys.exit(exit_code)
+
+
+class WorkerHandle:
+    """Supervisor-side bookkeeping for one worker process."""
+
+    def __init__(self, display, cpu=None):
+        self.display = display
+        self.cpu = cpu
+        self.process = None
+        self.conn = None
+        self.restarts = 0
+        self.started_at = None
+        self.restart_at = None
+        self.finished = False
+        self.last_heartbeat = None
+        self.engines = {}
+        self.last_message = ""
+
+    def is_alive(self):
+        """Check if the worker process is alive."""
+        return self.process is not None and self.process.is_alive()
+
+    def status(self):
+        """Return the worker's aggregated status as a dict."""
+        return {
+            "display": self.display,
+            "pid": self.process.pid if self.process else None,
+            "alive": self.is_alive(),
+            "finished": self.finished,
+            "restarts": self.restarts,
+            "uptime": time.time() - self.started_at if self.started_at and self.is_alive() else 0.0,
+            "last_heartbeat": self.last_heartbeat,
+            "engines": self.engines,
+            "last_message": self.last_message,
+        }
+
+
+class FleetSupervisor:
+    """Spawn, monitor and restart one headless worker per display."""
+
+    def __init__(self, displays, profile=None, heartbeat_interval=5.0,
+                 restart_delay=1.0, max_restart_delay=60.0, stable_after=60.0,
+                 pin_cpus=False, backend="pyautogui", reports=None):
+        self.profile = profile or {}
+        # {"dir", "formats", "interval"} to save per-display session reports, or None
+        self.reports = reports
+        self.heartbeat_interval = heartbeat_interval
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.stable_after = stable_after
+        self.backend = backend
+        # Spawn so every worker imports pyautogui against its own DISPLAY
+        self._context = multiprocessing.get_context("spawn")
+        cpu_count = os.cpu_count() or 1
+        self.workers = [
+            WorkerHandle(display, cpu=(index % cpu_count) if pin_cpus else None)
+            for index, display in enumerate(displays)
+        ]
+        self._running = False
+
+    def _spawn(self, worker):
+        """Start (or restart) a worker process."""
+        parent_conn, child_conn = self._context.Pipe()
+        worker.process = self._context.Process(
+            target=_worker_main,
+            args=(worker.display, self.profile, child_conn, self.heartbeat_interval,
+                  worker.cpu, self.backend, self.reports),
+            name=f"letmesleep-worker{worker.display}",
+            daemon=True,
+        )
+        worker.process.start()
+        child_conn.close()
+        worker.conn = parent_conn
+        worker.started_at = time.time()
+        worker.restart_at = None
+        worker.finished = False
+        logger.info(f"Started worker for display {worker.display} (pid {worker.process.pid})")
+
+    def start(self):
+        """Start all workers."""
+        self._running = True
+        for worker in self.workers:
+            self._spawn(worker)
+
+    def stop(self, timeout=5.0):
+        """Ask all workers to stop and wait for them to exit."""
+        self._running = False
+        for worker in self.workers:
+            self._send(worker, {"command": "stop"})
+        deadline = time.time() + timeout
+        for worker in self.workers:
+            if worker.process is None:
+                continue
+            worker.process.join(max(0.0, deadline - time.time()))
+            if worker.process.is_alive():
+                logger.warning(f"Worker for display {worker.display} did not stop, terminating")
+                worker.process.terminate()
+                worker.process.join(1.0)
+
+    def _send(self, worker, command):
+        """Send a command to a worker if it is alive."""
+        if not worker.is_alive() or worker.conn is None:
+            return False
+        try:
+            worker.conn.send(command)
+            return True
+        except (OSError, EOFError):
+            return False
+
+    def broadcast(self, command, display=None):
+        """Send a command to all workers, or only the one on the given display."""
+        return sum(
+            self._send(worker, command)
+            for worker in self.workers
+            if display is None or worker.display == display
+        )
+
+    def set_profile(self, profile, display=None):
+        """Distribute a profile to running workers and use it for restarts.
+
+        Raises ProfileError for an invalid profile, which is neither kept
+        nor sent.
+        """
+        check_fleet_profile(profile)
+        if display is None:
+            self.profile = profile
+        return self.broadcast({"command": "profile", "profile": profile}, display)
+
+    def status(self):
+        """Return the aggregated status of the whole fleet."""
+        workers = [worker.status() for worker in self.workers]
+        totals = {"status": 0, "errors": 0, "failsafe": 0, "stalls": 0, "restarts": 0}
+        for worker in workers:
+            for engine in worker["engines"].values():
+                for key in totals:
+                    totals[key] += engine.get("metrics", {}).get(key, 0)
+        return {
+            "workers": workers,
+            "alive": sum(1 for worker in workers if worker["alive"]),
+            "restarts": sum(worker["restarts"] for worker in workers),
+            "totals": totals,
+        }
+
+    def _handle_message(self, worker, message):
+        """Process a message received from a worker."""
+        kind = message.get("type")
+        if kind == "heartbeat":
+            worker.last_heartbeat = message.get("time")
+            worker.engines = message.get("engines", {})
+        elif kind == "status":
+            worker.last_message = message.get("message", "")
+            logger.debug(f"[{worker.display}] {message.get('engine')}: {worker.last_message}")
+        elif kind == "error":
+            worker.last_message = message.get("message", "")
+            logger.error(f"[{worker.display}] {message.get('engine')}: {worker.last_message}")
+
+    def _handle_exit(self, worker):
+        """Decide what to do with a worker that has exited."""
+        exit_code = worker.process.exitcode
+        if worker.conn is not None:
+            worker.conn.close()
+            worker.conn = None
+
+        if exit_code == EXIT_OK or not self._running:
+            logger.info(f"Worker for display {worker.display} finished")
+            worker.finished = True
+            return
+        if exit_code == EXIT_STARTUP_FAILED:
+            # A bad profile or a missing dependency fails the same way on every restart
+            logger.error(f"Worker for display {worker.display} could not start, not restarting")
+            worker.finished = True
+            return
+
+        # Reset the backoff once a worker has been stable for a while
+        if time.time() - worker.started_at >= self.stable_after:
+            worker.restarts = 0
+        delay = min(self.max_restart_delay, self.restart_delay * (2 ** worker.restarts))
+        worker.restarts += 1
+        worker.restart_at = time.time() + delay
+        logger.warning(
+            f"Worker for display {worker.display} exited with code {exit_code}, "
+            f"restarting in {delay:.1f}s"
+        )
+
+    def poll(self, timeout=1.0):
+        """Process pending worker messages, exits and restarts once."""
+        now = time.time()
+        for worker in self.workers:
+            if worker.restart_at is not None and now >= worker.restart_at:
+                self._spawn(worker)
+
+        waitables = {}
+        for worker in self.workers:
+            if worker.conn is not None:
+                waitables[worker.conn] = worker
+                waitables[worker.process.sentinel] = worker
+        pending = [w.restart_at for w in self.workers if w.restart_at is not None]
+        if pending:
+            timeout = max(0.0, min(timeout, min(pending) - now))
+        if not waitables:
+            time.sleep(timeout)
+            return
+
+        for ready in wait(list(waitables), timeout):
+            worker = waitables[ready]
+            if ready is worker.conn:
+                try:
+                    while worker.conn is not None and worker.conn.poll():
+                        self._handle_message(worker, worker.conn.recv())
+                except (EOFError, OSError):
+                    pass
+            elif worker.conn is not None:
+                # Drain anything sent right before the worker died
+                try:
+                    while worker.conn.poll():
+                        self._handle_message(worker, worker.conn.recv())
+                except (EOFError, OSError):
+                    pass
+                worker.process.join()
+                self._handle_exit(worker)
+
+    def run(self, status_interval=30.0):
+        """Run the supervisor loop until all workers finish or interrupted."""
+        self.start()
+        next_report = time.time() + status_interval
+        try:
+            while any(not worker.finished for worker in self.workers):
+                self.poll(min(1.0, status_interval))
+                if time.time() >= next_report:
+                    status = self.status()
+                    logger.info(
+                        f"Fleet: {status['alive']}/{len(self.workers)} workers alive, "
+                        f"{status['restarts']} restarts, totals {status['totals']}"
+                    )
+                    next_report = time.time() + status_interval
+        except KeyboardInterrupt:
+            logger.info("Interrupted, stopping fleet")
+        finally:
+            self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run headless LetMeSleep workers, one per display.")
+    parser.add_argument("--display", action="append", required=True, dest="displays",
+                        help="X display to drive (repeat for each display)")
+    parser.add_argument("--profile", help="Profile name or path to apply to every worker")
+    parser.add_argument("--status-interval", type=float, default=30.0,
+                        help="Seconds between aggregated status reports")
+    parser.add_argument("--heartbeat-interval", type=float, default=5.0,
+                        help="Seconds between worker heartbeats")
+    parser.add_argument("--pin-cpus", action="store_true",
+                        help="Pin each worker to its own CPU core")
+    parser.add_argument("--backend", default="pyautogui", choices=["auto"] + sorted(BACKENDS),
+                        help="Input backend used by the workers")
+    parser.add_argument("--seed", type=int,
+                        help="Master random seed (overrides the profile's seed)")
+    parser.add_argument("--report-dir", nargs="?", const=DEFAULT_REPORT_DIR,
+                        help="Save a session report per display when its worker stops "
+                             f"(default: {DEFAULT_REPORT_DIR}/display-N)")
+    parser.add_argument("--report-interval", type=float, default=0.0,
+                        help="Also save the session reports every N seconds")
+    parser.add_argument("--report-format", action="append", choices=REPORT_FORMATS,
+                        help="Session report format (repeat for both; default: json)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+
+    profile = {}
+    if args.profile:
+        try:
+            profile = load_profile(args.profile)
+            check_fleet_profile(profile)
+        except ProfileError as e:
+            logger.error(str(e))
+            return 1
+
+    if args.seed is not None:
+        profile["seed"] = args.seed
+
+    supervisor = FleetSupervisor(
+        args.displays,
+        profile=profile,
+        heartbeat_interval=args.heartbeat_interval,
+        pin_cpus=args.pin_cpus,
+        backend=args.backend,
+        reports={"dir": args.report_dir, "formats": args.report_format or ["json"],
+                 "interval": args.report_interval} if args.report_dir else None,
+    )
+    supervisor.run(status_interval=args.status_interval)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Derive the keep-alive interval from the system idle timeout.
+
+The shortest of the idle timeouts that would end the session (the X11
+screensaver timeout, the DPMS standby/suspend/off timeouts, and an
+optional chat presence timeout that cannot be queried) decides how often
+input is needed. The keep-alive interval is set just below it, minus a
+safety margin, so as few events as possible are injected while the
+session never goes idle. Timeouts come from a provider: X11IdleTimeout
+asks the local X server, FixedIdleTimeout returns configured values (for
+tests and for platforms without a query).
+"""
+import re
+import time
+import shutil
+import logging
+import subprocess
+
+logger = logging.getLogger("LetMeSleep")
+
+# Assumed when the system reports no idle timeout at all (screensaver and DPMS off)
+FALLBACK_TIMEOUT = 300.0
+
+_XSET_DPMS_RE = re.compile(r"Standby:\s*(\d+)\s+Suspend:\s*(\d+)\s+Off:\s*(\d+)")
+
+
+class IdleTimeoutError(Exception):
+    """Exception raised when the system idle timeout cannot be read."""
+    pass
+
+
+class FixedIdleTimeout:
+    """Idle timeout provider returning fixed values."""
+
+    def __init__(self, timeouts):
+        # A single number is taken as the screensaver timeout
+        if not isinstance(timeouts, dict):
+            timeouts = {"screensaver": timeouts}
+        self.timeouts = dict(timeouts)
+        self.queries = 0
+
+    def query(self):
+        """Return the enabled idle timeouts in seconds, keyed by source."""
+        self.queries += 1
+        return {source: float(seconds) for source, seconds in self.timeouts.items() if seconds}
+
+
+class X11IdleTimeout:
+    """Read the screensaver and DPMS timeouts from the X server.
+
+    A display connection is opened per query; queries are minutes apart.
+    DPMS timeouts come from the DPMS extension if python-xlib has it, and
+    from `xset q` otherwise.
+    """
+
+    def __init__(self, display_name=None):
+        try:
+            from Xlib.display import Display
+            from Xlib.error import DisplayError
+        except ImportError:
+            raise IdleTimeoutError("Reading the idle timeout needs python-xlib on X11")
+        self._Display = Display
+        self._DisplayError = DisplayError
+        self.display_name = display_name
+
+    def query(self):
+        """Return the enabled idle timeouts in seconds, keyed by source."""
+        try:
+            display = self._Display(self.display_name)
+        except (self._DisplayError, OSError) as e:
+            raise IdleTimeoutError(f"Cannot open X display to read the idle timeout: {str(e)}")
+        try:
+            timeouts = {}
+            saver = display.get_screen_saver()
+            if saver.timeout:
+                timeouts["screensaver"] = float(saver.timeout)
+            timeouts.update(self._dpms(display))
+            return timeouts
+        finally:
+            display.close()
+
+    def _dpms(self, display):
+        """Return the enabled DPMS timeouts, or {} if DPMS is off or unknown."""
+        if hasattr(display, "dpms_info") and display.has_extension("DPMS"):
+            if not display.dpms_info().state:
+                return {}
+            reply = display.dpms_get_timeouts()
+            values = (reply.standby_timeout, reply.suspend_timeout, reply.off_timeout)
+        else:
+            values = self._xset_dpms()
+        return {f"dpms_{name}": float(value)
+                for name, value in zip(("standby", "suspend", "off"), values) if value}
+
+    def _xset_dpms(self):
+        """Parse the DPMS timeouts from `xset q`; () if unavailable or disabled."""
+        if shutil.which("xset") is None:
+            return ()
+        command = ["xset", "q"] + (["-display", self.display_name] if self.display_name else [])
+        try:
+            output = subprocess.run(command, capture_output=True, text=True, timeout=5).stdout
+        except (OSError, subprocess.SubprocessError):
+            return ()
+        match = _XSET_DPMS_RE.search(output)
+        if match is None or "DPMS is Enabled" not in output:
+            return ()
+        return tuple(int(value) for value in match.groups())
+
+
+class AdaptiveInterval:
+    """Keep-alive interval range just below the shortest idle timeout.
+
+    high is the timeout minus the larger of margin (a fraction) and
+    min_margin (seconds), never below floor; low is spread below high, so
+    actions do not land on a fixed period. The provider is queried again
+    every refresh_interval seconds by the owner, so changed screensaver
+    settings are picked up.
+    """
+
+    def __init__(self, provider, margin=0.2, min_margin=10.0, floor=5.0, spread=0.25,
+                 presence_timeout=None, refresh_interval=300.0):
+        if not 0 <= margin < 1:
+            raise ValueError("Adaptive keep-alive margin must be a fraction between 0 and 1")
+        self.provider = provider
+        self.margin = margin
+        self.min_margin = min_margin
+        self.floor = floor
+        self.spread = spread
+        self.presence_timeout = presence_timeout or None
+        self.refresh_interval = refresh_interval
+        self.timeouts = {}
+        self.source = None
+        self.timeout = None
+        self.low = None
+        self.high = None
+        self.refreshed_at = None
+
+    def refresh(self):
+        """Query the idle timeouts and recompute the range; return True if it changed."""
+        timeouts = self.provider.query()
+        if self.presence_timeout:
+            timeouts["presence"] = float(self.presence_timeout)
+        if not timeouts:
+            timeouts = {"fallback": FALLBACK_TIMEOUT}
+        source, timeout = min(timeouts.items(), key=lambda item: item[1])
+        # The floor only guards against silly margins; it never reaches the timeout
+        floor = min(self.floor, timeout / 2)
+        high = max(floor, timeout - max(timeout * self.margin, self.min_margin))
+        low = max(floor, high * (1.0 - self.spread))
+        changed = (low, high) != (self.low, self.high)
+        if changed:
+            logger.info(f"Adaptive keep-alive: {source} timeout {timeout:.0f}s, "
+                        f"acting every {low:.0f}-{high:.0f}s")
+        self.timeouts = timeouts
+        self.source, self.timeout = source, timeout
+        self.low, self.high = low, high
+        self.refreshed_at = time.time()
+        return changed
+
+    def status(self):
+        """Return the current timeouts and interval range as a dict."""
+        return {
+            "timeouts": self.timeouts,
+            "limited_by": self.source,
+            "timeout": self.timeout,
+            "interval": [self.low, self.high],
+            "margin": self.margin,
+        }
+
+
+def apply_adaptive_interval(adaptive, engines):
+    """Set the mouse pauses and the keyboard keep-alive interval of a dict of engines."""
+    if "mouse" in engines:
+        engines["mouse"].apply_settings({"between_min_interval": adaptive.low,
+                                         "between_max_interval": adaptive.high})
+    if "keyboard" in engines:
+        engines["keyboard"].apply_settings({"keepalive_interval": adaptive.high})
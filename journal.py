@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Fixed-size binary journal of injected actions, for post-mortem analysis.
+
+Every action is packed into a preallocated ring buffer as one fixed-size
+record, so journaling allocates nothing per event and the oldest records
+are overwritten once the buffer is full. The buffer is dumped to disk on
+fatal errors, on failsafe, or on demand, and this module decodes dumps:
+
+    python journal.py ~/.letmesleep/journal/journal-20240101-120000-error.bin
+    python journal.py dump.bin --json --tail 50
+"""
+import os
+import sys
+import json
+import time
+import struct
+import logging
+import argparse
+import threading
+
+from backends import KEEPALIVE_KEYS
+
+logger = logging.getLogger("LetMeSleep")
+
+DEFAULT_JOURNAL_DIR = os.path.join(os.path.expanduser("~"), ".letmesleep", "journal")
+
+# Action codes. x/y hold the target for moves, (clicks, button) for clicks,
+# the amount for scrolls, the code point for keys (or y = 1 + index into
+# backends.KEEPALIVE_KEYS for a named key) and the error class for errors
+ACTION_MOVE = 0
+ACTION_CLICK = 1
+ACTION_SCROLL = 2
+ACTION_KEY = 3
+ACTION_FAILSAFE = 4
+ACTION_ERROR = 5
+ACTION_NAMES = ("move", "click", "scroll", "key", "failsafe", "error")
+
+# Outcome codes
+OUTCOME_OK = 0
+OUTCOME_ERROR = 1
+OUTCOME_STOPPED = 2
+OUTCOME_NAMES = ("ok", "error", "stopped")
+
+# Error classes stored in x for error records (see error_policy)
+ERROR_KIND_NAMES = ("transient", "permission", "fatal")
+
+# actual time, planned time, duration, source, action, outcome, x, y
+RECORD = struct.Struct("<ddfBBBxii")
+# magic, version, record size, capacity, records ever written, metadata length
+HEADER = struct.Struct("<4sHHIQI")
+MAGIC = b"LMSJ"
+VERSION = 1
+
+
+class JournalError(Exception):
+    """Exception raised for unreadable journal dumps."""
+    pass
+
+
+class EventJournal:
+    """Ring buffer of fixed-size action records shared by the engines."""
+
+    def __init__(self, capacity=4096, journal_dir=DEFAULT_JOURNAL_DIR):
+        self.capacity = capacity
+        self.journal_dir = journal_dir
+        self._buffer = bytearray(RECORD.size * capacity)
+        self._written = 0
+        self._sources = []
+        self._lock = threading.Lock()
+
+    def register_source(self, name):
+        """Return the source code for an engine name, registering it if new."""
+        with self._lock:
+            if name not in self._sources:
+                self._sources.append(name)
+            return self._sources.index(name)
+
+    def record(self, source, action, x=0, y=0, planned=0.0, actual=0.0, duration=0.0,
+               outcome=OUTCOME_OK):
+        """Append one record, overwriting the oldest once the buffer is full."""
+        with self._lock:
+            offset = (self._written % self.capacity) * RECORD.size
+            RECORD.pack_into(self._buffer, offset, actual, planned, duration,
+                             source, action, outcome, x, y)
+            self._written += 1
+
+    def __len__(self):
+        return min(self._written, self.capacity)
+
+    def snapshot(self):
+        """Return (records ever written, record bytes in chronological order)."""
+        with self._lock:
+            written = self._written
+            if written <= self.capacity:
+                return written, bytes(self._buffer[:written * RECORD.size])
+            split = (written % self.capacity) * RECORD.size
+            return written, bytes(self._buffer[split:] + self._buffer[:split])
+
+    def dump(self, reason="manual", path=None):
+        """Write the journal to disk and return the file path."""
+        written, records = self.snapshot()
+        meta = json.dumps({"reason": reason, "dumped_at": time.time(),
+                           "sources": list(self._sources)}).encode("utf-8")
+        if path is None:
+            os.makedirs(self.journal_dir, exist_ok=True)
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            path = os.path.join(self.journal_dir, f"journal-{stamp}-{reason}.bin")
+        # Write to a temporary file first so a crash never leaves a torn dump
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, self.capacity, written, len(meta)))
+            f.write(meta)
+            f.write(records)
+        os.replace(tmp_path, path)
+        logger.info(f"Event journal dumped to {path} ({len(records) // RECORD.size} records, reason: {reason})")
+        return path
+
+
+def read_journal(path):
+    """Read a journal dump and return (metadata, list of record dicts)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        raise JournalError(f"{path} is too short to be a journal dump")
+    magic, version, record_size, capacity, written, meta_length = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+        raise JournalError(f"{path} is not a version {VERSION} journal dump")
+    meta_end = HEADER.size + meta_length
+    try:
+        meta = json.loads(data[HEADER.size:meta_end].decode("utf-8"))
+    except ValueError as e:
+        raise JournalError(f"Invalid journal metadata: {str(e)}")
+    meta.update(capacity=capacity, written=written)
+
+    sources = meta.get("sources", [])
+    body = data[meta_end:]
+    body = body[:len(body) - len(body) % RECORD.size]
+    records = []
+    for actual, planned, duration, source, action, outcome, x, y in RECORD.iter_unpack(body):
+        records.append({
+            "time": actual,
+            "planned": planned,
+            "lag": actual - planned if planned else 0.0,
+            "duration": duration,
+            "source": sources[source] if source < len(sources) else str(source),
+            "action": ACTION_NAMES[action] if action < len(ACTION_NAMES) else str(action),
+            "outcome": OUTCOME_NAMES[outcome] if outcome < len(OUTCOME_NAMES) else str(outcome),
+            "x": x,
+            "y": y,
+        })
+    return meta, records
+
+
+def format_record(record):
+    """Render one decoded record as a line of text."""
+    stamp = time.strftime("%H:%M:%S", time.localtime(record["time"]))
+    millis = int((record["time"] % 1) * 1000)
+    if record["action"] == "key" and 0 < record["y"] <= len(KEEPALIVE_KEYS):
+        target = KEEPALIVE_KEYS[record["y"] - 1]
+    elif record["action"] == "key":
+        target = repr(chr(record["x"]))
+    elif record["action"] == "click":
+        target = f"x{record['x']} button {record['y']}"
+    elif record["action"] == "error":
+        kind = record["x"]
+        target = ERROR_KIND_NAMES[kind] if kind < len(ERROR_KIND_NAMES) else str(kind)
+    elif record["action"] == "scroll":
+        target = str(record["x"])
+    else:
+        target = f"{record['x']},{record['y']}"
+    return (f"{stamp}.{millis:03d} {record['source']:<10} {record['action']:<9} {target:<14} "
+            f"lag {record['lag'] * 1000:8.1f}ms  took {record['duration'] * 1000:8.1f}ms  {record['outcome']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decode a LetMeSleep event journal dump.")
+    parser.add_argument("path", help="Journal dump file")
+    parser.add_argument("--json", action="store_true", help="Print records as JSON lines")
+    parser.add_argument("--tail", type=int, help="Only print the last N records")
+    args = parser.parse_args(argv)
+
+    try:
+        meta, records = read_journal(args.path)
+    except (OSError, JournalError) as e:
+        print(f"ERROR: {str(e)}")
+        return 1
+
+    if args.tail:
+        records = records[-args.tail:]
+    if args.json:
+        for record in records:
+            print(json.dumps(record))
+        return 0
+
+    dumped = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(meta.get("dumped_at", 0)))
+    print(f"Journal dumped {dumped} (reason: {meta.get('reason')}), "
+          f"{meta['written']} records written, last {min(meta['written'], meta['capacity'])} kept")
+    for record in records:
+        print(format_record(record))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Automation plugins shipped with LetMeSleep (see plugins.py)."""
+import time
+import logging
+
+from automation import AutomationBase
+from journal import ACTION_MOVE, OUTCOME_ERROR
+
+logger = logging.getLogger("LetMeSleep")
+
+
+class JiggleAutomation(AutomationBase):
+    """Nudge the cursor a few pixels and straight back at a fixed interval.
+
+    A minimal keep-alive that leaves the pointer where the user put it,
+    for machines where the full mouse automation is too visible.
+    """
+    TITLE = "Cursor Jiggle"
+    SETTINGS_SCHEMA = {
+        "interval": {"type": "float", "default": 60.0, "min": 1.0, "max": 3600.0,
+                     "label": "Interval (seconds)"},
+        "distance": {"type": "int", "default": 1, "min": 1, "max": 50,
+                     "label": "Distance (pixels)"},
+    }
+    SETTINGS = AutomationBase.SETTINGS + tuple(SETTINGS_SCHEMA)
+
+    def _jiggle(self):
+        """Move the cursor out and back; return False if the engine stopped."""
+        started = time.time()
+        x, y = 0, 0
+        try:
+            x, y = self.backend.position()
+            # Nudge away from the failsafe corner
+            self.backend.move_to(x + self.distance, y + self.distance)
+            self.backend.move_to(x, y)
+            self._record_success()
+            self._journal(ACTION_MOVE, x, y, started)
+            return True
+        except Exception as e:
+            self._journal(ACTION_MOVE, x, y, started, OUTCOME_ERROR)
+            return self._handle_error(e)
+
+    def _run(self):
+        """Main loop for the jiggle automation."""
+        try:
+            self.status_update.emit("Cursor jiggle started")
+            while not self._should_stop():
+                interval = self._stretch(self.interval, self.interval)[0]
+                self._action_due = time.time() + interval
+                if not self._wait(interval):
+                    break
+                if not self._jiggle():
+                    break
+                logger.debug("Cursor jiggled")
+            self.status_update.emit("Cursor jiggle completed normally")
+        except Exception as e:
+            error_msg = f"Error in cursor jiggle: {str(e)}"
+            logger.error(error_msg)
+            self.error_occurred.emit(error_msg)
+        finally:
+            # Back to idle, unless a fatal error already failed the run
+            self._finish_run()
@@ -2,11 +2,18 @@
 import sys
 import os
 import logging
+import argparse
 import traceback
 import qdarktheme
 from PyQt5.QtWidgets import QApplication, QMessageBox
 from PyQt5.QtGui import QIcon
-from ui.main_window import MainWindow
+from ui.tray import TrayManager
+from controller import AutomationController, STATE_RUNNING
+from backends import create_backend, BACKENDS
+from control_server import ControlServer, DEFAULT_SOCKET_PATH
+from memory_tracker import MemoryTracker
+from engine_profiler import PROFILER_MODES
+from session_report import DEFAULT_REPORT_DIR, REPORT_FORMATS
 
 # Handle bundled application resources
 def resource_path(relative_path):
@@ -53,13 +60,47 @@ def global_exception_handler(exctype, value, tb):
     # Call the default exception handler
     sys.__excepthook__(exctype, value, tb)
 
+def parse_args(argv):
+    """Parse our command line options, leaving the rest for Qt."""
+    parser = argparse.ArgumentParser(description="LetMeSleep automation tool")
+    parser.add_argument("--control-socket", nargs="?", const=DEFAULT_SOCKET_PATH,
+                        help="Enable the local control API on a Unix socket "
+                             "(default: {})".format(DEFAULT_SOCKET_PATH))
+    parser.add_argument("--control-port", type=int,
+                        help="Enable the local control API on a localhost TCP port")
+    parser.add_argument("--seed", type=int,
+                        help="Master random seed for reproducible runs")
+    parser.add_argument("--backend", choices=["auto"] + sorted(BACKENDS), default="auto",
+                        help="Input backend (auto picks uinput on Wayland, pyautogui otherwise; "
+                             "simulated injects nothing and records events)")
+    parser.add_argument("--low-memory", action="store_true",
+                        help="Unload the window when it is closed or minimized to the tray")
+    parser.add_argument("--memory-log-interval", type=float, default=600.0,
+                        help="Seconds between memory usage log lines (0 disables)")
+    parser.add_argument("--profile-engines", choices=PROFILER_MODES,
+                        help="Profile the engine threads once automation starts "
+                             "(output in ~/.letmesleep/profiling)")
+    parser.add_argument("--profile-duration", type=float, default=30.0,
+                        help="Seconds to profile for with --profile-engines")
+    parser.add_argument("--report-dir", nargs="?", const=DEFAULT_REPORT_DIR,
+                        help="Save a session report when automation stops "
+                             "(default: {})".format(DEFAULT_REPORT_DIR))
+    parser.add_argument("--report-interval", type=float, default=0.0,
+                        help="Also save the session report every N seconds while running")
+    parser.add_argument("--report-format", action="append", choices=REPORT_FORMATS,
+                        help="Session report format (repeat for both; default: json)")
+    return parser.parse_known_args(argv)
+
+
 def main():
     try:
         # Set global exception handler
         sys.excepthook = global_exception_handler
         
+        args, qt_args = parse_args(sys.argv[1:])
+        
         # Start the application
-        app = QApplication(sys.argv)
+        app = QApplication(sys.argv[:1] + qt_args)
         
         # Apply dark theme by default
         app.setPalette(qdarktheme.load_palette("dark"))
@@ -69,14 +110,46 @@ def main():
         icon_path = resource_path("resources/icons/bot.svg")
         app.setWindowIcon(QIcon(icon_path))
         
-        # Create and show main window
-        window = MainWindow()
-        window.show()
+        # The controller owns the engines so the window and control API share them
+        controller = AutomationController(backend=create_backend(args.backend), seed=args.seed)
+        
+        # Log memory growth so long runs can be checked for leaks
+        if args.memory_log_interval > 0:
+            controller.memory_tracker = MemoryTracker(args.memory_log_interval)
+            controller.memory_tracker.start()
+        
+        # Activity totals of each run, saved when it ends
+        if args.report_dir:
+            controller.set_session_reports(args.report_dir, args.report_format, args.report_interval)
+        
+        # Profile the engines the first time they run
+        if args.profile_engines:
+            def profile_on_start(state):
+                if state == STATE_RUNNING:
+                    controller.state_changed.disconnect(profile_on_start)
+                    controller.start_profiling(args.profile_engines, args.profile_duration)
+            controller.state_changed.connect(profile_on_start)
+        
+        # The tray manager owns the main window, which low-memory mode may unload
+        tray = TrayManager(controller, low_memory=args.low_memory)
+        tray.show_initial()
+        
+        # Start the local control API if requested
+        control_server = None
+        if args.control_socket or args.control_port is not None:
+            control_server = ControlServer(
+                controller, socket_path=args.control_socket, port=args.control_port
+            )
+            control_server.start()
         
         logger.info("Application started successfully")
         
         # Start event loop
-        return app.exec_()
+        try:
+            return app.exec_()
+        finally:
+            if control_server:
+                control_server.stop()
     except Exception as e:
         logger.critical("Failed to start application: {}".format(str(e)))
         traceback.print_exc()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+import gc
+import os
+import sys
+import time
+import logging
+import threading
+import collections
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger("LetMeSleep")
+
+STATM_PATH = "/proc/self/statm"
+
+
+def read_rss():
+    """Return the resident set size of this process in bytes, or 0 if unknown."""
+    try:
+        with open(STATM_PATH, "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if resource is None:
+        return 0
+    # Peak rather than current RSS, but still shows growth; bytes on macOS, kB elsewhere
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def count_objects(top=0):
+    """Return (number of tracked objects, the top most common types)."""
+    objects = gc.get_objects()
+    if not top:
+        return len(objects), []
+    counts = collections.Counter(type(obj).__name__ for obj in objects)
+    return len(objects), counts.most_common(top)
+
+
+class MemoryTracker:
+    """Periodically log RSS and object counts to show growth over long runs.
+
+    Samples are kept in a bounded history, so the tracker itself stays flat.
+    Growth is reported against the first sample and as a rate per hour over
+    the retained history, which makes a slow leak visible after a day or two
+    while a flat process reports roughly zero.
+    """
+
+    def __init__(self, interval=600.0, history=288, top_types=0):
+        self.interval = interval
+        self.top_types = top_types
+        self.samples = collections.deque(maxlen=history)
+        self.baseline = None
+        self._previous_types = {}
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start sampling in a background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="memory-tracker")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling."""
+        self._stop_event.set()
+
+    def _run(self):
+        self.sample()
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"Memory sample failed: {str(e)}")
+
+    def sample(self):
+        """Take one sample, log it and return it as (time, rss, objects)."""
+        rss = read_rss()
+        objects, top = count_objects(self.top_types)
+        sample = (time.time(), rss, objects)
+        self.samples.append(sample)
+        if self.baseline is None:
+            self.baseline = sample
+            logger.info(f"Memory baseline: RSS {rss / 2**20:.1f} MB, {objects} objects")
+            return sample
+
+        rss_growth = (rss - self.baseline[1]) / 2**20
+        object_growth = objects - self.baseline[2]
+        logger.info(f"Memory: RSS {rss / 2**20:.1f} MB ({rss_growth:+.1f} MB since start, "
+                    f"{self.growth_rate():+.2f} MB/h), {objects} objects ({object_growth:+d})")
+        if top:
+            # Report which types grew since the last sample
+            changes = ", ".join(f"{name} {count} ({count - self._previous_types.get(name, count):+d})"
+                                for name, count in top)
+            logger.info(f"Most common objects: {changes}")
+            self._previous_types = dict(top)
+        return sample
+
+    def growth_rate(self):
+        """Return the RSS growth in MB per hour over the retained history."""
+        # Copy first: the tracker thread may append while another thread reads
+        samples = list(self.samples)
+        # Too short a span extrapolates noise into a huge hourly rate
+        if len(samples) < 2 or samples[-1][0] - samples[0][0] < 60:
+            return 0.0
+        # Least-squares slope, so one noisy sample does not dominate
+        mean_t = sum(t for t, _, _ in samples) / len(samples)
+        mean_r = sum(r for _, r, _ in samples) / len(samples)
+        variance = sum((t - mean_t) ** 2 for t, _, _ in samples)
+        if not variance:
+            return 0.0
+        slope = sum((t - mean_t) * (r - mean_r) for t, r, _ in samples) / variance
+        return slope * 3600 / 2**20
+
+    def status(self):
+        """Return the latest sample and growth as a dict."""
+        if not self.samples:
+            return {"rss_mb": None, "objects": None, "growth_mb_per_hour": 0.0}
+        _, rss, objects = self.samples[-1]
+        return {
+            "rss_mb": round(rss / 2**20, 1),
+            "objects": objects,
+            "baseline_rss_mb": round(self.baseline[1] / 2**20, 1),
+            "growth_mb_per_hour": round(self.growth_rate(), 3),
+            "samples": len(self.samples),
+        }
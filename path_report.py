@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""Path accuracy report for the mouse movement modes.
+
+Plans moves with the engine's own path planner, executes each segment on an
+input backend while a sampler thread records the cursor position at a high
+rate, and compares the recorded trajectory with the planned straight line
+for every segment. Per mode it reports:
+
+- latency: time from issuing the move until the cursor first leaves its
+  start position
+- duration error: time until the cursor reaches the segment target, minus
+  the planned duration
+- overshoot: furthest distance the cursor travelled past the target along
+  the segment direction
+- deviation: largest distance of the cursor from the planned line
+
+With a real backend the cursor really moves; keep hands off the mouse.
+
+Usage:
+    python path_report.py --backend simulated --trials 10 --seed 1
+    python path_report.py --backend xtest --sample-rate 1000 --json report.json
+"""
+import sys
+import json
+import math
+import time
+import logging
+import argparse
+import threading
+
+from backends import create_backend, BACKENDS
+
+logger = logging.getLogger("LetMeSleep")
+
+MODES = ("straight", "zigzag", "random")
+METRICS = ("latency_ms", "duration_error_ms", "overshoot_px", "deviation_px")
+
+
+class PositionSampler:
+    """Record (time, x, y) cursor samples at a fixed rate on a thread."""
+
+    def __init__(self, backend, rate=500):
+        self.backend = backend
+        self.interval = 1.0 / rate
+        self.samples = []
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.samples = []
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="path-sampler")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and return the samples."""
+        self._stop_event.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        started = time.perf_counter()
+        tick = 0
+        while not self._stop_event.is_set():
+            # Bypass the position cache: every sample must be a real query
+            x, y = self.backend.position(max_age=0)
+            self.samples.append((time.perf_counter(), x, y))
+            tick += 1
+            delay = started + tick * self.interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+
+def analyze_segment(start, target, planned_duration, issued_at, samples):
+    """Compare samples of one segment with its planned straight line."""
+    (sx, sy), (tx, ty) = start, target
+    dx, dy = tx - sx, ty - sy
+    length = math.hypot(dx, dy)
+    latency = reached = None
+    overshoot = deviation = 0.0
+    for stamp, x, y in samples:
+        if stamp < issued_at:
+            continue
+        if latency is None and (x, y) != (sx, sy):
+            latency = stamp - issued_at
+        if reached is None and (x, y) == (tx, ty):
+            reached = stamp - issued_at
+        if length:
+            # Signed distance past the target along the direction of travel
+            along = ((x - tx) * dx + (y - ty) * dy) / length
+            overshoot = max(overshoot, along)
+            deviation = max(deviation, abs((x - sx) * dy - (y - sy) * dx) / length)
+    return {
+        "planned_ms": planned_duration * 1000,
+        "overshoot_px": overshoot,
+        "deviation_px": deviation,
+        "latency_ms": None if latency is None else latency * 1000,
+        "duration_error_ms": None if reached is None else (reached - planned_duration) * 1000,
+    }
+
+
+def _summary(values):
+    """Return count, mean, p50, p95 and max of the non-missing values."""
+    values = sorted(value for value in values if value is not None)
+    if not values:
+        return {"count": 0}
+    def percentile(fraction):
+        return values[min(len(values) - 1, int(fraction * len(values)))]
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "p50": percentile(0.5),
+        "p95": percentile(0.95),
+        "max": values[-1],
+    }
+
+
+def run_report(backend, modes=MODES, trials=5, sample_rate=500, seed=None,
+               min_interval=0.3, max_interval=0.6, settle=0.05):
+    """Run trials for each mode and return the report as a dict."""
+    # Imported here so the module can be inspected without Qt
+    from automation import MouseAutomation
+
+    engine = MouseAutomation(backend)
+    engine.apply_settings({"seed": seed, "min_interval": min_interval, "max_interval": max_interval})
+    engine._seed_rng()
+    width, height = backend.size()
+    sampler = PositionSampler(backend, sample_rate)
+
+    report = {"backend": backend.name, "sample_rate": sample_rate, "seed": engine.active_seed,
+              "trials": trials, "modes": {}}
+    for mode in modes:
+        engine.movement_path = mode
+        segments = []
+        for _ in range(trials):
+            target = (engine.rng.randint(50, width - 50), engine.rng.randint(50, height - 50))
+            start = backend.position(max_age=0)
+            for x, y, duration in engine._plan_path(start, target):
+                sampler.start()
+                issued_at = time.perf_counter()
+                backend.move_to(x, y, duration=duration)
+                # Keep sampling briefly so late arrival and overshoot are seen
+                time.sleep(settle)
+                samples = sampler.stop()
+                segments.append(analyze_segment(start, (x, y), duration, issued_at, samples))
+                start = (x, y)
+        report["modes"][mode] = {
+            "segments": len(segments),
+            "unreached": sum(1 for segment in segments if segment["duration_error_ms"] is None),
+            **{metric: _summary(segment[metric] for segment in segments) for metric in METRICS},
+        }
+    return report
+
+
+def format_report(report):
+    """Render the report as a text table."""
+    lines = [f"Path accuracy: backend={report['backend']} sample_rate={report['sample_rate']}Hz "
+             f"seed={report['seed']} trials={report['trials']}"]
+    header = f"{'mode':<10}{'metric':<20}{'n':>5}{'mean':>10}{'p50':>10}{'p95':>10}{'max':>10}"
+    lines.append(header)
+    lines.append("-" * len(header))
+    for mode, stats in report["modes"].items():
+        for metric in METRICS:
+            summary = stats[metric]
+            if not summary["count"]:
+                lines.append(f"{mode:<10}{metric:<20}{0:>5}{'-':>10}{'-':>10}{'-':>10}{'-':>10}")
+                continue
+            lines.append(f"{mode:<10}{metric:<20}{summary['count']:>5}{summary['mean']:>10.2f}"
+                         f"{summary['p50']:>10.2f}{summary['p95']:>10.2f}{summary['max']:>10.2f}")
+        if stats["unreached"]:
+            lines.append(f"{mode:<10}{stats['unreached']} of {stats['segments']} segments never reached their target")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure how closely mouse moves follow their planned paths.")
+    parser.add_argument("--backend", default="simulated", choices=["auto"] + sorted(BACKENDS),
+                        help="Input backend to measure (real backends move the cursor)")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES,
+                        help="Movement modes to measure")
+    parser.add_argument("--trials", type=int, default=5, help="Moves per mode")
+    parser.add_argument("--sample-rate", type=int, default=500, help="Position samples per second")
+    parser.add_argument("--min-interval", type=float, default=0.3, help="Minimum move duration in seconds")
+    parser.add_argument("--max-interval", type=float, default=0.6, help="Maximum move duration in seconds")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible paths")
+    parser.add_argument("--json", help="Also write the report as JSON to this path")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+    backend = create_backend(args.backend)
+    try:
+        report = run_report(backend, modes=args.modes, trials=args.trials,
+                            sample_rate=args.sample_rate, seed=args.seed,
+                            min_interval=args.min_interval, max_interval=args.max_interval)
+    finally:
+        backend.close()
+
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Registry of automation engines beyond the built-in mouse and keyboard.
+
+A plugin is an AutomationBase subclass that declares its settings in a
+SETTINGS_SCHEMA and implements _run. Plugins are discovered from the
+"letmesleep.automations" entry point group of installed packages and from
+*.py files in ~/.letmesleep/plugins (which must define one AutomationBase
+subclass named in a module-level PLUGIN variable). Discovery only records
+where each plugin lives; its module is imported the first time the plugin
+is enabled, so unused plugins cost nothing at startup.
+"""
+import os
+import logging
+import importlib
+import importlib.util
+from importlib import metadata
+
+logger = logging.getLogger("LetMeSleep")
+
+PLUGIN_DIR = os.path.join(os.path.expanduser("~"), ".letmesleep", "plugins")
+ENTRY_POINT_GROUP = "letmesleep.automations"
+
+# Plugins shipped with the application, as "module:class"
+BUILTIN_PLUGINS = {
+    "jiggle": "keepalive_plugins:JiggleAutomation",
+    "tracks": "tracks:TrackAutomation",
+}
+
+# Setting types a schema may declare, with the Python type values are coerced to.
+# A "list" holds records whose fields are described by its "item" schema.
+SETTING_TYPES = {"float": float, "int": int, "bool": bool, "str": str, "choice": str, "list": list}
+
+
+class PluginError(Exception):
+    """Exception raised when a plugin cannot be loaded or configured."""
+    pass
+
+
+def coerce_setting(name, spec, value):
+    """Check a setting value against its schema entry and return it coerced."""
+    kind = spec.get("type", "str")
+    if kind not in SETTING_TYPES:
+        raise PluginError(f"Setting {name} has unknown type '{kind}'")
+    if kind == "bool":
+        if isinstance(value, str):
+            value = value.strip().lower() in ("1", "true", "yes", "on")
+        return bool(value)
+    if kind == "list":
+        return _coerce_records(name, spec, value)
+    try:
+        value = SETTING_TYPES[kind](value)
+    except (TypeError, ValueError):
+        raise PluginError(f"Setting {name} must be of type {kind}, got {value!r}")
+    if kind == "choice" and value not in spec.get("choices", ()):
+        raise PluginError(f"Setting {name} must be one of {', '.join(spec.get('choices', ()))}")
+    if "min" in spec and value < spec["min"]:
+        raise PluginError(f"Setting {name} must be at least {spec['min']}")
+    if "max" in spec and value > spec["max"]:
+        raise PluginError(f"Setting {name} must be at most {spec['max']}")
+    return value
+
+
+def _coerce_records(name, spec, value):
+    """Check a list of records against a list schema, filling in field defaults."""
+    if not isinstance(value, (list, tuple)):
+        raise PluginError(f"Setting {name} must be a list, got {value!r}")
+    if "max" in spec and len(value) > spec["max"]:
+        raise PluginError(f"Setting {name} takes at most {spec['max']} entries")
+    fields = spec.get("item", {})
+    records = []
+    for index, record in enumerate(value):
+        if not isinstance(record, dict):
+            raise PluginError(f"Setting {name}[{index}] must be an object, got {record!r}")
+        unknown = sorted(set(record) - set(fields))
+        if unknown:
+            raise PluginError(f"Setting {name}[{index}] has unknown fields: {', '.join(unknown)}")
+        records.append({
+            field: coerce_setting(f"{name}[{index}].{field}", field_spec, record.get(field, field_spec.get("default")))
+            for field, field_spec in fields.items()
+        })
+    return records
+
+
+class PluginSpec:
+    """Where a discovered plugin lives; the class is imported on first load."""
+
+    def __init__(self, name, target, source):
+        self.name = name
+        # "module:attribute" for built-ins and entry points, a file path for the plugin directory
+        self.target = target
+        self.source = source
+        self.engine_class = None
+
+    def load(self):
+        """Import the plugin and return its engine class."""
+        if self.engine_class is not None:
+            return self.engine_class
+        try:
+            if self.source == "directory":
+                engine_class = self._load_file()
+            else:
+                module_name, _, attribute = self.target.partition(":")
+                engine_class = getattr(importlib.import_module(module_name), attribute)
+        except PluginError:
+            raise
+        except Exception as e:
+            raise PluginError(f"Failed to load plugin '{self.name}' from {self.target}: {str(e)}")
+
+        from automation import AutomationBase
+        if not (isinstance(engine_class, type) and issubclass(engine_class, AutomationBase)):
+            raise PluginError(f"Plugin '{self.name}' is not an AutomationBase subclass")
+        for setting in engine_class.SETTINGS_SCHEMA:
+            if setting not in engine_class.SETTINGS:
+                raise PluginError(f"Plugin '{self.name}' schema setting {setting} is missing from SETTINGS")
+        self.engine_class = engine_class
+        logger.info(f"Loaded automation plugin '{self.name}' ({self.source})")
+        return engine_class
+
+    def _load_file(self):
+        """Import a plugin file from the plugin directory."""
+        module_spec = importlib.util.spec_from_file_location(f"letmesleep_plugin_{self.name}", self.target)
+        module = importlib.util.module_from_spec(module_spec)
+        module_spec.loader.exec_module(module)
+        engine_class = getattr(module, "PLUGIN", None)
+        if engine_class is None:
+            raise PluginError(f"Plugin file {self.target} does not define PLUGIN")
+        return engine_class
+
+
+class PluginRegistry:
+    """Discovered automation plugins keyed by name."""
+
+    def __init__(self, plugin_dir=PLUGIN_DIR):
+        self.plugin_dir = plugin_dir
+        self.specs = {}
+        self.discover()
+
+    def discover(self):
+        """Find the built-in, installed and directory plugins without importing them."""
+        specs = {name: PluginSpec(name, target, "builtin") for name, target in BUILTIN_PLUGINS.items()}
+        try:
+            for entry_point in metadata.entry_points(group=ENTRY_POINT_GROUP):
+                specs[entry_point.name] = PluginSpec(entry_point.name, entry_point.value, "entry point")
+        except Exception as e:
+            logger.warning(f"Failed to read plugin entry points: {str(e)}")
+        if os.path.isdir(self.plugin_dir):
+            for entry in sorted(os.listdir(self.plugin_dir)):
+                name, extension = os.path.splitext(entry)
+                if extension == ".py" and not name.startswith("_"):
+                    specs[name] = PluginSpec(name, os.path.join(self.plugin_dir, entry), "directory")
+        for name in ("mouse", "keyboard"):
+            if specs.pop(name, None) is not None:
+                logger.warning(f"Ignoring plugin named after a built-in engine: {name}")
+        self.specs = specs
+        return sorted(specs)
+
+    def names(self):
+        """Return the names of all discovered plugins."""
+        return sorted(self.specs)
+
+    def __contains__(self, name):
+        return name in self.specs
+
+    def is_loaded(self, name):
+        """Check whether a plugin's module has been imported."""
+        return name in self.specs and self.specs[name].engine_class is not None
+
+    def load(self, name):
+        """Import a plugin and return its engine class."""
+        if name not in self.specs:
+            raise PluginError(f"Unknown automation plugin: {name}")
+        return self.specs[name].load()
+
+    def title(self, name):
+        """Return a display title, without importing the plugin."""
+        spec = self.specs.get(name)
+        if spec is not None and spec.engine_class is not None and spec.engine_class.TITLE:
+            return spec.engine_class.TITLE
+        return name.replace("_", " ").title()
+
+    def schema(self, name):
+        """Return a plugin's settings schema, importing it if needed."""
+        return self.load(name).SETTINGS_SCHEMA
+
+    def create(self, name, backend=None):
+        """Load a plugin and return a new engine using the given input backend."""
+        return self.load(name)(backend)
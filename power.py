@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+import os
+import time
+import logging
+import threading
+
+logger = logging.getLogger("LetMeSleep")
+
+POWER_SUPPLY_DIR = "/sys/class/power_supply"
+LOADAVG_PATH = "/proc/loadavg"
+
+# Interval multipliers applied by each policy
+POLICIES = {
+    "performance": {"battery": 1.0, "low_battery": 1.0, "busy": 1.0},
+    "balanced": {"battery": 1.5, "low_battery": 2.5, "busy": 1.5},
+    "saver": {"battery": 2.5, "low_battery": 4.0, "busy": 2.0},
+}
+
+
+def _read_sysfs(path):
+    """Read a single sysfs value, or None if unavailable."""
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def read_battery_state(power_supply_dir=POWER_SUPPLY_DIR):
+    """Return (on_battery, capacity_percent); either may be None if unknown."""
+    try:
+        supplies = os.listdir(power_supply_dir)
+    except OSError:
+        return None, None
+
+    on_ac = False
+    discharging = False
+    capacities = []
+    for supply in supplies:
+        base = os.path.join(power_supply_dir, supply)
+        kind = _read_sysfs(os.path.join(base, "type"))
+        if kind in ("Mains", "USB"):
+            if _read_sysfs(os.path.join(base, "online")) == "1":
+                on_ac = True
+        elif kind == "Battery":
+            if _read_sysfs(os.path.join(base, "status")) == "Discharging":
+                discharging = True
+            capacity = _read_sysfs(os.path.join(base, "capacity"))
+            if capacity and capacity.isdigit():
+                capacities.append(int(capacity))
+
+    if not capacities and not on_ac:
+        # No battery and no adapter reported: desktop or VM
+        return None, None
+    capacity = min(capacities) if capacities else None
+    return (discharging and not on_ac), capacity
+
+
+def read_load(loadavg_path=LOADAVG_PATH):
+    """Return the 1-minute load average per CPU, or None if unavailable."""
+    value = _read_sysfs(loadavg_path)
+    if not value:
+        return None
+    try:
+        return float(value.split()[0]) / (os.cpu_count() or 1)
+    except (ValueError, IndexError):
+        return None
+
+
+class RateController:
+    """Stretch action intervals according to battery state and system load.
+
+    The scale factor is recomputed at most every refresh_interval seconds, so
+    the engines can consult it on every action for free. Stretched intervals
+    never exceed keepalive_ceiling, which keeps the session alive whatever the
+    system state.
+    """
+
+    def __init__(self, policy="balanced", keepalive_ceiling=240.0, refresh_interval=30.0,
+                 low_battery=20, busy_load=0.8,
+                 battery_reader=read_battery_state, load_reader=read_load):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown power policy: {policy}")
+        if isinstance(keepalive_ceiling, bool) or not isinstance(keepalive_ceiling, (int, float)) \
+                or keepalive_ceiling <= 0:
+            raise ValueError(f"Keep-alive ceiling must be a positive number of seconds, got {keepalive_ceiling!r}")
+        self.policy = policy
+        self.keepalive_ceiling = keepalive_ceiling
+        self.refresh_interval = refresh_interval
+        self.low_battery = low_battery
+        self.busy_load = busy_load
+        self._battery_reader = battery_reader
+        self._load_reader = load_reader
+        self._lock = threading.Lock()
+        self._scale = 1.0
+        self._reason = "normal"
+        self._refreshed_at = None
+
+    def _compute(self):
+        """Compute the scale factor and the reason for it."""
+        factors = POLICIES[self.policy]
+        scale, reasons = 1.0, []
+
+        on_battery, capacity = self._battery_reader()
+        if on_battery:
+            if capacity is not None and capacity <= self.low_battery:
+                scale *= factors["low_battery"]
+                reasons.append(f"low battery ({capacity}%)")
+            else:
+                scale *= factors["battery"]
+                reasons.append("on battery")
+
+        load = self._load_reader()
+        if load is not None and load >= self.busy_load:
+            scale *= factors["busy"]
+            reasons.append(f"busy (load {load:.2f}/cpu)")
+
+        return scale, ", ".join(reasons) or "normal"
+
+    def scale(self):
+        """Return the current interval multiplier."""
+        with self._lock:
+            now = time.monotonic()
+            if self._refreshed_at is None or now - self._refreshed_at >= self.refresh_interval:
+                self._refreshed_at = now
+                scale, reason = self._compute()
+                if scale != self._scale or reason != self._reason:
+                    logger.info(f"Power policy '{self.policy}': interval scale {scale:.2f} ({reason})")
+                self._scale, self._reason = scale, reason
+            return self._scale
+
+    def stretch(self, low, high):
+        """Return the (low, high) interval range scaled for the current state."""
+        scale = self.scale()
+        if scale == 1.0:
+            return low, high
+        # Never stretch past the keep-alive ceiling, but never shrink either
+        return (max(low, min(low * scale, self.keepalive_ceiling)),
+                max(high, min(high * scale, self.keepalive_ceiling)))
+
+    def status(self):
+        """Return the current policy state as a dict."""
+        scale = self.scale()
+        return {"policy": self.policy, "scale": scale, "reason": self._reason,
+                "keepalive_ceiling": self.keepalive_ceiling}
+
+
+def create_rate_controller(policy="balanced", **options):
+    """Return a RateController for the policy, or None when throttling is off."""
+    if policy in (None, "off"):
+        return None
+    return RateController(policy, **options)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+import os
+import json
+import logging
+
+from plugins import PluginError
+from power import create_rate_controller
+from idle_timeout import AdaptiveInterval, FixedIdleTimeout
+
+logger = logging.getLogger("LetMeSleep")
+
+# Profiles live next to the log file
+PROFILE_DIR = os.path.join(os.path.expanduser("~"), ".letmesleep", "profiles")
+
+# Sections recognised in a profile; non-engine sections are applied by the caller.
+# Sections named after an automation plugin (see plugins.py) configure that plugin.
+PROFILE_SECTIONS = ("mouse", "keyboard", "power", "seed", "target", "adaptive")
+
+
+class ProfileError(Exception):
+    """Exception raised when a profile cannot be loaded or saved."""
+    pass
+
+
+def profile_path(name):
+    """Return the file path for a named profile."""
+    return os.path.join(PROFILE_DIR, f"{name}.json")
+
+
+def list_profiles():
+    """Return the names of all saved profiles."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    return sorted(
+        os.path.splitext(entry)[0]
+        for entry in os.listdir(PROFILE_DIR)
+        if entry.endswith(".json")
+    )
+
+
+def load_profile(name_or_path):
+    """Load a profile by name or by file path.
+
+    A profile is a JSON object with optional "mouse" and "keyboard"
+    sections, each mapping engine setting names to values, plus optional
+    "power" (power policy options), "seed" (master random seed),
+    "target" ({"title": ..., "class": ...} window to confine actions to) and
+    "adaptive" (keep-alive intervals from the idle timeout, e.g.
+    {"margin": 0.2, "presence_timeout": 600}) entries.
+    A section named after an automation plugin enables that plugin unless
+    it sets "enabled" to false.
+    """
+    path = name_or_path
+    if not os.path.isfile(path):
+        path = profile_path(name_or_path)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            profile = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ProfileError(f"Failed to load profile '{name_or_path}': {str(e)}")
+
+    if not isinstance(profile, dict):
+        raise ProfileError(f"Profile '{name_or_path}' must be a JSON object")
+    return profile
+
+
+def save_profile(name, profile):
+    """Save a profile under the given name."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = profile_path(name)
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(profile, f, indent=2, sort_keys=True)
+    except OSError as e:
+        raise ProfileError(f"Failed to save profile '{name}': {str(e)}")
+    return path
+
+
+def profile_enabled(profile, section):
+    """Check whether a profile section is enabled (sections default to enabled)."""
+    return profile.get(section, {}).get("enabled", True) is not False
+
+
+def check_profile(profile, engine_classes, plugins=None):
+    """Check every profile section without applying any of them.
+
+    engine_classes maps section names to the engine classes whose settings
+    they hold; enabled sections naming a plugin of the plugins registry are
+    checked against its class. The adaptive options are checked but the
+    idle timeout is not read. Returns the rate controller prepared for the
+    power section (None if absent or off); raises ProfileError for a bad
+    section.
+    """
+    if not isinstance(profile, dict):
+        raise ProfileError("Profile must be a JSON object")
+    sections = [section for section in profile if section in ("mouse", "keyboard", "power")
+                or section in engine_classes or (plugins is not None and section in plugins)]
+    for section in sections:
+        if not isinstance(profile[section], dict):
+            raise ProfileError(f"Profile section '{section}' must be a JSON object")
+    for section in ("target", "adaptive"):
+        if not isinstance(profile.get(section) or {}, dict):
+            raise ProfileError(f"Profile section '{section}' must be a JSON object")
+    seed = profile.get("seed")
+    if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int)):
+        raise ProfileError("Profile seed must be an integer")
+
+    engine_classes = dict(engine_classes)
+    try:
+        for section in sections:
+            if plugins is not None and section in plugins:
+                if not profile_enabled(profile, section):
+                    # Disabled here, so its settings are never applied
+                    continue
+                engine_classes.setdefault(section, plugins.load(section))
+            if section in engine_classes:
+                engine_classes[section].check_settings(
+                    {key: value for key, value in profile[section].items() if key != "enabled"})
+    except PluginError as e:
+        raise ProfileError(f"Invalid plugin settings in profile: {str(e)}")
+
+    rate_controller = None
+    if "power" in profile:
+        options = dict(profile["power"])
+        try:
+            rate_controller = create_rate_controller(options.pop("policy", "balanced"), **options)
+        except (ValueError, TypeError) as e:
+            raise ProfileError(f"Invalid power section in profile: {str(e)}")
+
+    options = dict(profile.get("adaptive") or {})
+    if options.pop("enabled", True) and options:
+        try:
+            AdaptiveInterval(FixedIdleTimeout({}), **options)
+        except (ValueError, TypeError) as e:
+            raise ProfileError(f"Invalid adaptive section in profile: {str(e)}")
+    return rate_controller
+
+
+def apply_profile(profile, engines):
+    """Apply profile sections to a dict of engines keyed by section name."""
+    for section, settings in profile.items():
+        engine = engines.get(section)
+        if engine is None:
+            if section not in PROFILE_SECTIONS:
+                logger.warning(f"Ignoring unknown profile section: {section}")
+            continue
+        engine.apply_settings({
+            name: value for name, value in settings.items() if name != "enabled"
+        })
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+import re
+import time
+import heapq
+import logging
+import datetime
+import itertools
+import threading
+
+logger = logging.getLogger("LetMeSleep")
+
+DAY_NAMES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+DAY_ALIASES = {
+    "daily": set(range(7)),
+    "weekdays": set(range(5)),
+    "weekends": {5, 6},
+}
+
+_WINDOW_RE = re.compile(
+    r"^(?:(?P<days>[a-z\-]+(?:\s*,\s*[a-z\-]+)*)\s+)?(?P<start>\d{1,2}:\d{2})\s*-\s*(?P<end>\d{1,2}:\d{2})$"
+)
+
+
+class ScheduleError(Exception):
+    """Exception raised for invalid schedule specifications."""
+    pass
+
+
+class TimerHandle:
+    """Handle for a timer scheduled on a TimerQueue."""
+
+    __slots__ = ("when", "callback", "args", "cancelled")
+
+    def __init__(self, when, callback, args):
+        self.when = when
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        """Cancel the timer; it is dropped lazily when it reaches the top of the heap."""
+        self.cancelled = True
+
+
+class TimerQueue:
+    """Heap of one-shot timers served by a single thread.
+
+    The thread sleeps until the earliest deadline, so any number of pending
+    timers costs no wakeups until one is due, and scheduling is O(log n).
+    """
+
+    def __init__(self, name="timer-queue"):
+        self._heap = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=name)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def schedule(self, when, callback, *args):
+        """Run callback(*args) at the given epoch time."""
+        handle = TimerHandle(when, callback, args)
+        with self._cond:
+            heapq.heappush(self._heap, (when, next(self._counter), handle))
+            # Only wake the thread if the new timer is now the earliest
+            if self._heap[0][2] is handle:
+                self._cond.notify()
+        return handle
+
+    def schedule_in(self, delay, callback, *args):
+        """Run callback(*args) after delay seconds."""
+        return self.schedule(time.time() + delay, callback, *args)
+
+    def pending(self):
+        """Return the number of pending (not cancelled) timers."""
+        with self._cond:
+            return sum(1 for _, _, handle in self._heap if not handle.cancelled)
+
+    def stop(self):
+        """Stop the timer thread, dropping pending timers."""
+        with self._cond:
+            self._running = False
+            self._heap.clear()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running:
+                    # Drop cancelled timers sitting at the top of the heap
+                    while self._heap and self._heap[0][2].cancelled:
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    delay = self._heap[0][0] - time.time()
+                    if delay <= 0:
+                        break
+                    self._cond.wait(delay)
+                if not self._running:
+                    return
+                handle = heapq.heappop(self._heap)[2]
+
+            try:
+                handle.callback(*handle.args)
+            except Exception as e:
+                logger.error(f"Timer callback failed: {str(e)}")
+
+
+def _parse_time(text):
+    """Parse HH:MM into minutes after midnight."""
+    hours, minutes = (int(part) for part in text.split(":"))
+    if hours > 24 or minutes > 59 or (hours == 24 and minutes):
+        raise ScheduleError(f"Invalid time: {text}")
+    return hours * 60 + minutes
+
+
+def _parse_days(text):
+    """Parse a day specification such as "mon-fri" or "sat, sun"."""
+    if text is None:
+        return set(range(7))
+    days = set()
+    for part in (part.strip() for part in text.split(",")):
+        if part in DAY_ALIASES:
+            days |= DAY_ALIASES[part]
+            continue
+        bounds = part.split("-")
+        try:
+            indices = [DAY_NAMES.index(bound[:3]) for bound in bounds]
+        except ValueError:
+            raise ScheduleError(f"Invalid day specification: {part}")
+        if len(indices) == 1:
+            days.add(indices[0])
+        elif len(indices) == 2:
+            first, last = indices
+            # Ranges may wrap around the week, e.g. sat-mon
+            days.update((first + offset) % 7 for offset in range((last - first) % 7 + 1))
+        else:
+            raise ScheduleError(f"Invalid day range: {part}")
+    return days
+
+
+class ActivityWindow:
+    """A daily time window on a set of weekdays."""
+
+    def __init__(self, days, start, end):
+        self.days = set(days)
+        self.start = start  # minutes after midnight
+        self.end = end      # minutes after midnight; <= start means next day
+
+    @classmethod
+    def parse(cls, spec):
+        """Parse a window such as "mon-fri 09:00-17:30" or "22:00-02:00"."""
+        match = _WINDOW_RE.match(spec.strip().lower())
+        if not match:
+            raise ScheduleError(f"Invalid activity window: {spec!r}")
+        try:
+            start = _parse_time(match.group("start"))
+            end = _parse_time(match.group("end"))
+            days = _parse_days(match.group("days"))
+        except ScheduleError as e:
+            raise ScheduleError(f"{str(e)} in activity window {spec.strip()!r}")
+        if start == end:
+            raise ScheduleError(f"Activity window is empty: {spec!r}")
+        return cls(days, start, end)
+
+    def intervals(self, date):
+        """Yield the (start, end) datetimes of this window starting on date."""
+        if date.weekday() not in self.days:
+            return
+        midnight = datetime.datetime.combine(date, datetime.time())
+        start = midnight + datetime.timedelta(minutes=self.start)
+        end = midnight + datetime.timedelta(minutes=self.end)
+        if end <= start:
+            end += datetime.timedelta(days=1)
+        yield start, end
+
+    def __repr__(self):
+        days = ",".join(DAY_NAMES[day] for day in sorted(self.days))
+        return (f"ActivityWindow({days} {self.start // 60:02d}:{self.start % 60:02d}-"
+                f"{self.end // 60:02d}:{self.end % 60:02d})")
+
+
+class ActivitySchedule:
+    """Set of activity windows; automation runs only inside them."""
+
+    def __init__(self, windows):
+        self.windows = list(windows)
+
+    @classmethod
+    def parse(cls, spec):
+        """Parse windows separated by semicolons or newlines.
+
+        Lunch gaps are expressed as two windows, e.g.
+        "mon-fri 09:00-12:00; mon-fri 13:00-17:30". Commas separate days
+        ("sat, sun 10:00-12:00"); a comma right after a time range still
+        starts a new window, as older specifications used ", " for that.
+        """
+        parts = [part for part in re.split(r"[;\n]|(?<=\d),", spec) if part.strip()]
+        if not parts:
+            raise ScheduleError("Schedule has no activity windows")
+        windows = []
+        for part in parts:
+            try:
+                windows.append(ActivityWindow.parse(part))
+            except ScheduleError as e:
+                raise ScheduleError(f"{str(e)} (separate windows with ';')")
+        return cls(windows)
+
+    def _merged_intervals(self, now):
+        """Return merged windows overlapping the week around now, sorted."""
+        intervals = []
+        for offset in range(-1, 9):
+            date = (now + datetime.timedelta(days=offset)).date()
+            for window in self.windows:
+                intervals.extend(window.intervals(date))
+        intervals.sort()
+        merged = []
+        for start, end in intervals:
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        return merged
+
+    def is_active(self, now=None):
+        """Check whether now falls inside an activity window."""
+        now = now or datetime.datetime.now()
+        return any(start <= now < end for start, end in self._merged_intervals(now))
+
+    def next_transition(self, now=None):
+        """Return (when, active_after) for the next window edge, or None."""
+        now = now or datetime.datetime.now()
+        for start, end in self._merged_intervals(now):
+            if now < start:
+                return start, True
+            if now < end:
+                return end, False
+        return None
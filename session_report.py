@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""Session reports: running activity totals, exported as JSON or CSV.
+
+The engines feed every journaled action and every state change into a
+SessionStats as they happen. Only counters and running sums are kept per
+engine, so memory stays constant however long a session runs, and a
+report is computed from them directly instead of re-reading the log or
+the journal. A report is a plain dict; export_report() saves it as JSON,
+or as CSV with one row per engine and a total row.
+"""
+import os
+import csv
+import json
+import time
+import logging
+import threading
+
+from engine_state import ENGINE_RUNNING, ENGINE_PAUSED
+from journal import (
+    ACTION_MOVE, ACTION_CLICK, ACTION_SCROLL, ACTION_KEY, ACTION_FAILSAFE, ACTION_ERROR,
+    OUTCOME_OK, ERROR_KIND_NAMES
+)
+
+logger = logging.getLogger("LetMeSleep")
+
+DEFAULT_REPORT_DIR = os.path.join(os.path.expanduser("~"), ".letmesleep", "reports")
+
+REPORT_FORMATS = ("json", "csv")
+
+# Counter incremented by each successful action
+ACTION_COUNTERS = {
+    ACTION_MOVE: "moves",
+    ACTION_CLICK: "clicks",
+    ACTION_SCROLL: "scrolls",
+    ACTION_KEY: "keystrokes",
+}
+
+# Engine states whose time is accumulated
+TIMED_STATES = (ENGINE_RUNNING, ENGINE_PAUSED)
+
+# Per-engine report fields, in CSV column order
+REPORT_FIELDS = (
+    ("moves", "clicks", "scrolls", "keystrokes", "failed_actions", "errors")
+    + tuple(f"{kind}_errors" for kind in ERROR_KIND_NAMES)
+    + ("failsafe", "running_seconds", "paused_seconds", "busy_seconds", "mean_lag_ms", "max_lag_ms")
+)
+
+_COUNTERS = REPORT_FIELDS[:REPORT_FIELDS.index("running_seconds")]
+
+
+class _EngineStats:
+    """Counters and running sums for one engine."""
+
+    __slots__ = ("counts", "busy", "lag_total", "lag_count", "lag_max",
+                 "state", "state_since", "state_seconds")
+
+    def __init__(self, state, now):
+        self.counts = dict.fromkeys(_COUNTERS, 0)
+        self.busy = 0.0
+        self.lag_total = 0.0
+        self.lag_count = 0
+        self.lag_max = 0.0
+        self.state = state
+        self.state_since = now
+        self.state_seconds = dict.fromkeys(TIMED_STATES, 0.0)
+
+    def seconds(self, state, now):
+        """Return the time spent in a state, including the current stretch."""
+        seconds = self.state_seconds[state]
+        if self.state == state:
+            seconds += now - self.state_since
+        return seconds
+
+
+class SessionStats:
+    """Running activity totals of the engines over one session.
+
+    record() and state_changed() are called from the engine worker
+    threads (and from whichever thread changes an engine's state), so all
+    updates take one lock. Besides the per-engine figures, the time during
+    which any engine was running or paused is tracked for the session as
+    a whole, since the engines run side by side.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._engines = {}
+        self.reset()
+
+    def reset(self):
+        """Start a new session, keeping the registered engines and their states."""
+        with self._lock:
+            now = time.monotonic()
+            self.started_at = time.time()
+            self._started = now
+            self._engines = {name: _EngineStats(stats.state, now) for name, stats in self._engines.items()}
+            self.failsafe_triggers = 0
+            self._in_state = dict.fromkeys(TIMED_STATES, 0)
+            self._state_since = dict.fromkeys(TIMED_STATES, now)
+            self._state_seconds = dict.fromkeys(TIMED_STATES, 0.0)
+            for stats in self._engines.values():
+                self._enter(stats.state, now)
+
+    def register(self, name, state):
+        """Add an engine in its current state (an engine seen before keeps its totals)."""
+        with self._lock:
+            now = time.monotonic()
+            stats = self._engines.get(name)
+            if stats is None:
+                self._engines[name] = _EngineStats(state, now)
+                self._enter(state, now)
+            else:
+                self._move(stats, state, now)
+
+    def _enter(self, state, now):
+        if state in self._in_state:
+            if not self._in_state[state]:
+                self._state_since[state] = now
+            self._in_state[state] += 1
+
+    def _leave(self, state, now):
+        if state in self._in_state:
+            self._in_state[state] -= 1
+            if not self._in_state[state]:
+                self._state_seconds[state] += now - self._state_since[state]
+
+    def _move(self, stats, state, now):
+        """Close an engine's current state stretch and open the next."""
+        if stats.state == state:
+            return
+        if stats.state in stats.state_seconds:
+            stats.state_seconds[stats.state] += now - stats.state_since
+        self._leave(stats.state, now)
+        stats.state = state
+        stats.state_since = now
+        self._enter(state, now)
+
+    def state_changed(self, name, state):
+        """Account for an engine's state change."""
+        with self._lock:
+            stats = self._engines.get(name)
+            if stats is not None:
+                self._move(stats, state, time.monotonic())
+
+    def record(self, name, action, outcome=OUTCOME_OK, x=0, y=0, lag=0.0, duration=0.0):
+        """Count one journaled action of an engine (see journal for the codes)."""
+        with self._lock:
+            stats = self._engines.get(name)
+            if stats is None:
+                return
+            counts = stats.counts
+            if action == ACTION_ERROR:
+                counts["errors"] += 1
+                if 0 <= x < len(ERROR_KIND_NAMES):
+                    counts[f"{ERROR_KIND_NAMES[x]}_errors"] += 1
+            elif action == ACTION_FAILSAFE:
+                counts["failsafe"] += 1
+            elif outcome != OUTCOME_OK:
+                counts["failed_actions"] += 1
+            elif action in ACTION_COUNTERS:
+                # A named key tap (y > 0) holds its number of presses in x
+                counts[ACTION_COUNTERS[action]] += x if action == ACTION_KEY and y > 0 else 1
+                stats.busy += duration
+                stats.lag_total += lag
+                stats.lag_count += 1
+                stats.lag_max = max(stats.lag_max, lag)
+
+    def count_failsafe(self):
+        """Count one failsafe hit for the session (every stopped engine records its own)."""
+        with self._lock:
+            self.failsafe_triggers += 1
+
+    def _fields(self, stats_list, running, paused):
+        """Merge the counters of one or more engines into report fields."""
+        counts = dict.fromkeys(_COUNTERS, 0)
+        lag_total, lag_count, lag_max, busy = 0.0, 0, 0.0, 0.0
+        for stats in stats_list:
+            for field, value in stats.counts.items():
+                counts[field] += value
+            lag_total += stats.lag_total
+            lag_count += stats.lag_count
+            lag_max = max(lag_max, stats.lag_max)
+            busy += stats.busy
+        return dict(counts,
+                    running_seconds=round(running, 3),
+                    paused_seconds=round(paused, 3),
+                    busy_seconds=round(busy, 3),
+                    mean_lag_ms=round(lag_total / lag_count * 1000, 3) if lag_count else 0.0,
+                    max_lag_ms=round(lag_max * 1000, 3))
+
+    def report(self):
+        """Return the session report as a dict."""
+        with self._lock:
+            now = time.monotonic()
+            engines = {
+                name: self._fields([stats], stats.seconds(ENGINE_RUNNING, now),
+                                   stats.seconds(ENGINE_PAUSED, now))
+                for name, stats in self._engines.items()
+            }
+            session = {}
+            for state in TIMED_STATES:
+                seconds = self._state_seconds[state]
+                if self._in_state[state]:
+                    seconds += now - self._state_since[state]
+                session[state] = seconds
+            totals = self._fields(list(self._engines.values()),
+                                  session[ENGINE_RUNNING], session[ENGINE_PAUSED])
+            # Each engine the failsafe stopped counts the hit; the session counts it once
+            totals["failsafe"] = self.failsafe_triggers
+            return {
+                "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+                "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "duration_seconds": round(now - self._started, 3),
+                "totals": totals,
+                "engines": engines,
+            }
+
+
+def write_report(report, path):
+    """Write a report to path, as CSV if it ends in .csv and as JSON otherwise."""
+    # Write to a temporary file first so a crash never leaves a torn report
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", newline="") as f:
+        if path.endswith(".csv"):
+            writer = csv.writer(f)
+            writer.writerow(("engine",) + REPORT_FIELDS)
+            rows = list(report["engines"].items()) + [("total", report["totals"])]
+            for name, fields in rows:
+                writer.writerow([name] + [fields[field] for field in REPORT_FIELDS])
+        else:
+            json.dump(report, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def export_report(report, directory=DEFAULT_REPORT_DIR, formats=("json",), reason="manual"):
+    """Save a report in each format to a time-stamped file and return the paths."""
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    paths = [write_report(report, os.path.join(directory, f"session-{stamp}-{reason}.{fmt}"))
+             for fmt in formats]
+    logger.info(f"Session report saved to {', '.join(paths)} (reason: {reason})")
+    return paths
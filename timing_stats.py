@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+import math
+import bisect
+from array import array
+
+# Log-spaced bucket edges from 1 ms to 100 s, 8 buckets per decade
+BUCKETS_PER_DECADE = 8
+MIN_VALUE = 0.001
+MAX_VALUE = 100.0
+BUCKET_EDGES = tuple(
+    MIN_VALUE * 10 ** (i / BUCKETS_PER_DECADE)
+    for i in range(int(math.log10(MAX_VALUE / MIN_VALUE) * BUCKETS_PER_DECADE) + 1)
+)
+
+
+class TimingHistogram:
+    """Fixed-bucket histogram of durations in seconds.
+
+    Each histogram has a single writer (the engine thread that owns it) and
+    takes no lock: a record is one bucket increment in a preallocated array
+    plus a few float updates. Readers copy a snapshot, which may be one
+    record behind but never blocks the engine. A reset from another thread
+    is only requested; the writer clears the buckets at its next record.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        # Underflow bucket first, overflow bucket last
+        self._counts = array("L", [0] * (len(BUCKET_EDGES) + 1))
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+        self._reset_requested = False
+
+    def record(self, value):
+        """Record one duration in seconds."""
+        if self._reset_requested:
+            self._reset_requested = False
+            self._clear()
+        self._counts[bisect.bisect_right(BUCKET_EDGES, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def reset(self):
+        """Forget all recorded values (cleared by the writer at its next record)."""
+        self._reset_requested = True
+
+    def _clear(self):
+        for index in range(len(self._counts)):
+            self._counts[index] = 0
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def snapshot(self):
+        """Return a consistent-enough copy for display as a TimingSnapshot."""
+        if self._reset_requested:
+            return TimingSnapshot(self.name, [0] * len(self._counts), 0, 0.0, None, None)
+        return TimingSnapshot(self.name, self._counts.tolist(), self.count, self.total,
+                              self.minimum, self.maximum)
+
+
+class TimingSnapshot:
+    """Point-in-time copy of a TimingHistogram."""
+
+    def __init__(self, name, counts, count, total, minimum, maximum):
+        self.name = name
+        self.counts = counts
+        self.count = count
+        self.total = total
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def percentile(self, fraction):
+        """Estimate a percentile from the buckets (upper edge of the bucket)."""
+        recorded = sum(self.counts)
+        if not recorded:
+            return None
+        target = fraction * recorded
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= target:
+                # Clamp to the observed range so sparse buckets do not exaggerate
+                upper = BUCKET_EDGES[index] if index < len(BUCKET_EDGES) else self.maximum
+                return min(max(upper, self.minimum), self.maximum)
+        return self.maximum
+
+    def bucket_range(self, index):
+        """Return the (low, high) edges of a bucket."""
+        low = BUCKET_EDGES[index - 1] if index > 0 else 0.0
+        high = BUCKET_EDGES[index] if index < len(BUCKET_EDGES) else math.inf
+        return low, high
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "mean": self.mean(),
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "min": self.minimum,
+            "max": self.maximum,
+        }
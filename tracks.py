@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""Several mouse and keyboard tracks running side by side in one engine.
+
+Each track is an independent action stream with its own interval range:
+mouse tracks move the pointer (anywhere on screen, or jitter within a
+distance of where it is), keyboard tracks type their own text or tap a
+keep-alive key. All tracks share the engine's one worker thread and the
+one input backend. Every track is a generator that performs its next
+step and yields how long to wait before the one after; the worker keeps
+the tracks in a heap ordered by due time and blocks until the earliest is
+due. Mouse moves are split into small steps, so a long slow move and a
+fast jitter track interleave instead of waiting for each other.
+"""
+import time
+import heapq
+import random
+import logging
+
+from automation import AutomationBase
+from backends import KEEPALIVE_KEYS
+from plugins import PluginError
+from journal import ACTION_MOVE, ACTION_KEY, OUTCOME_ERROR
+
+logger = logging.getLogger("LetMeSleep")
+
+# Longest single pointer step of a mouse track's move (seconds)
+MOVE_STEP = 0.05
+
+# Fields of one track; fields that do not apply to a track's kind are ignored
+TRACK_FIELDS = {
+    "kind": {"type": "choice", "choices": ("mouse", "keyboard"), "default": "mouse", "label": "Kind"},
+    "min_interval": {"type": "float", "default": 2.0, "min": 0.05, "max": 3600.0,
+                     "label": "Min interval (s)"},
+    "max_interval": {"type": "float", "default": 5.0, "min": 0.05, "max": 3600.0,
+                     "label": "Max interval (s)"},
+    "duration": {"type": "float", "default": 0.5, "min": 0.0, "max": 60.0, "label": "Move time (s)"},
+    "distance": {"type": "int", "default": 0, "min": 0, "max": 10000, "label": "Distance (px, 0 = anywhere)"},
+    "text": {"type": "str", "default": "", "label": "Text"},
+    "key": {"type": "choice", "choices": KEEPALIVE_KEYS, "default": "shift", "label": "Key (without text)"},
+}
+
+_TRACK_DEFAULTS = {field: spec["default"] for field, spec in TRACK_FIELDS.items()}
+
+
+class TrackAutomation(AutomationBase):
+    """Run any number of mouse and keyboard tracks on one worker thread."""
+    TITLE = "Multiple Tracks"
+    SETTINGS_SCHEMA = {
+        "tracks": {
+            "type": "list", "item": TRACK_FIELDS, "max": 32, "label": "Tracks",
+            # A slow large-move track plus a fast small-jitter track
+            "default": [
+                dict(_TRACK_DEFAULTS, min_interval=20.0, max_interval=40.0, duration=2.0),
+                dict(_TRACK_DEFAULTS, min_interval=1.0, max_interval=3.0, duration=0.0, distance=3),
+            ],
+        },
+    }
+    SETTINGS = AutomationBase.SETTINGS + tuple(SETTINGS_SCHEMA)
+
+    @classmethod
+    def check_settings(cls, settings):
+        """Check settings against the schema and every track's interval range."""
+        settings = super().check_settings(settings)
+        for index, track in enumerate(settings.get("tracks", ())):
+            if track["min_interval"] > track["max_interval"]:
+                raise PluginError(f"Track {index + 1}: minimum interval cannot be greater than maximum interval")
+        return settings
+
+    def apply_settings(self, settings):
+        """Apply settings; a new track list takes effect in the running worker at once."""
+        applied = super().apply_settings(settings)
+        if "tracks" in applied:
+            self.wake()
+        return applied
+
+    def _clock(self):
+        """Return the schedule's clock, which stands still while the engine is paused."""
+        return time.monotonic() - self._parked_total
+
+    def _interval(self, track, rng):
+        """Pick a track's next interval, stretched by the power policy."""
+        return rng.uniform(*self._stretch(track["min_interval"], track["max_interval"]))
+
+    def _perform(self, action, x, y, inject):
+        """Inject one event with error handling; return False if the engine stopped."""
+        started = time.time()
+        try:
+            self._heartbeat()
+            inject()
+            self._record_success()
+            self._journal(action, x, y, started)
+            return True
+        except Exception as e:
+            self._journal(action, x, y, started, OUTCOME_ERROR)
+            return self._handle_error(e)
+
+    def _mouse_steps(self, track, rng):
+        """Move the pointer in small steps, then wait the track's interval."""
+        while True:
+            while self.window_target is not None and self.window_target.geometry is None:
+                # Target window missing; let the other tracks run meanwhile
+                yield 0.5
+            width, height = self.backend.size()
+            start_x, start_y = self.backend.position()
+            left, top, right, bottom = self._target_area(width, height)
+            distance = track["distance"]
+            if distance:
+                # Jitter around the current position, clamped to the area
+                target_x = min(max(start_x + rng.randint(-distance, distance), left), right)
+                target_y = min(max(start_y + rng.randint(-distance, distance), top), bottom)
+            else:
+                target_x = rng.randint(left, right)
+                target_y = rng.randint(top, bottom)
+            steps = max(1, int(round(track["duration"] / MOVE_STEP)))
+            for step in range(1, steps + 1):
+                x = start_x + (target_x - start_x) * step // steps
+                y = start_y + (target_y - start_y) * step // steps
+                if not self._perform(ACTION_MOVE, x, y, lambda x=x, y=y: self.backend.move_to(x, y)):
+                    return
+                if step < steps:
+                    yield track["duration"] / steps
+            yield self._interval(track, rng)
+
+    def _keyboard_steps(self, track, rng):
+        """Type the track's text one character per interval, or tap its key."""
+        key = track["key"]
+        # Scroll Lock toggles, so tap it twice to leave the LED and state unchanged
+        presses = 2 if key == "scrolllock" else 1
+        while True:
+            for char in track["text"] or [None]:
+                while self.window_target is not None and not self.window_target.is_ready():
+                    # Keystrokes only go to the target window while it has focus
+                    yield 0.5
+                if char is None:
+                    done = self._perform(ACTION_KEY, presses, KEEPALIVE_KEYS.index(key) + 1,
+                                         lambda: self.backend.tap(key, presses))
+                else:
+                    done = self._perform(ACTION_KEY, ord(char), 0, lambda char=char: self.backend.write(char))
+                if not done:
+                    return
+                yield self._interval(track, rng)
+
+    def _sources(self, tracks):
+        """Register a journal source per track."""
+        if self.journal is None:
+            return [0] * len(tracks)
+        return [self.journal.register_source(f"tracks/{index + 1}") for index in range(len(tracks))]
+
+    def _schedule(self, tracks, previous):
+        """Build the track heap, keeping the schedule of tracks that did not change."""
+        heap = []
+        now = self._clock()
+        for index, track in enumerate(tracks):
+            old = previous.get(index)
+            if old is not None and old[0] == track:
+                heap.append((old[1], index, old[2]))
+                continue
+            rng = random.Random(self.rng.randrange(2 ** 32))
+            steps = (self._mouse_steps if track["kind"] == "mouse" else self._keyboard_steps)(track, rng)
+            # A fresh run starts every track at once; an edited track waits one interval
+            due = now if not previous else now + self._interval(track, rng)
+            heap.append((due, index, steps))
+        heapq.heapify(heap)
+        return heap
+
+    def _run(self):
+        """Main loop: run the earliest due track step, then wait for the next."""
+        try:
+            tracks = self.tracks
+            if not tracks:
+                self.status_update.emit("No tracks configured")
+                return
+            sources = self._sources(tracks)
+            heap = self._schedule(tracks, {})
+            self.status_update.emit(f"Track automation started ({len(tracks)} tracks)")
+            while heap and not self._should_stop():
+                if self.tracks is not tracks:
+                    # Edited while running: keep the unchanged tracks where they are
+                    previous = {index: (tracks[index], due, steps) for due, index, steps in heap}
+                    tracks = self.tracks
+                    sources = self._sources(tracks)
+                    heap = self._schedule(tracks, previous)
+                    continue
+                due, index, steps = heap[0]
+                if not self._wait(due - self._clock(), until=lambda: self.tracks is not tracks):
+                    break
+                if self.tracks is not tracks:
+                    continue
+                heapq.heappop(heap)
+                self._journal_source = sources[index]
+                self._action_due = time.time() - (self._clock() - due)
+                delay = next(steps, None)
+                if delay is None:
+                    if self._should_stop():
+                        break
+                    logger.warning(f"Track {index + 1} ended")
+                    continue
+                heapq.heappush(heap, (self._clock() + delay, index, steps))
+            self.status_update.emit("Track automation completed normally")
+        except Exception as e:
+            error_msg = f"Error in track automation: {str(e)}"
+            logger.error(error_msg)
+            self.error_occurred.emit(error_msg)
+        finally:
+            # Back to idle, unless a fatal error already failed the run
+            self._finish_run()
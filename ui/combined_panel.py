@@ -7,7 +7,16 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt, pyqtSignal
 
-from automation import MouseAutomation, KeyboardAutomation
+from controller import AutomationController
+from backends import KEEPALIVE_KEYS
+from ui.timing_panel import TimingPanel
+from ui.plugin_panel import PluginPanel
+from ui.settings_binding import SettingsBinder
+
+# Combo box index -> engine setting value
+PATH_CHOICES = ("straight", "zigzag", "random")
+CLICK_CHOICES = ("none", "left", "right", "double")
+KEYBOARD_MODES = ("text", "keys")
 
 
 class CombinedPanel(QWidget):
@@ -17,28 +26,28 @@ class CombinedPanel(QWidget):
     status_update = pyqtSignal(str)
     failsafe_triggered = pyqtSignal()
     error_occurred = pyqtSignal(str)
+    stopped_on_error = pyqtSignal(str)
     
-    def __init__(self):
+    def __init__(self, controller=None):
         super().__init__()
         
-        # Initialize automation
-        self.mouse_automation = MouseAutomation()
-        self.keyboard_automation = KeyboardAutomation()
-        
-        # Connect status signals
-        self.mouse_automation.status_update.connect(self._forward_status)
-        self.keyboard_automation.status_update.connect(self._forward_status)
-        
-        # Connect failsafe signals
-        self.mouse_automation.failsafe_triggered.connect(self._handle_failsafe)
-        self.keyboard_automation.failsafe_triggered.connect(self._handle_failsafe)
+        # Automation engines are owned by the controller
+        self.controller = controller or AutomationController()
+        self.mouse_automation = self.controller.mouse_automation
+        self.keyboard_automation = self.controller.keyboard_automation
         
-        # Connect error signals
-        self.mouse_automation.error_occurred.connect(self._forward_error)
-        self.keyboard_automation.error_occurred.connect(self._forward_error)
+        # Connect controller signals
+        self.controller.status_update.connect(self._forward_status)
+        self.controller.failsafe_triggered.connect(self._handle_failsafe)
+        self.controller.error_occurred.connect(self._forward_error)
+        self.controller.stopped_on_error.connect(self.stopped_on_error)
+        self.controller.settings_changed.connect(self.refresh_from_engines)
         
         # Initialize UI
         self._init_ui()
+        
+        # A recreated panel must show the engines' live settings, not the defaults
+        self.refresh_from_engines()
     
     def _init_ui(self):
         """Initialize the UI components."""
@@ -60,6 +69,13 @@ class CombinedPanel(QWidget):
         self.failsafe_check.setChecked(True)
         self.failsafe_check.stateChanged.connect(self._update_failsafe)
         failsafe_layout.addWidget(self.failsafe_check)
+        if not self.controller.failsafe_available:
+            # The backend cannot see the real pointer, so the corner would never be noticed
+            failsafe_label.setText(f"FAILSAFE UNAVAILABLE: the {self.controller.backend.name} input backend "
+                                   "cannot read the mouse position. Stop automation with the Stop button.")
+            self.failsafe_check.setChecked(False)
+            self.failsafe_check.setEnabled(False)
+            self.failsafe_check.setToolTip("Not available with this input backend")
         
         main_layout.addWidget(failsafe_frame)
         
@@ -102,14 +118,14 @@ class CombinedPanel(QWidget):
         
         # Between min interval input
         self.between_min_interval_spin = QDoubleSpinBox()
-        self.between_min_interval_spin.setRange(0.1, 30.0)
+        self.between_min_interval_spin.setRange(0.1, 3600.0)
         self.between_min_interval_spin.setSingleStep(0.5)
         self.between_min_interval_spin.setValue(self.mouse_automation.between_min_interval)
         between_interval_layout.addRow("Minimum Pause:", self.between_min_interval_spin)
         
         # Between max interval input
         self.between_max_interval_spin = QDoubleSpinBox()
-        self.between_max_interval_spin.setRange(0.1, 60.0)
+        self.between_max_interval_spin.setRange(0.1, 3600.0)
         self.between_max_interval_spin.setSingleStep(0.5)
         self.between_max_interval_spin.setValue(self.mouse_automation.between_max_interval)
         between_interval_layout.addRow("Maximum Pause:", self.between_max_interval_spin)
@@ -197,8 +213,34 @@ class CombinedPanel(QWidget):
         keyboard_title.setStyleSheet("font-weight: bold; font-size: 14px;")
         keyboard_layout.addWidget(keyboard_title)
         
+        # Keyboard mode group
+        keyboard_mode_group = QGroupBox("Keyboard Mode")
+        keyboard_mode_layout = QFormLayout()
+        
+        self.keyboard_mode_combo = QComboBox()
+        self.keyboard_mode_combo.addItems(["Type Text", "Keep-Alive Keys"])
+        self.keyboard_mode_combo.setToolTip(
+            "Keep-alive keys tap a key that types nothing, so it is safe whatever window has focus"
+        )
+        keyboard_mode_layout.addRow("Mode:", self.keyboard_mode_combo)
+        
+        self.keepalive_key_combo = QComboBox()
+        self.keepalive_key_combo.addItems(["Shift", "F15", "Scroll Lock"])
+        self.keepalive_key_combo.setToolTip("Scroll Lock is tapped twice so its state does not change")
+        keyboard_mode_layout.addRow("Key:", self.keepalive_key_combo)
+        
+        self.keepalive_interval_spin = QDoubleSpinBox()
+        self.keepalive_interval_spin.setRange(1.0, 3600.0)
+        self.keepalive_interval_spin.setSingleStep(5.0)
+        self.keepalive_interval_spin.setSuffix(" s")
+        keyboard_mode_layout.addRow("Tap Every:", self.keepalive_interval_spin)
+        
+        keyboard_mode_group.setLayout(keyboard_mode_layout)
+        keyboard_layout.addWidget(keyboard_mode_group)
+        
         # Keyboard interval settings group
         keyboard_interval_group = QGroupBox("Typing Interval (seconds)")
+        self.keyboard_interval_group = keyboard_interval_group
         keyboard_interval_layout = QFormLayout()
         
         # Min interval input
@@ -225,6 +267,7 @@ class CombinedPanel(QWidget):
         
         # Text input group
         text_group = QGroupBox("Text to Type")
+        self.text_group = text_group
         text_layout = QVBoxLayout()
         
         # Text input
@@ -246,32 +289,75 @@ class CombinedPanel(QWidget):
         # Add settings layout to main layout
         main_layout.addLayout(settings_layout)
         
-        # Connect signals
-        self.mouse_min_interval_spin.valueChanged.connect(self._update_mouse_settings)
-        self.mouse_max_interval_spin.valueChanged.connect(self._update_mouse_settings)
-        self.between_min_interval_spin.valueChanged.connect(self._update_mouse_settings)
-        self.between_max_interval_spin.valueChanged.connect(self._update_mouse_settings)
-        self.path_combo.currentIndexChanged.connect(self._update_mouse_settings)
-        self.click_combo.currentIndexChanged.connect(self._update_mouse_settings)
-        self.enable_scroll_check.stateChanged.connect(self._update_mouse_settings)
-        self.scroll_min_amount_spin.valueChanged.connect(self._update_mouse_settings)
-        self.scroll_max_amount_spin.valueChanged.connect(self._update_mouse_settings)
-        
-        self.keyboard_min_interval_spin.valueChanged.connect(self._update_keyboard_settings)
-        self.keyboard_max_interval_spin.valueChanged.connect(self._update_keyboard_settings)
-        self.randomize_check.stateChanged.connect(self._update_keyboard_settings)
-        self.text_edit.textChanged.connect(self._update_keyboard_text)
+        # Extra automation engines from plugins
+        plugin_group = QGroupBox("Plugins")
+        plugin_layout = QVBoxLayout()
+        self.plugin_panel = PluginPanel(self.controller)
+        self.plugin_panel.status_update.connect(self._forward_status)
+        self.plugin_panel.error_occurred.connect(self._forward_error)
+        plugin_layout.addWidget(self.plugin_panel)
+        plugin_group.setLayout(plugin_layout)
+        main_layout.addWidget(plugin_group)
+        
+        # Live timing histograms, only polled while expanded
+        timing_group = QGroupBox("Live Timing")
+        timing_group.setCheckable(True)
+        timing_group.setChecked(False)
+        timing_layout = QVBoxLayout()
+        self.timing_panel = TimingPanel(self.mouse_automation, self.keyboard_automation)
+        self.timing_panel.setVisible(False)
+        timing_group.toggled.connect(self.timing_panel.setVisible)
+        timing_layout.addWidget(self.timing_panel)
+        timing_group.setLayout(timing_layout)
+        main_layout.addWidget(timing_group)
+        
+        # Widgets are bound to engine settings; edits are pushed debounced and diff-only
+        self._bind_settings()
+        self.keyboard_mode_combo.currentIndexChanged.connect(self._update_keyboard_mode_widgets)
+    
+    def _bind_settings(self):
+        """Declare which widget edits which engine setting."""
+        mouse = self.mouse_automation
+        keyboard = self.keyboard_automation
+        self.binder = SettingsBinder(self)
+        self.binder.pushed.connect(self._settings_pushed)
+        self.binder.error_occurred.connect(self._forward_error)
+        bind = self.binder.bind
+        
+        bind(self.mouse_min_interval_spin, mouse, "min_interval")
+        bind(self.mouse_max_interval_spin, mouse, "max_interval")
+        bind(self.between_min_interval_spin, mouse, "between_min_interval")
+        bind(self.between_max_interval_spin, mouse, "between_max_interval")
+        bind(self.path_combo, mouse, "movement_path", choices=PATH_CHOICES)
+        bind(self.click_combo, mouse, "click_type", choices=CLICK_CHOICES)
+        bind(self.enable_scroll_check, mouse, "enable_scrolling")
+        bind(self.scroll_min_amount_spin, mouse, "scroll_min_amount")
+        bind(self.scroll_max_amount_spin, mouse, "scroll_max_amount")
+        
+        bind(self.keyboard_min_interval_spin, keyboard, "min_interval")
+        bind(self.keyboard_max_interval_spin, keyboard, "max_interval")
+        bind(self.randomize_check, keyboard, "randomize_typing")
+        bind(self.keyboard_mode_combo, keyboard, "mode", choices=KEYBOARD_MODES)
+        bind(self.keepalive_key_combo, keyboard, "keepalive_key", choices=KEEPALIVE_KEYS)
+        bind(self.keepalive_interval_spin, keyboard, "keepalive_interval")
+        bind(self.text_edit, keyboard, "text_to_type", read=self._read_text)
+        
+        # Maximums follow their minimums up
+        self.binder.ordered(self.mouse_min_interval_spin, self.mouse_max_interval_spin)
+        self.binder.ordered(self.between_min_interval_spin, self.between_max_interval_spin)
+        self.binder.ordered(self.keyboard_min_interval_spin, self.keyboard_max_interval_spin)
     
     def _handle_failsafe(self):
-        """Handle failsafe triggered event."""
-        self.stop_automation()
+        """Handle failsafe triggered event (the controller already stopped)."""
         self.failsafe_triggered.emit()
     
     def _update_failsafe(self):
         """Update failsafe settings based on UI input."""
+        if not self.controller.failsafe_available:
+            self.status_update.emit("Failsafe unavailable with this input backend")
+            return
         is_active = self.failsafe_check.isChecked()
-        self.mouse_automation.set_failsafe_active(is_active)
-        self.keyboard_automation.set_failsafe_active(is_active)
+        self.controller.set_failsafe_active(is_active)
         
         status = "enabled" if is_active else "disabled"
         self.status_update.emit(f"Failsafe {status}")
@@ -284,90 +370,20 @@ class CombinedPanel(QWidget):
         """Forward error messages from automations."""
         self.error_occurred.emit(message)
     
-    def _update_mouse_settings(self):
-        """Update mouse automation settings based on UI inputs."""
-        # Update min interval
-        self.mouse_automation.min_interval = self.mouse_min_interval_spin.value()
-        
-        # Update max interval (ensure it's >= min interval)
-        if self.mouse_max_interval_spin.value() < self.mouse_automation.min_interval:
-            self.mouse_max_interval_spin.setValue(self.mouse_automation.min_interval)
-        self.mouse_automation.max_interval = self.mouse_max_interval_spin.value()
-        
-        # Update between movement intervals
-        self.mouse_automation.between_min_interval = self.between_min_interval_spin.value()
-        
-        # Update between max interval (ensure it's >= between min interval)
-        if self.between_max_interval_spin.value() < self.mouse_automation.between_min_interval:
-            self.between_max_interval_spin.setValue(self.mouse_automation.between_min_interval)
-        self.mouse_automation.between_max_interval = self.between_max_interval_spin.value()
-        
-        # Update movement path
-        path_mapping = {
-            0: "straight",
-            1: "zigzag",
-            2: "random"
-        }
-        self.mouse_automation.movement_path = path_mapping.get(self.path_combo.currentIndex(), "random")
-        
-        # Update click type
-        click_mapping = {
-            0: "none",
-            1: "left",
-            2: "right",
-            3: "double"
-        }
-        self.mouse_automation.click_type = click_mapping.get(self.click_combo.currentIndex(), "none")
-        
-        # Update scroll settings
-        self.mouse_automation.enable_scrolling = self.enable_scroll_check.isChecked()
-        self.mouse_automation.scroll_min_amount = self.scroll_min_amount_spin.value()
-        self.mouse_automation.scroll_max_amount = self.scroll_max_amount_spin.value()
-        
-        # Emit status update
-        self.status_update.emit("Mouse settings updated")
+    def _settings_pushed(self, engine, settings):
+        """Report a push of edited settings to an engine."""
+        if engine is self.mouse_automation:
+            self.status_update.emit("Mouse settings updated")
+        elif engine is self.keyboard_automation:
+            self.status_update.emit("Keyboard settings updated")
     
-    def _update_keyboard_settings(self):
-        """Update keyboard automation settings based on UI inputs."""
-        # Update min interval
-        self.keyboard_automation.min_interval = self.keyboard_min_interval_spin.value()
-        
-        # Update max interval (ensure it's >= min interval)
-        if self.keyboard_max_interval_spin.value() < self.keyboard_automation.min_interval:
-            self.keyboard_max_interval_spin.setValue(self.keyboard_automation.min_interval)
-        self.keyboard_automation.max_interval = self.keyboard_max_interval_spin.value()
-        
-        # Update randomize setting
-        self.keyboard_automation.randomize_typing = self.randomize_check.isChecked()
-        
-        # Emit status update
-        self.status_update.emit("Keyboard settings updated")
-    
-    def _validate_settings(self):
-        """Validate all settings before starting automation."""
-        # Validate mouse settings
-        if self.mouse_min_interval_spin.value() > self.mouse_max_interval_spin.value():
-            self.error_occurred.emit("Mouse minimum interval cannot be greater than maximum interval")
-            return False
-            
-        if self.between_min_interval_spin.value() > self.between_max_interval_spin.value():
-            self.error_occurred.emit("Between movement minimum interval cannot be greater than maximum interval")
-            return False
-            
-        # Validate scroll settings
-        if self.enable_scroll_check.isChecked():
-            if self.scroll_min_amount_spin.value() > self.scroll_max_amount_spin.value():
-                self.error_occurred.emit("Scroll minimum amount cannot be greater than maximum amount")
-                return False
-        
-        # Validate keyboard settings
-        if self.keyboard_min_interval_spin.value() > self.keyboard_max_interval_spin.value():
-            self.error_occurred.emit("Keyboard minimum interval cannot be greater than maximum interval")
-            return False
-            
-        # No longer validate for empty text - we'll generate random text if empty
-        
-        return True
+    def _update_keyboard_mode_widgets(self):
+        """Enable only the widgets that apply to the selected keyboard mode."""
+        keys = self.keyboard_mode_combo.currentIndex() == 1
+        self.keyboard_interval_group.setEnabled(not keys)
+        self.text_group.setEnabled(not keys)
+        self.keepalive_key_combo.setEnabled(keys)
+        self.keepalive_interval_spin.setEnabled(keys)
     
     def _generate_random_text(self):
         """Generate random text for typing when none is provided."""
@@ -383,62 +399,53 @@ class CombinedPanel(QWidget):
             "It's raining cats and dogs.",
             "You can't judge a book by its cover."
         ]
-        import random
-        return random.choice(random_texts)
+        # Use the controller's RNG so seeded runs pick the same text
+        return self.controller.rng.choice(random_texts)
 
-    def _update_keyboard_text(self):
-        """Update text to type."""
-        text = self.text_edit.toPlainText().strip()
+    def _read_text(self, text_edit):
+        """Return the text to type, filling in random text if none is provided."""
+        text = text_edit.toPlainText().strip()
         if not text:
             # If no text is provided, use random text
             text = self._generate_random_text()
             self.status_update.emit(f"No text provided. Using random text: '{text}'")
             # Update the text field with the random text
-            self.text_edit.setText(text)
-        
-        self.keyboard_automation.text_to_type = text
+            text_edit.blockSignals(True)
+            text_edit.setText(text)
+            text_edit.blockSignals(False)
+        return text
     
     def start_automation(self):
         """Start both automations."""
-        self._update_mouse_settings()
-        self._update_keyboard_settings()
-        self._update_keyboard_text()
+        # Push pending edits now; untouched widgets may hold clamped copies of
+        # values set elsewhere (profiles, control server, adaptive keep-alive)
+        self.binder.flush()
         self._update_failsafe()
         
-        # Validate settings before starting
-        if not self._validate_settings():
-            return False
-        
-        # Start both automations
-        mouse_success = self.mouse_automation.start()
-        keyboard_success = self.keyboard_automation.start()
-        
-        if not mouse_success or not keyboard_success:
-            # If either start failed, stop both
-            self.stop_automation()
-            self.error_occurred.emit("Failed to start one or more automations")
-            return False
-        
-        self.status_update.emit("Both automations started")
-        return True
+        # The controller validates the settings before starting
+        return self.controller.start()
     
     def stop_automation(self):
         """Stop both automations."""
-        self.mouse_automation.stop()
-        self.keyboard_automation.stop()
-        self.status_update.emit("Both automations stopped")
+        self.controller.stop()
     
     def pause_automation(self):
         """Pause both automations."""
-        self.mouse_automation.pause()
-        self.keyboard_automation.pause()
-        self.status_update.emit("Both automations paused")
+        self.controller.pause()
     
     def resume_automation(self):
         """Resume both automations."""
-        self.mouse_automation.resume()
-        self.keyboard_automation.resume()
-        self.status_update.emit("Both automations resumed")
+        self.controller.resume()
+    
+    def refresh_from_engines(self):
+        """Update the widgets from the engines' current settings."""
+        # Pending edits are dropped; the engines' settings win
+        self.binder.refresh()
+        self.failsafe_check.blockSignals(True)
+        self.failsafe_check.setChecked(self.mouse_automation.failsafe_active)
+        self.failsafe_check.blockSignals(False)
+        self._update_keyboard_mode_widgets()
+        self.plugin_panel.refresh_from_engines()
     
     def reset_settings(self):
         """Reset all settings to default values."""
@@ -458,14 +465,15 @@ class CombinedPanel(QWidget):
         self.keyboard_max_interval_spin.setValue(0.3)
         self.randomize_check.setChecked(True)
         self.text_edit.setText("The quick brown fox jumps over the lazy dog.")
+        self.keyboard_mode_combo.setCurrentIndex(0)  # Type text
+        self.keepalive_key_combo.setCurrentIndex(0)  # Shift
+        self.keepalive_interval_spin.setValue(60.0)
         
         # Reset failsafe
-        self.failsafe_check.setChecked(True)
+        self.failsafe_check.setChecked(self.controller.failsafe_available)
         
-        # Update settings
-        self._update_mouse_settings()
-        self._update_keyboard_settings()
-        self._update_keyboard_text()
+        # Push the defaults now rather than after the debounce
+        self.binder.flush(full=True)
         self._update_failsafe()
         
         self.status_update.emit("All settings reset to default") 
\ No newline at end of file
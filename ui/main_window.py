@@ -5,14 +5,16 @@ import qdarktheme
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QPushButton, QLabel, QComboBox, QTabWidget,
-    QStatusBar, QMessageBox, QAction, QToolBar, QApplication
+    QStatusBar, QMessageBox, QAction, QToolBar, QApplication, QMenu
 )
-from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtCore import Qt, QSize, QEvent, pyqtSignal
 from PyQt5.QtGui import QIcon, QFont
 
+from controller import AutomationController, STATE_STOPPED, STATE_RUNNING, STATE_PAUSED
 from ui.combined_panel import CombinedPanel
-from ui.settings_dialog import SettingsDialog
+from ui.settings_dialog import SettingsDialog, apply_app_settings
 from ui.help_dialog import HelpDialog
+from engine_profiler import ProfilerError
 
 # Handle bundled application resources
 def resource_path(relative_path):
@@ -27,9 +29,20 @@ def resource_path(relative_path):
 class MainWindow(QMainWindow):
     """Main window of the application."""
     
-    def __init__(self):
+    # Emitted when the window was closed or minimized to the tray and may be destroyed
+    hidden_to_tray = pyqtSignal()
+    
+    def __init__(self, controller=None, tray=None):
         super().__init__()
         
+        # The controller owns the engines and may be shared with the control server
+        self.controller = controller or AutomationController()
+        # Optional ui.tray.TrayManager that owns this window in low-memory mode
+        self.tray = tray
+        
+        # Dialogs are created on first use and reused
+        self._settings_dialog = None
+        
         # Set window properties
         self.setWindowTitle("LetMeSleep - Automation Tool")
         self.setWindowIcon(QIcon(resource_path("resources/icons/bot.svg")))
@@ -45,6 +58,11 @@ class MainWindow(QMainWindow):
         
         # Setup theme 
         self.current_theme = "dark"
+        
+        # Apply persisted schedule and safety timeout to the controller;
+        # the tray manager has done so already when there is one
+        if self.tray is None:
+            self._apply_app_settings()
     
     def _init_ui(self):
         """Initialize the UI components."""
@@ -57,10 +75,11 @@ class MainWindow(QMainWindow):
         self._create_toolbar()
         
         # Create combined panel
-        self.combined_panel = CombinedPanel()
+        self.combined_panel = CombinedPanel(self.controller)
         self.combined_panel.status_update.connect(self._update_status)
         self.combined_panel.failsafe_triggered.connect(self._handle_failsafe)
         self.combined_panel.error_occurred.connect(self._handle_error)
+        self.combined_panel.stopped_on_error.connect(self._handle_stopped_on_error)
         
         # Add combined panel to main layout
         main_layout.addWidget(self.combined_panel)
@@ -87,7 +106,7 @@ class MainWindow(QMainWindow):
         # Exit button
         self.exit_button = QPushButton("Exit")
         self.exit_button.setMinimumWidth(120)
-        self.exit_button.clicked.connect(self.close)
+        self.exit_button.clicked.connect(self._exit)
         
         # Add buttons to control layout
         control_layout.addWidget(self.start_stop_button)
@@ -97,6 +116,10 @@ class MainWindow(QMainWindow):
         
         # Add control layout to main layout
         main_layout.addLayout(control_layout)
+        
+        # Keep the buttons in sync with the controller, whoever changes its state
+        self.controller.state_changed.connect(self._sync_controls)
+        self._sync_controls(self.controller.state())
     
     def _create_toolbar(self):
         """Create the toolbar with actions."""
@@ -114,6 +137,16 @@ class MainWindow(QMainWindow):
         help_action.triggered.connect(self._show_help)
         toolbar.addAction(help_action)
         
+        # Profiling action, with a menu of profiler modes
+        profile_menu = QMenu(self)
+        for label, mode in (("Sampling Profile (30 s)", "sample"), ("cProfile (30 s)", "cprofile")):
+            action = profile_menu.addAction(label)
+            action.triggered.connect(lambda checked, mode=mode: self._start_profiling(mode))
+        profile_action = QAction("Profile Engines", self)
+        profile_action.setMenu(profile_menu)
+        profile_action.triggered.connect(lambda: self._start_profiling("sample"))
+        toolbar.addAction(profile_action)
+        
         # Theme action
         self.theme_action = QAction("Switch to Light Theme", self)
         self.theme_action.triggered.connect(self._toggle_theme)
@@ -121,9 +154,6 @@ class MainWindow(QMainWindow):
     
     def _handle_failsafe(self):
         """Handle failsafe trigger event."""
-        self.start_stop_button.setText("Start Both")
-        self.pause_resume_button.setText("Pause Both")
-        self.pause_resume_button.setEnabled(False)
         self.status_bar.showMessage("FAILSAFE TRIGGERED! All automations stopped", 5000)  # Show for 5 seconds
         
         # Show failsafe message box
@@ -134,33 +164,34 @@ class MainWindow(QMainWindow):
             QMessageBox.Ok
         )
     
+    def _sync_controls(self, state):
+        """Update the control buttons to reflect the controller state."""
+        running = state != STATE_STOPPED
+        self.start_stop_button.setText("Stop Both" if running else "Start Both")
+        self.pause_resume_button.setText("Resume Both" if state == STATE_PAUSED else "Pause Both")
+        # Nothing to pause while waiting for an activity window
+        self.pause_resume_button.setEnabled(state in (STATE_RUNNING, STATE_PAUSED))
+    
     def _start_stop(self):
         """Handle start/stop button click."""
-        if self.start_stop_button.text() == "Start Both":
+        if not self.controller.is_running():
             # Start both automations
             if self.combined_panel.start_automation():
-                self.start_stop_button.setText("Stop Both")
-                self.pause_resume_button.setEnabled(True)
                 self.status_bar.showMessage("All automations started")
         else:
             # Stop all automations
             self.combined_panel.stop_automation()
-            self.start_stop_button.setText("Start Both")
-            self.pause_resume_button.setText("Pause Both")
-            self.pause_resume_button.setEnabled(False)
             self.status_bar.showMessage("All automations stopped")
     
     def _pause_resume(self):
         """Handle pause/resume button click."""
-        if self.pause_resume_button.text() == "Pause Both":
+        if not self.controller.is_paused():
             # Pause all automations
             self.combined_panel.pause_automation()
-            self.pause_resume_button.setText("Resume Both")
             self.status_bar.showMessage("All automations paused")
         else:
             # Resume all automations
             self.combined_panel.resume_automation()
-            self.pause_resume_button.setText("Pause Both")
             self.status_bar.showMessage("All automations resumed")
     
     def _reset(self):
@@ -169,13 +200,37 @@ class MainWindow(QMainWindow):
         self.status_bar.showMessage("All settings reset to default")
     
     def _show_settings(self):
-        """Show the settings dialog."""
-        settings_dialog = SettingsDialog(self)
-        settings_dialog.exec_()
+        """Show the settings dialog, reusing it between calls."""
+        if self._settings_dialog is None:
+            self._settings_dialog = SettingsDialog(self)
+            self._settings_dialog.settings_applied.connect(self._apply_app_settings)
+        else:
+            self._settings_dialog.reload()
+        self._settings_dialog.exec_()
+    
+    def _apply_app_settings(self):
+        """Apply global settings that affect the automation controller."""
+        for problem in apply_app_settings(self.controller):
+            self._handle_error(problem)
+        
+        if self.tray is not None:
+            self.tray.reload_settings()
+    
+    def _start_profiling(self, mode):
+        """Profile the running engines for 30 seconds."""
+        if not self.controller.is_running():
+            self._handle_error("Start the automation before profiling it")
+            return
+        try:
+            self.controller.start_profiling(mode, 30.0)
+        except ProfilerError as e:
+            self._handle_error(str(e))
     
     def _show_help(self):
         """Show the help dialog."""
         help_dialog = HelpDialog(self)
+        # Rarely opened; free its pages instead of keeping them around
+        help_dialog.setAttribute(Qt.WA_DeleteOnClose)
         help_dialog.exec_()
     
     def _toggle_theme(self):
@@ -200,27 +255,54 @@ class MainWindow(QMainWindow):
         # Show error in status bar
         self.status_bar.showMessage(f"ERROR: {message}", 5000)  # Show for 5 seconds
         
-        # If automation is running, stop it on critical errors
-        if "maximum error retries exceeded" in message.lower() or "fatal" in message.lower():
-            self.combined_panel.stop_automation()
-            self.start_stop_button.setText("Start Both")
-            self.pause_resume_button.setText("Pause Both")
-            self.pause_resume_button.setEnabled(False)
-            
-            # Show error dialog for critical errors
-            QMessageBox.critical(
-                self, "Automation Error",
-                f"The automation has been stopped due to a critical error:\n\n{message}\n\n"
-                f"Please check the application logs for more details.",
-                QMessageBox.Ok
-            )
-        # For non-critical errors, just log and continue
-        else:
-            # Log to console
-            print(f"ERROR: {message}")
+        # Log to console; errors that stop an engine also arrive through stopped_on_error
+        print(f"ERROR: {message}")
+    
+    def _handle_stopped_on_error(self, message):
+        """Stop everything and tell the user when an engine stopped on an error."""
+        self.combined_panel.stop_automation()
+        
+        # Show error dialog for critical errors
+        QMessageBox.critical(
+            self, "Automation Error",
+            f"The automation has been stopped due to a critical error:\n\n{message}\n\n"
+            f"Please check the application logs for more details.",
+            QMessageBox.Ok
+        )
+    
+    def _closes_to_tray(self):
+        """Check if closing the window should leave the app running in the tray."""
+        return self.tray is not None and self.tray.closes_to_tray()
+    
+    def _exit(self):
+        """Handle the Exit button: quit the application."""
+        if not self._closes_to_tray():
+            self.close()
+            return
+        reply = QMessageBox.question(
+            self, 'Exit Confirmation',
+            'Are you sure you want to exit?',
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        if reply == QMessageBox.Yes:
+            self.tray.quit()
+    
+    def changeEvent(self, event):
+        """Unload the window when it is minimized in low-memory mode."""
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange and self.isMinimized() and self._closes_to_tray():
+            self.hide()
+            self.hidden_to_tray.emit()
     
     def closeEvent(self, event):
         """Handle window close event."""
+        if self._closes_to_tray():
+            # Keep the engines running; the tray brings the window back
+            event.accept()
+            self.hidden_to_tray.emit()
+            return
+        
         # Show confirmation dialog
         reply = QMessageBox.question(
             self, 'Exit Confirmation',
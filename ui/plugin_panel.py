@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QFormLayout, QCheckBox, QSpinBox,
+    QDoubleSpinBox, QComboBox, QLineEdit, QLabel, QTableWidget, QPushButton,
+    QHeaderView
+)
+from PyQt5.QtCore import pyqtSignal
+
+from plugins import PluginError
+from ui.settings_binding import SettingsBinder
+
+
+class RecordTable(QWidget):
+    """Edit a "list" setting as a table, one row per record and one column per field."""
+
+    changed = pyqtSignal()
+
+    def __init__(self, spec, parent=None):
+        super().__init__(parent)
+        self.fields = spec.get("item", {})
+        self.max_rows = spec.get("max")
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.table = QTableWidget(0, len(self.fields))
+        self.table.setHorizontalHeaderLabels([
+            field_spec.get("label", field.replace("_", " ").capitalize())
+            for field, field_spec in self.fields.items()])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        self.add_button = QPushButton("Add")
+        self.add_button.clicked.connect(self._add_clicked)
+        self.remove_button = QPushButton("Remove")
+        self.remove_button.clicked.connect(self._remove_clicked)
+        buttons.addWidget(self.add_button)
+        buttons.addWidget(self.remove_button)
+        buttons.addStretch()
+        layout.addLayout(buttons)
+
+    def _add_row(self, record):
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        for column, (field, field_spec) in enumerate(self.fields.items()):
+            widget = _setting_widget(field_spec)
+            _set_widget_value(widget, record.get(field, field_spec.get("default")))
+            _widget_changed_signal(widget).connect(lambda *args: self.changed.emit())
+            self.table.setCellWidget(row, column, widget)
+
+    def _add_clicked(self):
+        if self.max_rows is not None and self.table.rowCount() >= self.max_rows:
+            return
+        self._add_row({})
+        self.changed.emit()
+
+    def _remove_clicked(self):
+        row = self.table.currentRow()
+        if row < 0:
+            row = self.table.rowCount() - 1
+        if row < 0:
+            return
+        self.table.removeRow(row)
+        self.changed.emit()
+
+    def value(self):
+        """Return the records as a list of dicts."""
+        return [
+            {field: _widget_value(self.table.cellWidget(row, column))
+             for column, field in enumerate(self.fields)}
+            for row in range(self.table.rowCount())
+        ]
+
+    def set_value(self, records):
+        """Replace the rows with a list of records, without emitting changed."""
+        self.blockSignals(True)
+        self.table.setRowCount(0)
+        for record in records or ():
+            self._add_row(record)
+        self.blockSignals(False)
+
+
+def _setting_widget(spec):
+    """Create an editor widget for one schema entry."""
+    kind = spec.get("type", "str")
+    if kind == "list":
+        return RecordTable(spec)
+    if kind == "bool":
+        return QCheckBox()
+    if kind == "int":
+        widget = QSpinBox()
+        widget.setRange(int(spec.get("min", -10 ** 6)), int(spec.get("max", 10 ** 6)))
+        return widget
+    if kind == "float":
+        widget = QDoubleSpinBox()
+        widget.setDecimals(2)
+        widget.setRange(float(spec.get("min", -10 ** 6)), float(spec.get("max", 10 ** 6)))
+        return widget
+    if kind == "choice":
+        widget = QComboBox()
+        widget.addItems([str(choice) for choice in spec.get("choices", ())])
+        return widget
+    return QLineEdit()
+
+
+def _set_widget_value(widget, value):
+    if isinstance(widget, RecordTable):
+        widget.set_value(value)
+    elif isinstance(widget, QCheckBox):
+        widget.setChecked(bool(value))
+    elif isinstance(widget, (QSpinBox, QDoubleSpinBox)):
+        widget.setValue(value)
+    elif isinstance(widget, QComboBox):
+        widget.setCurrentText(str(value))
+    else:
+        widget.setText("" if value is None else str(value))
+
+
+def _widget_value(widget):
+    if isinstance(widget, RecordTable):
+        return widget.value()
+    if isinstance(widget, QCheckBox):
+        return widget.isChecked()
+    if isinstance(widget, (QSpinBox, QDoubleSpinBox)):
+        return widget.value()
+    if isinstance(widget, QComboBox):
+        return widget.currentText()
+    return widget.text()
+
+
+def _widget_changed_signal(widget):
+    if isinstance(widget, RecordTable):
+        return widget.changed
+    if isinstance(widget, QCheckBox):
+        return widget.stateChanged
+    if isinstance(widget, (QSpinBox, QDoubleSpinBox)):
+        return widget.valueChanged
+    if isinstance(widget, QComboBox):
+        return widget.currentIndexChanged
+    return widget.editingFinished
+
+
+class PluginPanel(QWidget):
+    """Enable automation plugins and edit their settings.
+
+    Only plugin names are listed up front; a plugin's module is imported,
+    and its settings form generated from its schema, when it is enabled.
+    """
+
+    status_update = pyqtSignal(str)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, controller, parent=None):
+        super().__init__(parent)
+        self.controller = controller
+        self.checks = {}
+        self.forms = {}  # name -> (container, {setting: widget}, engine)
+        # Table edits can fire per keystroke; push them debounced and only if changed
+        self.binder = SettingsBinder(self)
+        self.binder.error_occurred.connect(self.error_occurred)
+
+        self.main_layout = QVBoxLayout(self)
+        names = controller.plugins.names()
+        if not names:
+            self.main_layout.addWidget(QLabel("No automation plugins installed"))
+        for name in names:
+            check = QCheckBox(controller.plugins.title(name))
+            check.toggled.connect(lambda checked, name=name: self._toggle(name, checked))
+            self.main_layout.addWidget(check)
+            self.checks[name] = check
+        self.refresh_from_engines()
+
+    def _toggle(self, name, enabled):
+        """Enable or disable a plugin from its checkbox."""
+        if enabled:
+            try:
+                self.controller.enable_plugin(name)
+            except PluginError as e:
+                self.error_occurred.emit(str(e))
+                self.checks[name].blockSignals(True)
+                self.checks[name].setChecked(False)
+                self.checks[name].blockSignals(False)
+                return
+            self.status_update.emit(f"{self.controller.plugins.title(name)} enabled")
+        else:
+            self.controller.disable_plugin(name)
+            self.status_update.emit(f"{self.controller.plugins.title(name)} disabled")
+
+    def _build_form(self, name, engine):
+        """Create the settings form for an enabled plugin from its schema."""
+        container = QWidget()
+        form = QFormLayout(container)
+        form.setContentsMargins(20, 0, 0, 0)
+        widgets = {}
+        for setting, spec in engine.SETTINGS_SCHEMA.items():
+            widget = _setting_widget(spec)
+            _set_widget_value(widget, getattr(engine, setting))
+            self.binder.bind(widget, engine, setting, read=_widget_value, write=_set_widget_value)
+            label = spec.get("label", setting.replace("_", " ").capitalize())
+            if isinstance(widget, RecordTable):
+                # Tables get the full width
+                form.addRow(QLabel(label + ":"))
+                form.addRow(widget)
+            else:
+                form.addRow(label + ":", widget)
+            widgets[setting] = widget
+        self.main_layout.insertWidget(self.main_layout.indexOf(self.checks[name]) + 1, container)
+        self.forms[name] = (container, widgets, engine)
+
+    def refresh_from_engines(self):
+        """Sync the checkboxes and forms with the enabled plugin engines."""
+        for name, check in self.checks.items():
+            engine = self.controller.engines.get(name)
+            check.blockSignals(True)
+            check.setChecked(engine is not None)
+            check.blockSignals(False)
+            if engine is None:
+                if name in self.forms:
+                    container, widgets, old_engine = self.forms.pop(name)
+                    self.binder.unbind(old_engine)
+                    container.deleteLater()
+                continue
+            if name not in self.forms:
+                self._build_form(name, engine)
+                continue
+            self.binder.refresh(engine)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+from PyQt5.QtWidgets import (
+    QSpinBox, QDoubleSpinBox, QComboBox, QCheckBox, QTextEdit, QLineEdit
+)
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from plugins import PluginError
+
+
+class Binding:
+    """One widget bound to one engine setting."""
+
+    def __init__(self, widget, engine, setting, choices=None, read=None, write=None):
+        self.widget = widget
+        self.engine = engine
+        self.setting = setting
+        # A combo box bound with choices maps its index to choices[index]
+        self.choices = tuple(choices) if choices is not None else None
+        self._read = read
+        self._write = write
+
+    def value(self):
+        """Return the widget's value in model terms."""
+        if self._read is not None:
+            return self._read(self.widget)
+        widget = self.widget
+        if isinstance(widget, QComboBox):
+            index = widget.currentIndex()
+            if self.choices is None:
+                return widget.currentText()
+            return self.choices[index] if 0 <= index < len(self.choices) else None
+        if isinstance(widget, QCheckBox):
+            return widget.isChecked()
+        if isinstance(widget, QTextEdit):
+            return widget.toPlainText()
+        if isinstance(widget, QLineEdit):
+            return widget.text()
+        return widget.value()
+
+    def show(self, value):
+        """Show a model value in the widget (signals must be blocked by the caller)."""
+        if self._write is not None:
+            self._write(self.widget, value)
+            return
+        widget = self.widget
+        if isinstance(widget, QComboBox):
+            if self.choices is None:
+                widget.setCurrentText(str(value))
+            elif value in self.choices:
+                widget.setCurrentIndex(self.choices.index(value))
+        elif isinstance(widget, QCheckBox):
+            widget.setChecked(bool(value))
+        elif isinstance(widget, QTextEdit):
+            if widget.toPlainText() != value:
+                widget.setPlainText(value or "")
+        elif isinstance(widget, QLineEdit):
+            widget.setText("" if value is None else str(value))
+        else:
+            widget.setValue(value)
+
+
+def changed_signal(widget):
+    """Return the signal a widget emits when the user edits it."""
+    if isinstance(widget, QComboBox):
+        return widget.currentIndexChanged
+    if isinstance(widget, QCheckBox):
+        return widget.toggled
+    if isinstance(widget, QTextEdit):
+        return widget.textChanged
+    if isinstance(widget, QLineEdit):
+        return widget.editingFinished
+    if isinstance(widget, (QSpinBox, QDoubleSpinBox)):
+        return widget.valueChanged
+    # Custom editors expose a changed signal
+    return widget.changed
+
+
+class SettingsBinder(QObject):
+    """Bind widgets to engine settings and push edits to the engines.
+
+    Bindings are declared once (widget, engine, setting). Edits only mark
+    their binding dirty; a single-shot timer coalesces them, so dragging a
+    spin box pushes once it settles (or every max_delay_ms while it keeps
+    moving). A push compares each dirty binding with the engine's current
+    value and hands only the changed settings to apply_settings, in one
+    call per engine. refresh() goes the other way, model to widgets, with
+    widget signals blocked so nothing is pushed back.
+    """
+
+    # Emitted after a push with the engine and the {setting: value} it received
+    pushed = pyqtSignal(object, dict)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, parent=None, delay_ms=150, max_delay_ms=500):
+        super().__init__(parent)
+        self.delay_ms = delay_ms
+        self.max_delay_ms = max_delay_ms
+        self.bindings = []
+        self.pushes = 0
+        self._dirty = []
+        self._waited_ms = 0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.flush)
+
+    def bind(self, widget, engine, setting, choices=None, read=None, write=None):
+        """Bind a widget to an engine setting and return the binding."""
+        binding = Binding(widget, engine, setting, choices, read, write)
+        changed_signal(widget).connect(lambda *args: self._mark(binding))
+        self.bindings.append(binding)
+        return binding
+
+    def unbind(self, engine):
+        """Drop every binding of an engine (e.g. a disabled plugin)."""
+        self.bindings = [binding for binding in self.bindings if binding.engine is not engine]
+        self._dirty = [binding for binding in self._dirty if binding.engine is not engine]
+
+    def ordered(self, low, high):
+        """Keep a maximum widget at or above its minimum widget as the user edits."""
+        def raise_high(*args):
+            if high.value() < low.value():
+                high.setValue(low.value())
+        changed_signal(low).connect(raise_high)
+
+    def _mark(self, binding):
+        """Queue a binding for the next push."""
+        if binding not in self._dirty:
+            self._dirty.append(binding)
+        # Each edit restarts the debounce, but a continuous drag still pushes every max_delay_ms
+        if self._timer.isActive():
+            self._waited_ms += self.delay_ms - self._timer.remainingTime()
+        else:
+            self._waited_ms = 0
+        self._timer.start(max(0, min(self.delay_ms, self.max_delay_ms - self._waited_ms)))
+
+    def pending(self):
+        """Check whether edits are waiting to be pushed."""
+        return bool(self._dirty)
+
+    def flush(self, full=False):
+        """Push the changed settings now; return the number of settings pushed.
+
+        full compares every binding with its engine, not only the edited ones.
+        """
+        self._timer.stop()
+        dirty, self._dirty = (list(self.bindings) if full else self._dirty), []
+        changes = {}
+        for binding in dirty:
+            value = binding.value()
+            if value != getattr(binding.engine, binding.setting, None):
+                changes.setdefault(binding.engine, {})[binding.setting] = value
+        for engine, settings in changes.items():
+            try:
+                engine.apply_settings(settings)
+            except (PluginError, ValueError) as e:
+                self.error_occurred.emit(str(e))
+                continue
+            self.pushes += 1
+            self.pushed.emit(engine, settings)
+        return sum(len(settings) for settings in changes.values())
+
+    def refresh(self, engine=None):
+        """Show the engines' current settings (or one engine's) in the widgets."""
+        bindings = [binding for binding in self.bindings if engine is None or binding.engine is engine]
+        # Pending edits are superseded by the model
+        self._dirty = [binding for binding in self._dirty if binding not in bindings]
+        for binding in bindings:
+            binding.widget.blockSignals(True)
+            try:
+                binding.show(getattr(binding.engine, binding.setting))
+            finally:
+                binding.widget.blockSignals(False)
@@ -2,14 +2,75 @@
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QGroupBox, 
     QLabel, QCheckBox, QComboBox, QPushButton, 
-    QFormLayout, QDialogButtonBox
+    QFormLayout, QDialogButtonBox, QSpinBox, QLineEdit,
+    QMessageBox
 )
-from PyQt5.QtCore import Qt, QSettings
+from PyQt5.QtCore import Qt, QSettings, pyqtSignal
+
+from scheduler import ActivitySchedule, ScheduleError
+from window_target import WindowTargetError
+from idle_timeout import IdleTimeoutError
+
+
+def apply_app_settings(controller):
+    """Apply stored global settings to the controller; return a list of problems."""
+    settings = QSettings("LetMeSleep", "AutomationTool")
+    problems = []
+    
+    # Safety timeout is enforced as a run limit
+    if settings.value("general/safety_timeout", True, type=bool):
+        minutes = settings.value("general/safety_timeout_minutes", 30, type=int)
+        controller.set_run_limit(minutes * 60)
+    else:
+        controller.set_run_limit(None)
+    
+    # Activity windows
+    spec = settings.value("schedule/windows", "", type=str).strip()
+    schedule = None
+    if spec:
+        try:
+            schedule = ActivitySchedule.parse(spec)
+        except ScheduleError as e:
+            problems.append(f"Ignoring invalid schedule: {str(e)}")
+    controller.set_schedule(schedule)
+    
+    # Window targeting
+    title = settings.value("target/title", "", type=str).strip()
+    wm_class = settings.value("target/class", "", type=str).strip()
+    try:
+        controller.set_window_target(title, wm_class)
+    except WindowTargetError as e:
+        problems.append(f"Ignoring target window: {str(e)}")
+    
+    # Power-aware throttling
+    try:
+        controller.set_power_policy(
+            settings.value("power/policy", "off", type=str),
+            keepalive_ceiling=settings.value("power/keepalive_ceiling", 240, type=int)
+        )
+    except ValueError as e:
+        problems.append(f"Ignoring power policy: {str(e)}")
+    
+    # Keep-alive intervals from the system idle timeout
+    if settings.value("adaptive/enabled", False, type=bool):
+        try:
+            controller.set_adaptive_keepalive(
+                presence_timeout=settings.value("adaptive/presence_timeout", 0, type=int) or None
+            )
+        except IdleTimeoutError as e:
+            controller.set_adaptive_keepalive(False)
+            problems.append(f"Adaptive keep-alive unavailable: {str(e)}")
+    else:
+        controller.set_adaptive_keepalive(False)
+    return problems
 
 
 class SettingsDialog(QDialog):
     """Dialog for global application settings."""
     
+    # Emitted after settings are saved
+    settings_applied = pyqtSignal()
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         
@@ -39,13 +100,108 @@ class SettingsDialog(QDialog):
         self.start_minimized_check = QCheckBox("Start application minimized")
         general_layout.addRow("", self.start_minimized_check)
         
+        # Low-memory mode: unload the window when closed or minimized
+        self.low_memory_check = QCheckBox("Low-memory mode (close to tray and unload the window)")
+        self.low_memory_check.setToolTip(
+            "Closing or minimizing the window frees it while automation keeps running.\n"
+            "Use the tray icon to bring it back. Needs a system tray."
+        )
+        general_layout.addRow("", self.low_memory_check)
+        
+        # Tray mode: unload the window whenever automation is running
+        self.tray_mode_check = QCheckBox("Hide to system tray while automation runs")
+        self.tray_mode_check.setToolTip(
+            "Starting automation unloads the window; control it from the tray icon menu"
+        )
+        general_layout.addRow("", self.tray_mode_check)
+        
         # Safety timeout option
-        self.safety_timeout_check = QCheckBox("Enable safety timeout (30 min)")
+        self.safety_timeout_check = QCheckBox("Enable safety timeout")
         general_layout.addRow("", self.safety_timeout_check)
         
+        self.safety_timeout_spin = QSpinBox()
+        self.safety_timeout_spin.setRange(1, 24 * 60)
+        self.safety_timeout_spin.setSuffix(" min")
+        self.safety_timeout_spin.setToolTip("Stop all automation after running this long")
+        self.safety_timeout_check.toggled.connect(self.safety_timeout_spin.setEnabled)
+        general_layout.addRow("Stop After:", self.safety_timeout_spin)
+        
         general_group.setLayout(general_layout)
         main_layout.addWidget(general_group)
         
+        # Schedule settings group
+        schedule_group = QGroupBox("Schedule")
+        schedule_layout = QFormLayout()
+        
+        # Activity windows; empty means run at any time
+        self.schedule_edit = QLineEdit()
+        self.schedule_edit.setPlaceholderText("e.g. mon-fri 09:00-12:00; mon-fri 13:00-17:30")
+        self.schedule_edit.setToolTip(
+            "Automation only runs inside these windows and fully sleeps outside them.\n"
+            "Leave empty to run whenever started."
+        )
+        schedule_layout.addRow("Activity Windows:", self.schedule_edit)
+        
+        schedule_group.setLayout(schedule_layout)
+        main_layout.addWidget(schedule_group)
+        
+        # Target window group; empty means anywhere on the screen
+        target_group = QGroupBox("Target Window")
+        target_layout = QFormLayout()
+        
+        self.target_title_edit = QLineEdit()
+        self.target_title_edit.setPlaceholderText("Part of the window title, e.g. Notepad")
+        self.target_title_edit.setToolTip(
+            "Mouse moves stay inside this window, and keystrokes and clicks only happen\n"
+            "while it has focus. Leave both fields empty to use the whole screen. X11 only."
+        )
+        target_layout.addRow("Title Contains:", self.target_title_edit)
+        
+        self.target_class_edit = QLineEdit()
+        self.target_class_edit.setPlaceholderText("WM_CLASS, e.g. gedit")
+        target_layout.addRow("Window Class:", self.target_class_edit)
+        
+        target_group.setLayout(target_layout)
+        main_layout.addWidget(target_group)
+        
+        # Power settings group
+        power_group = QGroupBox("Power Saving")
+        power_layout = QFormLayout()
+        
+        # Policy selection
+        self.power_policy_combo = QComboBox()
+        self.power_policy_combo.addItems(["Off", "Balanced", "Saver"])
+        self.power_policy_combo.setToolTip(
+            "Stretch action intervals when running on battery or when the system is busy"
+        )
+        power_layout.addRow("Power Policy:", self.power_policy_combo)
+        
+        # Longest allowed interval, so the session still stays alive
+        self.keepalive_ceiling_spin = QSpinBox()
+        self.keepalive_ceiling_spin.setRange(10, 3600)
+        self.keepalive_ceiling_spin.setSuffix(" s")
+        self.keepalive_ceiling_spin.setToolTip("Intervals are never stretched beyond this")
+        power_layout.addRow("Maximum Interval:", self.keepalive_ceiling_spin)
+        
+        # Intervals derived from the screensaver/DPMS timeout instead of the panel
+        self.adaptive_check = QCheckBox("Adaptive Keep-Alive")
+        self.adaptive_check.setToolTip(
+            "Set the pause between mouse movements (and the keep-alive key interval) just below "
+            "the screensaver/DPMS timeout, so as few events as possible are sent. X11 only."
+        )
+        self.adaptive_check.toggled.connect(lambda checked: self.presence_timeout_spin.setEnabled(checked))
+        power_layout.addRow(self.adaptive_check)
+        
+        self.presence_timeout_spin = QSpinBox()
+        self.presence_timeout_spin.setRange(0, 7200)
+        self.presence_timeout_spin.setSuffix(" s")
+        self.presence_timeout_spin.setSpecialValueText("None")
+        self.presence_timeout_spin.setToolTip("Chat presence timeout (away status), if shorter than the screensaver")
+        power_layout.addRow("Presence Timeout:", self.presence_timeout_spin)
+        
+        power_group.setLayout(power_layout)
+        main_layout.addWidget(power_group)
+        
         # Theme settings group
         theme_group = QGroupBox("Theme Settings")
         theme_layout = QFormLayout()
@@ -89,9 +245,38 @@ class SettingsDialog(QDialog):
         self.start_minimized_check.setChecked(
             self.settings.value("general/start_minimized", False, type=bool)
         )
+        self.low_memory_check.setChecked(
+            self.settings.value("general/low_memory", False, type=bool)
+        )
+        self.tray_mode_check.setChecked(
+            self.settings.value("general/tray_mode", False, type=bool)
+        )
         self.safety_timeout_check.setChecked(
             self.settings.value("general/safety_timeout", True, type=bool)
         )
+        self.safety_timeout_spin.setValue(
+            self.settings.value("general/safety_timeout_minutes", 30, type=int)
+        )
+        self.safety_timeout_spin.setEnabled(self.safety_timeout_check.isChecked())
+        
+        # Load schedule settings
+        self.schedule_edit.setText(self.settings.value("schedule/windows", "", type=str))
+        
+        # Load target window settings
+        self.target_title_edit.setText(self.settings.value("target/title", "", type=str))
+        self.target_class_edit.setText(self.settings.value("target/class", "", type=str))
+        
+        # Load power settings
+        policy = self.settings.value("power/policy", "off", type=str)
+        self.power_policy_combo.setCurrentIndex(
+            {"off": 0, "balanced": 1, "saver": 2}.get(policy, 0)
+        )
+        self.keepalive_ceiling_spin.setValue(
+            self.settings.value("power/keepalive_ceiling", 240, type=int)
+        )
+        self.adaptive_check.setChecked(self.settings.value("adaptive/enabled", False, type=bool))
+        self.presence_timeout_spin.setValue(self.settings.value("adaptive/presence_timeout", 0, type=int))
+        self.presence_timeout_spin.setEnabled(self.adaptive_check.isChecked())
         
         # Load theme settings
         theme_index = 1 if self.settings.value("theme/default", "dark") == "dark" else 0
@@ -105,6 +290,10 @@ class SettingsDialog(QDialog):
             self.settings.value("safety/cursor_safety", True, type=bool)
         )
     
+    def reload(self):
+        """Discard unsaved edits and show the stored settings again."""
+        self._load_settings()
+    
     def _save_settings(self):
         """Save settings to QSettings."""
         # Save general settings
@@ -112,10 +301,41 @@ class SettingsDialog(QDialog):
             "general/start_minimized", 
             self.start_minimized_check.isChecked()
         )
+        self.settings.setValue(
+            "general/low_memory",
+            self.low_memory_check.isChecked()
+        )
+        self.settings.setValue(
+            "general/tray_mode",
+            self.tray_mode_check.isChecked()
+        )
         self.settings.setValue(
             "general/safety_timeout", 
             self.safety_timeout_check.isChecked()
         )
+        self.settings.setValue(
+            "general/safety_timeout_minutes",
+            self.safety_timeout_spin.value()
+        )
+        
+        # Save schedule settings
+        self.settings.setValue("schedule/windows", self.schedule_edit.text().strip())
+        
+        # Save target window settings
+        self.settings.setValue("target/title", self.target_title_edit.text().strip())
+        self.settings.setValue("target/class", self.target_class_edit.text().strip())
+        
+        # Save power settings
+        self.settings.setValue(
+            "power/policy",
+            ("off", "balanced", "saver")[self.power_policy_combo.currentIndex()]
+        )
+        self.settings.setValue(
+            "power/keepalive_ceiling",
+            self.keepalive_ceiling_spin.value()
+        )
+        self.settings.setValue("adaptive/enabled", self.adaptive_check.isChecked())
+        self.settings.setValue("adaptive/presence_timeout", self.presence_timeout_spin.value())
         
         # Save theme settings
         theme = "dark" if self.theme_combo.currentIndex() == 1 else "light"
@@ -133,12 +353,27 @@ class SettingsDialog(QDialog):
         
         # Sync settings
         self.settings.sync()
+        self.settings_applied.emit()
+    
+    def _validate_settings(self):
+        """Validate settings before saving."""
+        spec = self.schedule_edit.text().strip()
+        if spec:
+            try:
+                ActivitySchedule.parse(spec)
+            except ScheduleError as e:
+                QMessageBox.warning(self, "Invalid Schedule", str(e), QMessageBox.Ok)
+                return False
+        return True
     
     def _apply_settings(self):
         """Apply the current settings."""
-        self._save_settings()
+        if self._validate_settings():
+            self._save_settings()
     
     def accept(self):
         """Handle dialog acceptance."""
+        if not self._validate_settings():
+            return
         self._save_settings()
         super().accept() 
\ No newline at end of file
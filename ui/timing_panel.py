@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+import math
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QSizePolicy
+from PyQt5.QtCore import Qt, QTimer, QRectF
+from PyQt5.QtGui import QPainter, QColor, QPen
+
+from timing_stats import MIN_VALUE, MAX_VALUE
+
+# Refresh rate cap for the histograms
+REFRESH_INTERVAL_MS = 500
+
+
+def _format_seconds(value):
+    """Format a duration compactly, in ms below one second."""
+    if value is None:
+        return "-"
+    return f"{value * 1000:.0f}ms" if value < 1.0 else f"{value:.2f}s"
+
+
+class HistogramWidget(QWidget):
+    """Log-scale histogram of one timing snapshot with the configured range shaded."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.snapshot = None
+        self.configured = None
+        self.setMinimumHeight(60)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+
+    def set_data(self, snapshot, configured):
+        self.snapshot = snapshot
+        self.configured = configured
+        self.update()
+
+    def _axis(self):
+        """Return the (low, high) values shown on the x axis."""
+        values = []
+        if self.snapshot is not None and self.snapshot.count:
+            values += [self.snapshot.minimum, self.snapshot.maximum]
+        if self.configured is not None:
+            values += [value for value in self.configured if value > 0]
+        values = [value for value in values if value and value > 0]
+        if not values:
+            return 0.01, 10.0
+        return max(MIN_VALUE, min(values) / 1.5), min(MAX_VALUE, max(values) * 1.5)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        rect = self.rect().adjusted(1, 1, -1, -1)
+        painter.setPen(QPen(self.palette().mid().color()))
+        painter.drawRect(rect)
+
+        low, high = self._axis()
+        log_low, log_span = math.log10(low), math.log10(high) - math.log10(low)
+
+        def x_for(value):
+            value = min(max(value, low), high)
+            return rect.left() + (math.log10(value) - log_low) / log_span * rect.width()
+
+        # Configured range
+        if self.configured is not None:
+            start, end = x_for(max(self.configured[0], low)), x_for(self.configured[1])
+            painter.fillRect(QRectF(start, rect.top(), max(2.0, end - start), rect.height()),
+                             QColor(80, 160, 255, 60))
+
+        if self.snapshot is None or not self.snapshot.count:
+            painter.setPen(self.palette().text().color())
+            painter.drawText(rect, Qt.AlignCenter, "No data yet")
+            return
+
+        tallest = max(self.snapshot.counts)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(255, 170, 60))
+        for index, count in enumerate(self.snapshot.counts):
+            if not count:
+                continue
+            bucket_low, bucket_high = self.snapshot.bucket_range(index)
+            if bucket_high < low or bucket_low > high:
+                continue
+            left = x_for(max(bucket_low, low))
+            right = x_for(min(bucket_high, high))
+            height = count / tallest * (rect.height() - 2)
+            painter.drawRect(QRectF(left, rect.bottom() - height, max(1.0, right - left - 1), height))
+
+        # Axis labels at the edges
+        painter.setPen(self.palette().text().color())
+        painter.drawText(rect.adjusted(3, 2, -3, -2), Qt.AlignLeft | Qt.AlignTop, _format_seconds(low))
+        painter.drawText(rect.adjusted(3, 2, -3, -2), Qt.AlignRight | Qt.AlignTop, _format_seconds(high))
+
+
+class TimingPanel(QWidget):
+    """Live histograms of actual action timings next to their configured ranges.
+
+    Polls the engines' histogram snapshots on a timer capped at two updates
+    per second, and only while visible, so the engines never signal the UI
+    per action.
+    """
+
+    def __init__(self, mouse_automation, keyboard_automation, parent=None):
+        super().__init__(parent)
+        self.mouse_automation = mouse_automation
+        self.keyboard_automation = keyboard_automation
+        self._last_counts = {}
+
+        mouse = mouse_automation
+        keyboard = keyboard_automation
+        # (title, histogram, configured range or None)
+        self.rows = [
+            ("Move duration", mouse.timings["move"],
+             lambda: (mouse.min_interval, mouse.max_interval)),
+            ("Move overhead", mouse.timings["move_overhead"], None),
+            ("Pause between movements", mouse.timings["pause"],
+             lambda: (mouse.between_min_interval, mouse.between_max_interval)),
+            ("Keystroke interval", keyboard.timings["keystroke"],
+             lambda: ((keyboard.keepalive_interval, keyboard.keepalive_interval) if keyboard.mode == "keys"
+                      else (keyboard.min_interval,
+                            keyboard.max_interval if keyboard.randomize_typing else keyboard.min_interval))),
+        ]
+
+        layout = QVBoxLayout(self)
+        self.widgets = []
+        for title, _, _ in self.rows:
+            label = QLabel(title)
+            histogram = HistogramWidget()
+            layout.addWidget(label)
+            layout.addWidget(histogram)
+            self.widgets.append((label, histogram))
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch(1)
+        reset_button = QPushButton("Reset Statistics")
+        reset_button.clicked.connect(self.reset)
+        button_layout.addWidget(reset_button)
+        layout.addLayout(button_layout)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(REFRESH_INTERVAL_MS)
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.timer.stop()
+
+    def refresh(self):
+        """Redraw the histograms that received new data."""
+        for (title, histogram, configured), (label, widget) in zip(self.rows, self.widgets):
+            configured_range = configured() if configured else None
+            key = (histogram.count, histogram.total, configured_range)
+            if self._last_counts.get(title) == key and widget.snapshot is not None:
+                continue
+            self._last_counts[title] = key
+            snapshot = histogram.snapshot()
+            widget.set_data(snapshot, configured_range)
+            summary = ""
+            if snapshot.count:
+                summary = (f"  n={snapshot.count}  mean={_format_seconds(snapshot.mean())}  "
+                           f"p50={_format_seconds(snapshot.percentile(0.5))}  "
+                           f"p95={_format_seconds(snapshot.percentile(0.95))}  "
+                           f"max={_format_seconds(snapshot.maximum)}")
+            if configured_range:
+                summary += (f"  (configured {_format_seconds(configured_range[0])}"
+                            f"-{_format_seconds(configured_range[1])})")
+            label.setText(title + summary)
+
+    def reset(self):
+        """Clear all histograms."""
+        for _, histogram, _ in self.rows:
+            histogram.reset()
+        self._last_counts.clear()
+        for _, widget in self.widgets:
+            widget.snapshot = None
+        self.refresh()
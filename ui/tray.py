@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+import gc
+import logging
+from PyQt5.QtWidgets import QSystemTrayIcon, QMenu, QAction, QApplication
+from PyQt5.QtCore import QObject, QSettings
+
+from controller import STATE_STOPPED, STATE_RUNNING, STATE_PAUSED, STATE_WAITING
+from profiles import list_profiles, load_profile, ProfileError
+from ui.main_window import MainWindow
+from ui.settings_dialog import apply_app_settings
+
+logger = logging.getLogger("LetMeSleep")
+
+
+class TrayManager(QObject):
+    """Own the main window's lifetime and the system tray icon.
+
+    In low-memory mode, closing or minimizing the window destroys it along
+    with all its widgets; the engines keep running under the controller and
+    the tray icon brings a fresh window back on demand. In tray mode the
+    window is also unloaded whenever automation starts, and the tray menu
+    controls the engines directly. The tray only follows state changes, so
+    nothing repaints on per-action status updates.
+    """
+
+    def __init__(self, controller, low_memory=False):
+        super().__init__()
+        self.controller = controller
+        self.force_low_memory = low_memory
+        self.low_memory = False
+        self.tray_mode = False
+        self.window = None
+        self.tray = None
+
+        # The window may never exist, so the tray applies the global settings
+        for problem in apply_app_settings(controller):
+            logger.warning(problem)
+
+        if QSystemTrayIcon.isSystemTrayAvailable():
+            self._create_tray()
+            controller.state_changed.connect(self._on_state_changed)
+            controller.failsafe_triggered.connect(self._on_failsafe)
+            controller.stopped_on_error.connect(self._on_error)
+            self._on_state_changed(controller.state())
+        self.reload_settings()
+
+    def _create_tray(self):
+        """Create the tray icon and its menu."""
+        self.tray = QSystemTrayIcon(QApplication.instance().windowIcon(), self)
+        self.tray.activated.connect(self._on_activated)
+
+        self.menu = QMenu()
+        show_action = QAction("Show Window", self.menu)
+        show_action.triggered.connect(self.show_window)
+        self.menu.addAction(show_action)
+        self.menu.addSeparator()
+
+        self.start_stop_action = QAction("Start", self.menu)
+        self.start_stop_action.triggered.connect(self._start_stop)
+        self.menu.addAction(self.start_stop_action)
+        self.pause_resume_action = QAction("Pause", self.menu)
+        self.pause_resume_action.triggered.connect(self._pause_resume)
+        self.menu.addAction(self.pause_resume_action)
+
+        # Filled in when opened, so new profiles show up without a restart
+        self.profile_menu = self.menu.addMenu("Profile")
+        self.profile_menu.aboutToShow.connect(self._fill_profile_menu)
+        self.menu.addSeparator()
+
+        quit_action = QAction("Quit", self.menu)
+        quit_action.triggered.connect(self.quit)
+        self.menu.addAction(quit_action)
+        self.tray.setContextMenu(self.menu)
+        self.tray.show()
+
+    def has_tray(self):
+        """Check if a system tray icon is available."""
+        return self.tray is not None
+
+    def closes_to_tray(self):
+        """Check if closing or minimizing the window should unload it."""
+        return self.low_memory or self.tray_mode
+
+    def reload_settings(self):
+        """Re-read the low-memory and tray mode settings."""
+        settings = QSettings("LetMeSleep", "AutomationTool")
+        low_memory = self.force_low_memory or settings.value("general/low_memory", False, type=bool)
+        tray_mode = settings.value("general/tray_mode", False, type=bool)
+        if (low_memory or tray_mode) and not self.has_tray():
+            logger.warning("No system tray available; keeping the window alive")
+        self.low_memory = low_memory and self.has_tray()
+        self.tray_mode = tray_mode and self.has_tray()
+        # Only a window that can be brought back may be torn down
+        QApplication.instance().setQuitOnLastWindowClosed(not self.closes_to_tray())
+
+    def show_initial(self):
+        """Show the window at startup, honouring the start minimized setting."""
+        settings = QSettings("LetMeSleep", "AutomationTool")
+        if not settings.value("general/start_minimized", False, type=bool):
+            self.show_window()
+        elif self.has_tray():
+            # Do not even build the window until it is asked for
+            logger.info("Started minimized to the system tray")
+            self.tray.showMessage("LetMeSleep", "Running in the system tray", QSystemTrayIcon.Information, 3000)
+        else:
+            self.show_window()
+            self.window.showMinimized()
+
+    def show_window(self):
+        """Show the main window, creating it if it was torn down."""
+        if self.window is None:
+            self.window = MainWindow(self.controller, tray=self)
+            self.window.hidden_to_tray.connect(self._teardown_window)
+        self.window.showNormal()
+        self.window.raise_()
+        self.window.activateWindow()
+
+    def _teardown_window(self):
+        """Destroy the hidden window; the engines keep running."""
+        window, self.window = self.window, None
+        if window is None:
+            return
+        window.deleteLater()
+        # Break any reference cycles held by the destroyed widgets' Python wrappers
+        gc.collect()
+        logger.info("Main window unloaded; running from the system tray")
+
+    def _on_activated(self, reason):
+        """Show the window when the tray icon is clicked."""
+        if reason in (QSystemTrayIcon.Trigger, QSystemTrayIcon.DoubleClick):
+            self.show_window()
+
+    def _on_state_changed(self, state):
+        """Update the tray menu, and unload the window in tray mode once running."""
+        self.start_stop_action.setText("Start" if state == STATE_STOPPED else "Stop")
+        self.pause_resume_action.setText("Resume" if state == STATE_PAUSED else "Pause")
+        self.pause_resume_action.setEnabled(state in (STATE_RUNNING, STATE_PAUSED))
+        profile = f" ({self.controller.profile_name})" if self.controller.profile_name else ""
+        self.tray.setToolTip(f"LetMeSleep - {state}{profile}")
+
+        if self.tray_mode and state in (STATE_RUNNING, STATE_WAITING) and self.window is not None:
+            self.window.hide()
+            self._teardown_window()
+            self.tray.showMessage("LetMeSleep", "Automation running in the system tray",
+                                  QSystemTrayIcon.Information, 3000)
+
+    def _start_stop(self):
+        """Start or stop the automation from the tray menu."""
+        if self.controller.is_running():
+            self.controller.stop()
+        else:
+            self.controller.start()
+
+    def _pause_resume(self):
+        """Pause or resume the automation from the tray menu."""
+        if self.controller.is_paused():
+            self.controller.resume()
+        else:
+            self.controller.pause()
+
+    def _fill_profile_menu(self):
+        """List the saved profiles in the profile submenu."""
+        self.profile_menu.clear()
+        names = list_profiles()
+        if not names:
+            empty = self.profile_menu.addAction("No saved profiles")
+            empty.setEnabled(False)
+            return
+        for name in names:
+            action = self.profile_menu.addAction(name)
+            action.setCheckable(True)
+            action.setChecked(name == self.controller.profile_name)
+            action.triggered.connect(lambda checked, name=name: self._apply_profile(name))
+
+    def _apply_profile(self, name):
+        """Apply a saved profile to the running engines."""
+        try:
+            self.controller.apply_profile(load_profile(name), name)
+        except ProfileError as e:
+            # Picked from the tray menu, so answer there even while the window exists
+            self.tray.showMessage("Profile Not Applied", str(e), QSystemTrayIcon.Warning, 5000)
+            return
+        self._on_state_changed(self.controller.state())
+
+    def _on_failsafe(self):
+        """Tell the user about a failsafe stop when there is no window to do so."""
+        if self.window is None:
+            self.tray.showMessage("Failsafe Triggered", "All automations have been stopped.",
+                                  QSystemTrayIcon.Warning, 5000)
+
+    def _on_error(self, message):
+        """Surface errors that stopped an engine through the tray when there is no window."""
+        if self.window is None:
+            self.tray.showMessage("Automation Error", message, QSystemTrayIcon.Critical, 5000)
+
+    def quit(self):
+        """Stop the automation and quit the application."""
+        self.controller.stop()
+        if self.tray is not None:
+            self.tray.hide()
+        QApplication.instance().quit()
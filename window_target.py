@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""Confine automation to one application window (X11).
+
+A WindowTarget finds a top-level window by title and/or WM_CLASS and keeps
+its geometry and focus state cached. A background thread with its own
+display connection listens for the window's ConfigureNotify, map and
+destroy events and for root property changes (_NET_ACTIVE_WINDOW,
+_NET_CLIENT_LIST), and only queries the server again when one of them
+arrives. The engines read the cached values and never talk to X per
+action.
+"""
+import select
+import logging
+import threading
+
+logger = logging.getLogger("LetMeSleep")
+
+
+class WindowTargetError(Exception):
+    """Exception raised when window targeting is unavailable or misconfigured."""
+    pass
+
+
+class WindowTarget:
+    """Track the geometry and focus of one X11 window matched by title or class."""
+
+    def __init__(self, title=None, wm_class=None, display_name=None, retry_interval=2.0):
+        if not title and not wm_class:
+            raise WindowTargetError("A target window needs a title or a class to match")
+        try:
+            from Xlib import X, Xatom
+            from Xlib.display import Display
+            from Xlib.error import XError, DisplayError
+        except ImportError:
+            raise WindowTargetError("Window targeting needs python-xlib on X11")
+        self._X = X
+        self._Xatom = Xatom
+        self._XError = XError
+        try:
+            self._display = Display(display_name)
+        except (DisplayError, OSError) as e:
+            raise WindowTargetError(f"Cannot open X display for window targeting: {str(e)}")
+
+        self.title = title or None
+        self.wm_class = wm_class or None
+        self.retry_interval = retry_interval
+        self._root = self._display.screen().root
+        self._atoms = {name: self._display.intern_atom(name) for name in (
+            "_NET_ACTIVE_WINDOW", "_NET_CLIENT_LIST", "_NET_WM_NAME", "UTF8_STRING")}
+
+        # Cached state, written by the watcher thread and read by the engines
+        self.window = None
+        self.frame = None
+        self.geometry = None  # (x, y, width, height) in root coordinates, None while unavailable
+        self.active = False
+        self.resolves = 0
+        self.refreshes = 0
+
+        self._ewmh = False
+        self._resolved = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def describe(self):
+        """Return a short description of what is matched."""
+        parts = []
+        if self.title:
+            parts.append(f"title '{self.title}'")
+        if self.wm_class:
+            parts.append(f"class '{self.wm_class}'")
+        return " and ".join(parts)
+
+    def start(self, timeout=2.0):
+        """Start watching, waiting briefly for the first lookup."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="window-target")
+        self._thread.daemon = True
+        self._thread.start()
+        self._resolved.wait(timeout)
+
+    def stop(self):
+        """Stop watching and close the display connection."""
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(2.0)
+        try:
+            self._display.close()
+        except Exception:
+            pass
+
+    def is_ready(self):
+        """Check if the window is found, visible and focused."""
+        return self.geometry is not None and self.active
+
+    def _run(self):
+        try:
+            self._root.change_attributes(event_mask=self._X.PropertyChangeMask)
+            self._resolve()
+        except self._XError as e:
+            logger.warning(f"Window target lookup failed: {str(e)}")
+        finally:
+            self._resolved.set()
+
+        fd = self._display.fileno()
+        while not self._stop_event.is_set():
+            # Without a window or EWMH hints there are no events to wait for, so poll slowly
+            polling = self.window is None or not self._ewmh
+            try:
+                readable, _, _ = select.select([fd], [], [], self.retry_interval if polling else 1.0)
+                if readable or self._display.pending_events():
+                    self._handle_events()
+                elif polling:
+                    if self.window is None:
+                        self._resolve()
+                    else:
+                        self._refresh_active()
+            except self._XError as e:
+                logger.warning(f"Window target update failed: {str(e)}")
+                self._lose_window()
+            except (OSError, ValueError) as e:
+                if not self._stop_event.is_set():
+                    logger.error(f"Window target watcher stopped: {str(e)}")
+                return
+
+    def _handle_events(self):
+        """Drain pending events, then refresh whatever they invalidated once."""
+        X = self._X
+        geometry_dirty = active_dirty = lost = clients_changed = False
+        window_id = self.window.id if self.window is not None else None
+        frame_id = self.frame.id if self.frame is not None else None
+        while self._display.pending_events():
+            event = self._display.next_event()
+            event_window = getattr(getattr(event, "window", None), "id", None)
+            if event.type == X.DestroyNotify and event_window in (window_id, frame_id):
+                lost = True
+            elif event.type in (X.ConfigureNotify, X.MapNotify, X.UnmapNotify):
+                geometry_dirty = True
+            elif event.type == X.PropertyNotify:
+                if event.atom == self._atoms["_NET_ACTIVE_WINDOW"]:
+                    active_dirty = True
+                elif event.atom == self._atoms["_NET_CLIENT_LIST"]:
+                    clients_changed = True
+                elif event_window == window_id and event.atom in (
+                        self._atoms["_NET_WM_NAME"], self._Xatom.WM_NAME):
+                    # A retitled window may no longer be the target
+                    clients_changed = True
+
+        if lost or (clients_changed and (self.window is None or not self._matches(self.window))):
+            self._lose_window()
+            self._resolve()
+            return
+        if geometry_dirty:
+            self._refresh_geometry()
+        if active_dirty:
+            self._refresh_active()
+
+    def _lose_window(self):
+        if self.window is not None:
+            logger.info(f"Target window ({self.describe()}) went away")
+        self.window = None
+        self.frame = None
+        self.geometry = None
+        self.active = False
+
+    def _window_name(self, window):
+        prop = window.get_full_property(self._atoms["_NET_WM_NAME"], self._atoms["UTF8_STRING"])
+        if prop is not None and prop.value:
+            value = prop.value
+            return value.decode("utf-8", "replace") if isinstance(value, bytes) else str(value)
+        name = window.get_wm_name()
+        if isinstance(name, bytes):
+            name = name.decode("latin-1")
+        return name or ""
+
+    def _matches(self, window):
+        """Check a window against the title substring and class (case-insensitive)."""
+        try:
+            if self.title and self.title.lower() not in self._window_name(window).lower():
+                return False
+            if self.wm_class:
+                classes = window.get_wm_class() or ()
+                if self.wm_class.lower() not in (name.lower() for name in classes):
+                    return False
+            return True
+        except self._XError:
+            return False
+
+    def _candidates(self):
+        """Return the top-level client windows, from EWMH if the window manager has it."""
+        prop = self._root.get_full_property(self._atoms["_NET_CLIENT_LIST"], self._Xatom.WINDOW)
+        self._ewmh = prop is not None
+        if prop is not None:
+            return [self._display.create_resource_object("window", wid) for wid in prop.value]
+        # No EWMH: clients are root children or one level below a frame
+        windows = []
+        for child in self._root.query_tree().children:
+            windows.append(child)
+            windows.extend(child.query_tree().children)
+        return windows
+
+    def _resolve(self):
+        """Find the target window and start listening to it."""
+        for window in self._candidates():
+            if not self._matches(window):
+                continue
+            self.window = window
+            self.frame = self._top_level(window)
+            mask = self._X.StructureNotifyMask | self._X.PropertyChangeMask
+            window.change_attributes(event_mask=mask)
+            if self.frame.id != window.id:
+                self.frame.change_attributes(event_mask=self._X.StructureNotifyMask)
+            self.resolves += 1
+            self._refresh_geometry()
+            self._refresh_active()
+            logger.info(f"Target window ({self.describe()}) found: 0x{window.id:x} at {self.geometry}")
+            return True
+        return False
+
+    def _top_level(self, window):
+        """Return the window manager frame (root child) holding a window."""
+        while True:
+            parent = window.query_tree().parent
+            if parent is None or parent.id == self._root.id:
+                return window
+            window = parent
+
+    def _refresh_geometry(self):
+        if self.window is None:
+            return
+        self.refreshes += 1
+        if self.window.get_attributes().map_state != self._X.IsViewable:
+            # Minimized or on another workspace
+            self.geometry = None
+            return
+        geometry = self.window.get_geometry()
+        origin = self._root.translate_coords(self.window, 0, 0)
+        self.geometry = (origin.x, origin.y, geometry.width, geometry.height)
+
+    def _refresh_active(self):
+        if self.window is None:
+            self.active = False
+            return
+        ids = (self.window.id, self.frame.id)
+        prop = self._root.get_full_property(self._atoms["_NET_ACTIVE_WINDOW"], self._Xatom.WINDOW)
+        if prop is not None and len(prop.value):
+            self.active = prop.value[0] in ids
+            return
+        focus = self._display.get_input_focus().focus
+        self.active = getattr(focus, "id", focus) in ids
+
+    def status(self):
+        """Return the cached target state as a dict."""
+        # The refresh thread may drop the window between reads
+        window = self.window
+        return {
+            "match": self.describe(),
+            "window": f"0x{window.id:x}" if window is not None else None,
+            "geometry": self.geometry,
+            "active": self.active,
+            "resolves": self.resolves,
+            "refreshes": self.refreshes,
+        }